@@ -0,0 +1,20 @@
+import os
+import sys
+
+"""
+asv benchmarks for the training, inference and data preparation hot paths.
+
+The repo has no installable package, so the benchmarks import the scripts directly. When asv runs
+them it checks out the commit under test into $ASV_ENV_DIR/project; otherwise (asv dev/run
+--python=same) the working tree this file lives in is used.
+"""
+
+_checkout = os.path.join(os.environ.get("ASV_ENV_DIR", ""), "project")
+PROJECT_ROOT = (_checkout if os.environ.get("ASV_ENV_DIR") and os.path.isdir(_checkout)
+                else os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The repo root holds the storage package the scripts import
+for _subdir in ("", "models", "misc_py_scripts"):
+    _path = os.path.normpath(os.path.join(PROJECT_ROOT, _subdir))
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
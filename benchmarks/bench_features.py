@@ -0,0 +1,64 @@
+from . import synthetic
+from load_data import TRAINING_DTYPES, WEATHER_FEATURES
+from feature_pipeline import FeaturePipeline, time_features, load_features
+from interactions import all_pairs, interaction_terms
+
+"""Benchmarks for feature engineering (models/feature_pipeline.py, models/interactions.py)."""
+
+def _typed_frame(n_rows):
+    # As returned by read_training_data
+    frame = synthetic.training_frame(n_rows)
+    return frame[list(TRAINING_DTYPES)].astype(TRAINING_DTYPES)
+
+class TimeFeatures:
+    params = [10_000, 1_000_000]
+    param_names = ["n_rows"]
+
+    def setup(self, n_rows):
+        self.data = _typed_frame(n_rows)
+
+    def time_time_features(self, n_rows):
+        time_features(self.data)
+
+class Pipeline:
+    params = ([10_000, 1_000_000], [False, True])
+    param_names = ["n_rows", "include_sky_conditions"]
+
+    def setup(self, n_rows, include_sky_conditions):
+        self.data = _typed_frame(n_rows)
+        self.fitted = FeaturePipeline(include_sky_conditions=include_sky_conditions).fit(self.data)
+        self.row = self.data.iloc[[0]]
+
+    def time_fit_transform(self, n_rows, include_sky_conditions):
+        FeaturePipeline(include_sky_conditions=include_sky_conditions).fit_transform(self.data)
+
+    def peakmem_fit_transform(self, n_rows, include_sky_conditions):
+        FeaturePipeline(include_sky_conditions=include_sky_conditions).fit_transform(self.data)
+
+    def time_transform_single_row(self, n_rows, include_sky_conditions):
+        # What the prediction page runs per request
+        self.fitted.transform(self.row)
+
+class CachedFeatures:
+    timeout = 600
+
+    def setup_cache(self):
+        synthetic.training_frame(200_000).to_csv("training.csv", index=False)
+        load_features("training.csv", cache_dir="feature_cache")
+
+    def time_load_cached(self):
+        load_features("training.csv", cache_dir="feature_cache")
+
+class Interactions:
+    params = [100_000, 1_000_000]
+    param_names = ["n_rows"]
+
+    def setup(self, n_rows):
+        self.data = _typed_frame(n_rows)[WEATHER_FEATURES].fillna(0)
+        self.pairs = all_pairs(WEATHER_FEATURES)
+
+    def time_all_interaction_terms(self, n_rows):
+        interaction_terms(self.data, self.pairs)
+
+    def peakmem_all_interaction_terms(self, n_rows):
+        interaction_terms(self.data, self.pairs)
@@ -0,0 +1,23 @@
+from . import synthetic
+from load_data import read_training_data
+
+"""Benchmarks for streaming the merged training file (models/load_data.py)."""
+
+class ReadTrainingData:
+    params = [100_000, 1_000_000]
+    param_names = ["n_rows"]
+    timeout = 600
+
+    def setup_cache(self):
+        # Runs once, in a temporary directory asv shares with the benchmarks and removes afterwards
+        for n_rows in self.params:
+            synthetic.training_frame(n_rows).to_csv(f"training-{n_rows}.csv", index=False)
+
+    def time_read(self, n_rows):
+        read_training_data(f"training-{n_rows}.csv", chunksize=250_000)
+
+    def time_read_stratified_sample(self, n_rows):
+        read_training_data(f"training-{n_rows}.csv", sample_frac=0.3, stratify="Cancelled", chunksize=250_000)
+
+    def peakmem_read(self, n_rows):
+        read_training_data(f"training-{n_rows}.csv", chunksize=250_000)
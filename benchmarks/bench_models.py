@@ -0,0 +1,79 @@
+import lightgbm as lgb
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.multioutput import MultiOutputRegressor
+from . import synthetic
+from load_data import TRAINING_DTYPES, DELAY_TARGETS
+from feature_pipeline import FeaturePipeline
+
+"""
+Benchmarks for fitting each model family and for single-row and batch prediction.
+
+Model settings follow the training scripts (lgbm.py defaults, the optimized forests' depth limits,
+train_randomforests.py's multi-output forest) with N_TREES trees per forest, so a run stays in minutes.
+"""
+
+N_TRAIN = 50_000
+N_BATCH = 10_000
+N_TREES = 10
+
+def _features(n_rows, seed=0):
+    data = synthetic.training_frame(n_rows, seed=seed)
+    data = data[list(TRAINING_DTYPES)].astype(TRAINING_DTYPES)
+    X = FeaturePipeline(include_sky_conditions=True).fit_transform(data)
+    return X, data[DELAY_TARGETS].fillna(0), data['Cancelled'].fillna(0).astype(int)
+
+class Fit:
+    timeout = 600
+
+    def setup(self):
+        self.X, self.delays, self.cancelled = _features(N_TRAIN)
+
+    def time_lgbm_regressor(self):
+        lgb.LGBMRegressor(random_state=42, verbose=-1).fit(self.X, self.delays['ArrivalDelay'])
+
+    def time_lgbm_classifier(self):
+        lgb.LGBMClassifier(random_state=42, verbose=-1).fit(self.X, self.cancelled)
+
+    def time_rf_regressor(self):
+        RandomForestRegressor(n_estimators=N_TREES, max_depth=15, min_samples_split=10, n_jobs=-1,
+                              random_state=42).fit(self.X, self.delays['ArrivalDelay'])
+
+    def time_rf_multioutput(self):
+        MultiOutputRegressor(RandomForestRegressor(n_estimators=N_TREES, n_jobs=-1, random_state=42)).fit(self.X, self.delays)
+
+    def time_rf_classifier(self):
+        RandomForestClassifier(n_estimators=N_TREES, max_depth=15, min_samples_split=10, n_jobs=-1,
+                               random_state=42).fit(self.X, self.cancelled)
+
+    def peakmem_rf_multioutput(self):
+        MultiOutputRegressor(RandomForestRegressor(n_estimators=N_TREES, n_jobs=-1, random_state=42)).fit(self.X, self.delays)
+
+class Predict:
+    params = ["lgbm_sklearn", "lgbm_booster", "rf"]
+    param_names = ["model"]
+
+    def setup(self, model):
+        X, delays, _ = _features(N_TRAIN)
+        if model == "rf":
+            fitted = RandomForestRegressor(n_estimators=N_TREES, max_depth=15, min_samples_split=10, n_jobs=-1,
+                                           random_state=42).fit(X, delays['ArrivalDelay'])
+            self.predict = fitted.predict
+        else:
+            fitted = lgb.LGBMRegressor(random_state=42, verbose=-1).fit(X, delays['ArrivalDelay'])
+            if model == "lgbm_sklearn":
+                self.predict = fitted.predict
+            else:
+                # As served by the prediction page (prediction_helpers.BoosterRegressor)
+                booster = lgb.Booster(model_str=fitted.booster_.model_to_string())
+                self.predict = lambda rows: booster.predict(rows, num_threads=1)
+
+        X_new, _, _ = _features(N_BATCH, seed=1)
+        # Frames, as FeaturePipeline.transform hands them to the models when serving
+        self.row = X_new.iloc[[0]]
+        self.batch = X_new
+
+    def time_predict_single_row(self, model):
+        self.predict(self.row)
+
+    def time_predict_batch(self, model):
+        self.predict(self.batch)
@@ -0,0 +1,57 @@
+from . import synthetic
+
+"""
+Benchmarks for the data preparation stages: station weather merging, sky condition imputation,
+the flight/weather merge (misc_py_scripts/merge_airport_weather.py) and the local-to-UTC
+conversion (misc_py_scripts/airport_change_datetime_utc.py).
+"""
+
+class MergeWeather:
+    params = [3, 10]
+    param_names = ["n_stations"]
+    timeout = 300
+
+    def setup(self, n_stations):
+        # One year of hourly readings per station
+        self.stations = [synthetic.weather_frame(24 * 365, seed=seed) for seed in range(n_stations)]
+
+    def time_merge_weather_data(self, n_stations):
+        from merge_airport_weather import merge_weather_data
+        merge_weather_data([df.copy() for df in self.stations], synthetic.WEATHER_FEATURES)
+
+    def time_impute_sky_conditions(self, n_stations):
+        from merge_airport_weather import impute_sky_conditions
+        impute_sky_conditions([df[['UTC_DATE', 'HourlySkyConditions']] for df in self.stations])
+
+class MergeFlights:
+    params = [10_000, 200_000]
+    param_names = ["n_flights"]
+
+    def setup(self, n_flights):
+        from merge_airport_weather import merge_weather_data
+        self.flights = synthetic.flight_frame(n_flights)
+        self.weather = merge_weather_data([synthetic.weather_frame(24 * 365)], synthetic.WEATHER_FEATURES)
+        self.airports = synthetic.airport_list()
+
+    def time_compute_delays_and_merge(self, n_flights):
+        from merge_airport_weather import compute_delays, merge_flight_weather
+        flights, weather = compute_delays(self.flights.copy(), self.weather)
+        merge_flight_weather(flights, weather, self.airports)
+
+class ConvertToUTC:
+    params = [1_000, 10_000]
+    param_names = ["n_flights"]
+    timeout = 300
+
+    def setup(self, n_flights):
+        try:
+            import airport_change_datetime_utc  # noqa: F401
+        except ImportError:
+            raise NotImplementedError("timezonefinder is not installed")
+        self.flights = synthetic.local_flight_frame(n_flights)
+
+    def time_convert_to_utc(self, n_flights):
+        from airport_change_datetime_utc import convert_to_utc
+        df = self.flights.copy()
+        for col in ['CRSDepTime', 'DepTime', 'CRSArrTime', 'ArrTime']:
+            df = convert_to_utc(df, col, 'FlightDate', 40.6413, -73.7781)
@@ -0,0 +1,407 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+"""
+Deterministic synthetic data shaped like the project's files, for the benchmarks and for running
+the pipeline offline.
+
+In-memory frames (used by the benchmarks):
+- `training_frame`: the merged training schema written by merge_airport_weather.py.
+- `flight_frame` / `weather_frame` / `airport_list`: the inputs of the merge stage.
+- `local_flight_frame`: a BTS per-airport file before UTC conversion.
+
+`write_dataset` writes the bucket layout the scripts read, at any scale:
+    airports-list-us.csv, ncei-lcd-list-us.csv, closest_airport_weather.csv,
+    transtat-bts/{AIRPORT_ID}.csv, ncei-lcd/{station}.csv and optionally airport-weather-data.csv.
+Flights are generated in fixed blocks of BLOCK_ROWS, each seeded by (seed, block), and appended
+to the per-airport files, so memory stays bounded and the output depends only on the arguments.
+
+Values are drawn to match the real data where it matters for timing: months 1, 11 and 12, hub
+airports with most of the traffic, about 2% cancelled flights, about 5% missing weather readings
+and LCD-style sky condition codes.
+
+Usage:
+    python -m benchmarks.synthetic 1000000 synthetic-data
+    python -m benchmarks.synthetic 100000000 /mnt/scratch/synthetic --airports 350 --training
+"""
+
+WEATHER_FEATURES = [
+    'HourlyDryBulbTemperature', 'HourlyWindSpeed', 'HourlyWindDirection',
+    'HourlyDewPointTemperature', 'HourlyRelativeHumidity', 'HourlyVisibility',
+    'HourlyStationPressure', 'HourlyWetBulbTemperature'
+]
+DELAY_CAUSES = ['CarrierDelay', 'WeatherDelay', 'NASDelay', 'SecurityDelay', 'LateAircraftDelay']
+
+# Columns of a transtat-bts/{AIRPORT_ID}.csv file after airport_change_datetime_utc.py
+BTS_COLUMNS = [
+    'DayOfWeek', 'Marketing_Airline_Network', 'Flight_Number_Operating_Airline',
+    'OriginAirportID', 'OriginCityName', 'DestAirportID', 'DestCityName',
+    'CRSElapsedTime', 'ActualElapsedTime', 'Distance', 'TaxiOut', 'TaxiIn', 'Cancelled',
+] + DELAY_CAUSES + ['UTC_CRSDepTime', 'UTC_DepTime', 'UTC_CRSArrTime', 'UTC_ArrTime']
+
+# Column order of the merged training file (merge_airport_weather.py)
+TRAINING_COLUMNS = [
+    'DayOfWeek', 'Marketing_Airline_Network', 'Flight_Number_Operating_Airline',
+    'OriginAirportID', 'OriginCity', 'OriginState', 'OriginCityName',
+    'DestAirportID', 'DestCity', 'DestState', 'DestCityName', 'Distance',
+    'UTC_CRSDepTime', 'UTC_DepTime', 'UTC_CRSArrTime', 'UTC_ArrTime',
+    'ArrivalDelay', 'DepartureDelay', 'TotalFlightDelay', 'TaxiOut', 'TaxiIn', 'TaxiDelay',
+    'CarrierDelay', 'WeatherDelay', 'NASDelay', 'SecurityDelay', 'LateAircraftDelay',
+    'CRSElapsedTime', 'ActualElapsedTime', 'Cancelled',
+] + WEATHER_FEATURES + ['HourlySkyConditions']
+
+AIRLINES = ['AA', 'AS', 'B6', 'DL', 'F9', 'G4', 'HA', 'NK', 'UA', 'WN']
+SKY_CONDITIONS = ['CLR:00', 'FEW:02 45', 'SCT:04 60', 'BKN:07 35', 'OVC:08 12', 'FEW:02 25 BKN:07 90', 'VV:09 5']
+STATES = {
+    'CA': 'California', 'TX': 'Texas', 'NY': 'New York', 'FL': 'Florida', 'IL': 'Illinois',
+    'WA': 'Washington', 'CO': 'Colorado', 'GA': 'Georgia', 'AZ': 'Arizona', 'MN': 'Minnesota',
+}
+YEAR = 2023
+MONTHS = [1, 11, 12]
+BLOCK_ROWS = 1_000_000
+
+# (mean, std) of each weather reading, roughly as in the LCD data
+WEATHER_DISTRIBUTIONS = {
+    'HourlyDryBulbTemperature': (45, 18),
+    'HourlyWindSpeed': (9, 5),
+    'HourlyWindDirection': (180, 100),
+    'HourlyDewPointTemperature': (33, 16),
+    'HourlyRelativeHumidity': (68, 18),
+    'HourlyVisibility': (9, 2),
+    'HourlyStationPressure': (29.5, 0.6),
+    'HourlyWetBulbTemperature': (40, 15),
+}
+
+def airport_list(n_airports=50, seed=0):
+    """Returns an airports-list-us.csv style frame for `n_airports` airports in the contiguous US."""
+    rng = np.random.default_rng(seed)
+    ids = 10000 + np.arange(n_airports) * 97
+    states = rng.choice(list(STATES), n_airports)
+    cities = [f"City {i}" for i in ids]
+    # Three-letter codes from the airport index: AAA, AAB, ...
+    codes = ["".join(chr(65 + i // 26 ** k % 26) for k in (2, 1, 0)) for i in range(n_airports)]
+    return pd.DataFrame({
+        'AIRPORT_SEQ_ID': ids * 100 + 1,
+        'AIRPORT_ID': ids,
+        'AIRPORT': codes,
+        'DISPLAY_AIRPORT_NAME': [f"Airport {i}" for i in ids],
+        'DISPLAY_AIRPORT_CITY_NAME_FULL': [f"{city}, {state}" for city, state in zip(cities, states)],
+        'AIRPORT_COUNTRY_NAME': 'United States',
+        'AIRPORT_STATE_NAME': [STATES[state] for state in states],
+        'LATITUDE': rng.uniform(26, 48, n_airports).round(4),
+        'LONGITUDE': rng.uniform(-122, -71, n_airports).round(4),
+        'City': cities,
+        'State': states,
+        'CancellationRate': rng.uniform(0.5, 4, n_airports).round(2),
+        'AvgArrivalDelay': rng.normal(5, 4, n_airports).round(2),
+        'AvgDepartureDelay': rng.normal(10, 4, n_airports).round(2),
+        'AvgTotalFlightDelay': rng.normal(-5, 3, n_airports).round(2),
+        'AvgTaxiDelay': rng.normal(9, 3, n_airports).round(2),
+    })
+
+def station_list(airports, stations_per_airport=3, seed=0):
+    """Returns an ncei-lcd-list-us.csv style frame with stations scattered within ~40 km of each airport."""
+    rng = np.random.default_rng(seed)
+    n = len(airports) * stations_per_airport
+    home = np.repeat(np.arange(len(airports)), stations_per_airport)
+    latitude = (airports['LATITUDE'].to_numpy()[home] + rng.normal(0, 0.15, n)).round(4)
+    longitude = (airports['LONGITUDE'].to_numpy()[home] + rng.normal(0, 0.15, n)).round(4)
+    states = airports['State'].to_numpy()[home]
+    stations = [f"7{700000000 + i * 131:010d}" for i in range(n)]
+    return pd.DataFrame({
+        'station': stations,
+        'station_name': [f"STATION {i}, {state} US" for i, state in enumerate(states)],
+        'coords': [f"({lat}, {lon})" for lat, lon in zip(latitude, longitude)],
+        'elevation': rng.uniform(0, 1800, n).round(1),
+        'latitude': latitude,
+        'longitude': longitude,
+        'names': airports['City'].to_numpy()[home],
+        'admin1': [STATES[state] for state in states],
+        'admin2': [f"County {i % 97}" for i in range(n)],
+        'country': 'US',
+        'state': states,
+    })
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 6371 * 2 * np.arcsin(np.sqrt(a))
+
+def closest_airport_weather(airports, stations, n_closest=5):
+    """Returns the closest_airport_weather.csv frame (find_closest_weather_airport.py) for these lists."""
+    distances = _haversine_km(airports['LATITUDE'].to_numpy()[:, None], airports['LONGITUDE'].to_numpy()[:, None],
+                              stations['latitude'].to_numpy()[None, :], stations['longitude'].to_numpy()[None, :])
+    nearest = np.argsort(distances, axis=1)[:, :n_closest]
+    airport_idx = np.repeat(np.arange(len(airports)), nearest.shape[1])
+    station_idx = nearest.ravel()
+    airport = airports.iloc[airport_idx].reset_index(drop=True)
+    station = stations.iloc[station_idx].reset_index(drop=True)
+    return pd.DataFrame({
+        'AIRPORT_SEQ_ID': airport['AIRPORT_SEQ_ID'],
+        'AIRPORT_ID': airport['AIRPORT_ID'],
+        'AIRPORT_NAME': airport['AIRPORT'],
+        'AIRPORT_DISPLAY_NAME': airport['DISPLAY_AIRPORT_NAME'],
+        'AIRPORT_CITY': airport['DISPLAY_AIRPORT_CITY_NAME_FULL'],
+        'AIRPORT_COUNTRY': airport['AIRPORT_COUNTRY_NAME'],
+        'AIRPORT_STATE': airport['AIRPORT_STATE_NAME'],
+        'AIRPORT_COORDINATES': [f"({lat}, {lon})" for lat, lon in zip(airport['LATITUDE'], airport['LONGITUDE'])],
+        'WEATHER_STATION_ID': station['station'],
+        'WEATHER_STATION_NAME': station['station_name'],
+        'WEATHER_COORDINATES': station['coords'],
+        'WEATHER_ELEVATION': station['elevation'],
+        'WEATHER_ADMIN1': station['admin1'],
+        'WEATHER_ADMIN2': station['admin2'],
+        'WEATHER_COUNTRY': station['country'],
+        'WEATHER_STATE': station['state'],
+        'DISTANCE_KM': distances[airport_idx, station_idx],
+    })
+
+def _utc_offset_hours(longitude):
+    # Standard time zone from longitude, close enough for the contiguous US
+    return np.round(np.asarray(longitude) / 15).astype(int)
+
+def _timestamps(rng, n):
+    days = np.concatenate([pd.date_range(f"{YEAR}-{month:02d}-01", periods=28, freq="D") for month in MONTHS])
+    minutes = rng.integers(5 * 60, 23 * 60, n)
+    return pd.DatetimeIndex(rng.choice(days, n)) + pd.to_timedelta(minutes, unit="min")
+
+def _utc_strings(times):
+    # As the UTC conversion scripts write them; formatting naive times is ~10x faster than strftime
+    return (pd.Series(times).astype(str) + '+00:00').to_numpy()
+
+def _hhmm(times):
+    return (times.hour * 100 + times.minute).to_numpy()
+
+def weather_values(rng, n, missing_rate=0.05):
+    """Returns a dict of weather columns with `missing_rate` of each set to NaN."""
+    values = {}
+    for feature, (mean, std) in WEATHER_DISTRIBUTIONS.items():
+        column = rng.normal(mean, std, n).round(1)
+        column[rng.random(n) < missing_rate] = np.nan
+        values[feature] = column
+    return values
+
+def origin_weights(n_airports):
+    """Share of departures per airport: a few hubs carry most of the traffic, as in the BTS data."""
+    weights = 1 / np.arange(1, n_airports + 1) ** 0.8
+    return weights / weights.sum()
+
+def _flights(rng, airports, origin, local_times=False):
+    """Draws the BTS columns for flights departing from airport positions `origin`."""
+    n_rows, n_airports = len(origin), len(airports)
+    dest = (origin + rng.integers(1, max(n_airports, 2), n_rows)) % n_airports
+    lat, lon = airports['LATITUDE'].to_numpy(), airports['LONGITUDE'].to_numpy()
+    distance = np.maximum(_haversine_km(lat[origin], lon[origin], lat[dest], lon[dest]) * 0.621371, 50).round()
+
+    # Schedules are local at both ends; the UTC columns subtract each airport's offset
+    crs_dep_local = _timestamps(rng, n_rows)
+    crs_elapsed = (distance / 8 + 30 + rng.integers(-5, 20, n_rows)).round()
+    dep_delay = rng.gamma(0.6, 25, n_rows).round() - 5
+    air_time_change = rng.normal(0, 8, n_rows).round()
+    taxi_out = rng.integers(5, 40, n_rows).astype(float)
+    taxi_in = rng.integers(2, 20, n_rows).astype(float)
+    cancelled = rng.random(n_rows) < 0.02
+
+    crs_dep = crs_dep_local - pd.to_timedelta(_utc_offset_hours(lon[origin]), unit="h")
+    crs_arr = crs_dep + pd.to_timedelta(crs_elapsed, unit="min")
+    dep = crs_dep + pd.to_timedelta(dep_delay, unit="min")
+    arr = dep + pd.to_timedelta(crs_elapsed + air_time_change, unit="min")
+    arr_delay = dep_delay + air_time_change
+
+    # Cause breakdown is only reported for arrivals 15+ minutes late
+    causes = rng.dirichlet(np.ones(len(DELAY_CAUSES)), n_rows) * np.maximum(arr_delay, 0)[:, None]
+    causes[(arr_delay < 15) | cancelled] = np.nan
+
+    def actual(values):
+        # Cancelled flights have no actual times
+        return np.where(cancelled, np.nan, values)
+
+    columns = {
+        'DayOfWeek': crs_dep_local.dayofweek + 1,
+        'Marketing_Airline_Network': rng.choice(AIRLINES, n_rows),
+        'Flight_Number_Operating_Airline': rng.integers(1, 7000, n_rows),
+        'OriginAirportID': airports['AIRPORT_ID'].to_numpy()[origin],
+        'OriginCityName': airports['DISPLAY_AIRPORT_CITY_NAME_FULL'].to_numpy()[origin],
+        'DestAirportID': airports['AIRPORT_ID'].to_numpy()[dest],
+        'DestCityName': airports['DISPLAY_AIRPORT_CITY_NAME_FULL'].to_numpy()[dest],
+        'CRSElapsedTime': crs_elapsed,
+        'ActualElapsedTime': actual(crs_elapsed + air_time_change + taxi_out + taxi_in - 20),
+        'Distance': distance,
+        'TaxiOut': actual(taxi_out),
+        'TaxiIn': actual(taxi_in),
+        'Cancelled': cancelled.astype(float),
+        **{cause: causes[:, i].round() for i, cause in enumerate(DELAY_CAUSES)},
+    }
+    if local_times:
+        dest_offset = pd.to_timedelta(_utc_offset_hours(lon[dest]), unit="h")
+        origin_offset = pd.to_timedelta(_utc_offset_hours(lon[origin]), unit="h")
+        columns['FlightDate'] = pd.Series(crs_dep_local.normalize()).astype(str).to_numpy()
+        columns['CRSDepTime'] = _hhmm(crs_dep_local)
+        columns['DepTime'] = actual(_hhmm(dep + origin_offset))
+        columns['CRSArrTime'] = _hhmm(crs_arr + dest_offset)
+        columns['ArrTime'] = actual(_hhmm(arr + dest_offset))
+        return pd.DataFrame(columns)
+
+    columns['UTC_CRSDepTime'] = crs_dep
+    columns['UTC_DepTime'] = dep.where(~cancelled)
+    columns['UTC_CRSArrTime'] = crs_arr
+    columns['UTC_ArrTime'] = arr.where(~cancelled)
+    return pd.DataFrame(columns)[BTS_COLUMNS]
+
+def _format_utc(frame):
+    for col in ['UTC_CRSDepTime', 'UTC_DepTime', 'UTC_CRSArrTime', 'UTC_ArrTime']:
+        frame[col] = np.where(frame[col].isna(), None, _utc_strings(frame[col]))
+    return frame
+
+def _merged(rng, flights, airports):
+    # What merge_airport_weather.py adds: delay metrics, origin/destination city and state, weather
+    flights['ArrivalDelay'] = (flights['UTC_ArrTime'] - flights['UTC_CRSArrTime']).dt.total_seconds() / 60
+    flights['DepartureDelay'] = (flights['UTC_DepTime'] - flights['UTC_CRSDepTime']).dt.total_seconds() / 60
+    flights['TotalFlightDelay'] = ((flights['UTC_CRSArrTime'] - flights['UTC_CRSDepTime']) -
+                                   (flights['UTC_ArrTime'] - flights['UTC_DepTime'])).dt.total_seconds() / 60
+    flights['TaxiDelay'] = flights['TaxiOut'] - flights['TaxiIn']
+    details = airports.set_index('AIRPORT_ID')[['City', 'State']]
+    for side in ['Origin', 'Dest']:
+        matched = details.reindex(flights[f'{side}AirportID'])
+        flights[f'{side}City'] = matched['City'].to_numpy()
+        flights[f'{side}State'] = matched['State'].to_numpy()
+    for feature, values in weather_values(rng, len(flights)).items():
+        flights[feature] = values
+    flights['HourlySkyConditions'] = rng.choice(SKY_CONDITIONS, len(flights))
+    return _format_utc(flights)[TRAINING_COLUMNS]
+
+def training_frame(n_rows, n_airports=50, seed=0):
+    """Returns `n_rows` of the merged training schema (as read back from CSV: timestamps are strings)."""
+    rng = np.random.default_rng(seed)
+    airports = airport_list(n_airports, seed)
+    origin = rng.choice(n_airports, n_rows, p=origin_weights(n_airports))
+    return _merged(rng, _flights(rng, airports, origin), airports)
+
+def flight_frame(n_rows, origin_airport_id=10000, n_airports=50, seed=0):
+    """Returns a UTC-converted BTS flight file for one origin airport, with datetime columns parsed."""
+    rng = np.random.default_rng(seed)
+    airports = airport_list(n_airports, seed)
+    origin = np.full(n_rows, int(np.flatnonzero(airports['AIRPORT_ID'] == origin_airport_id)[0]))
+    frame = _flights(rng, airports, origin)
+    for col in ['UTC_DepTime', 'UTC_ArrTime', 'UTC_CRSDepTime', 'UTC_CRSArrTime']:
+        frame[col] = frame[col].dt.tz_localize('UTC')
+    return frame
+
+def local_flight_frame(n_rows, seed=0):
+    """Returns a BTS per-airport file with local FlightDate and HHMM times, before UTC conversion."""
+    rng = np.random.default_rng(seed)
+    airports = airport_list(seed=seed)
+    return _flights(rng, airports, np.zeros(n_rows, dtype=int), local_times=True)
+
+def weather_frame(n_hours, seed=0, start=f"{YEAR}-01-01", utc_offset=None):
+    """
+    Returns an hourly LCD station file: UTC_DATE, the weather readings and HourlySkyConditions,
+    preceded by the local DATE column when the station's `utc_offset` (hours) is given.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=n_hours, freq="h")
+    frame = pd.DataFrame({
+        **weather_values(rng, n_hours),
+        'HourlySkyConditions': rng.choice(SKY_CONDITIONS + [np.nan], n_hours),
+        'UTC_DATE': _utc_strings(dates),
+    })
+    if utc_offset is not None:
+        local = pd.Series(dates + pd.Timedelta(hours=int(utc_offset))).astype(str).str.replace(' ', 'T')
+        frame.insert(0, 'DATE', local.to_numpy())
+        return frame
+    return frame[['UTC_DATE'] + WEATHER_FEATURES + ['HourlySkyConditions']]
+
+def station_frame(longitude, seed=0):
+    """Returns a station file covering the flight months (plus a day either side for the UTC shift)."""
+    months = []
+    for month in MONTHS:
+        first = pd.Timestamp(f"{YEAR}-{month:02d}-01")
+        start, end = first - pd.Timedelta(days=1), first + pd.offsets.MonthBegin(1) + pd.Timedelta(days=1)
+        months.append(weather_frame((end - start) // pd.Timedelta(hours=1), seed=[seed, month], start=start,
+                                    utc_offset=_utc_offset_hours(longitude)))
+    return pd.concat(months, ignore_index=True).drop_duplicates('UTC_DATE')
+
+def _write_csv(frame, path, append=False):
+    # pyarrow's writer is ~8x faster than DataFrame.to_csv at these sizes
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    with open(path, "ab" if append else "wb") as out:
+        pacsv.write_csv(pa.Table.from_pandas(frame, preserve_index=False), out,
+                        pacsv.WriteOptions(include_header=not append))
+
+def write_dataset(out_dir, n_rows, n_airports=None, stations_per_airport=3, n_closest=5, local_times=False,
+                  training=False, seed=0):
+    """
+    Writes a complete synthetic copy of the data bucket to `out_dir`.
+
+    Parameters:
+    out_dir (str): Output directory (the bucket root).
+    n_rows (int): Total number of flights, spread over the per-airport files.
+    n_airports (int): Number of airports (default: scales with n_rows, between 5 and 350).
+    stations_per_airport (int): Weather stations generated around each airport.
+    n_closest (int): Stations listed per airport in closest_airport_weather.csv.
+    local_times (bool): Write the flight files before UTC conversion (FlightDate and local HHMM
+        times, the input of airport_change_datetime_utc.py) instead of the UTC_* columns.
+    training (bool): Also write the merged training file (airport-weather-data.csv) for the same flights
+        (UTC flight files only).
+    seed (int): Seed; the same arguments always produce the same files.
+    """
+    n_airports = n_airports or int(np.clip(n_rows // 20_000, 5, 350))
+    airports = airport_list(n_airports, seed)
+    stations = station_list(airports, stations_per_airport, seed)
+    flight_dir = os.path.join(out_dir, "transtat-bts")
+    weather_dir = os.path.join(out_dir, "ncei-lcd")
+    os.makedirs(flight_dir, exist_ok=True)
+    os.makedirs(weather_dir, exist_ok=True)
+
+    airports.to_csv(os.path.join(out_dir, "airports-list-us.csv"), index=False)
+    stations.to_csv(os.path.join(out_dir, "ncei-lcd-list-us.csv"), index=False)
+    closest_airport_weather(airports, stations, n_closest).to_csv(
+        os.path.join(out_dir, "closest_airport_weather.csv"), index=False)
+    print(f"Wrote metadata for {n_airports} airports and {len(stations)} stations.")
+
+    for i, (station, longitude) in enumerate(zip(stations['station'], stations['longitude'])):
+        station_frame(longitude, seed=[seed, i]).to_csv(
+            os.path.join(weather_dir, f"{station}.csv"), index=False)
+    print(f"Wrote {len(stations)} station files.")
+
+    weights = origin_weights(n_airports)
+    training_path = os.path.join(out_dir, "airport-weather-data.csv")
+    written = set()
+    for block, start in enumerate(range(0, n_rows, BLOCK_ROWS)):
+        rng = np.random.default_rng([seed, block])
+        origin = np.sort(rng.choice(n_airports, min(BLOCK_ROWS, n_rows - start), p=weights))
+        flights = _flights(rng, airports, origin, local_times)
+
+        for airport_id, group in flights.groupby('OriginAirportID', sort=False):
+            path = os.path.join(flight_dir, f"{airport_id}.csv")
+            # First write truncates, so rerunning into the same directory does not append
+            _write_csv(group if local_times else _format_utc(group.copy()), path, append=path in written)
+            written.add(path)
+        if training and not local_times:
+            _write_csv(_merged(rng, flights, airports), training_path, append=block > 0)
+        print(f"Wrote flights {start + len(flights):,} of {n_rows:,}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic copy of the flight/weather data.")
+    parser.add_argument("rows", type=int, help="Total number of flights (e.g. 1000 to 100000000)")
+    parser.add_argument("out_dir", help="Output directory")
+    parser.add_argument("--airports", type=int, default=None, help="Number of airports (default: scales with rows)")
+    parser.add_argument("--stations-per-airport", type=int, default=3)
+    parser.add_argument("--closest", type=int, default=5, help="Stations per airport in closest_airport_weather.csv")
+    parser.add_argument("--local-times", action="store_true",
+                        help="Write flight files before UTC conversion (FlightDate and local HHMM times)")
+    parser.add_argument("--training", action="store_true", help="Also write the merged airport-weather-data.csv")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.training and args.local_times:
+        parser.error("--training needs UTC flight times; drop --local-times")
+
+    write_dataset(args.out_dir, args.rows, args.airports, args.stations_per_airport, args.closest,
+                  args.local_times, args.training, args.seed)
+
+if __name__ == "__main__":
+    main()
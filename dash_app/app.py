@@ -1,11 +1,20 @@
 
 import os
 import sys
-from dash import Dash, html, dcc
+import diskcache
+from dash import Dash, html, dcc, DiskcacheManager
 from dash.dependencies import Input, Output
 
 # Append current directory to system path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# The models directory provides feature_pipeline, needed to unpickle the fitted feature pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "models"))
+# The repo root provides the shared storage layer
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Fetch the metadata snapshot once (in parallel) before the dashboards read from it
+from dashboard.metadata import sync_snapshot
+sync_snapshot()
 
 # Import layouts for each dashboard
 from dashboard.prediction_page.prediction_layout import random_forest_prediction_layout
@@ -17,8 +26,13 @@ import dashboard. prediction_page.prediction_callback
 import dashboard.weather_dashboard.weather_callback
 import dashboard.airport_dashboard.airport_callback
 
+# Background callbacks run in separate processes queued through a local disk cache (no external broker)
+callback_cache_dir = os.environ.get("DASH_CALLBACK_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "callback_cache"))
+background_callback_manager = DiskcacheManager(diskcache.Cache(callback_cache_dir))
+
 # Initialize the app
-app = Dash(__name__, suppress_callback_exceptions=True, external_scripts=['https://cdn.plot.ly/plotly-latest.min.js'])
+app = Dash(__name__, suppress_callback_exceptions=True, external_scripts=['https://cdn.plot.ly/plotly-latest.min.js'],
+           background_callback_manager=background_callback_manager)
 server = app.server
 
 # Main layout with tabs for different dashboards
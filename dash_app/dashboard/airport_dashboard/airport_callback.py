@@ -1,5 +1,4 @@
 
-import gcsfs
 import pandas as pd
 import numpy as np
 from dash import callback, callback_context, Output, State, Input, html, ALL, ctx
@@ -7,22 +6,17 @@ from dash.exceptions import PreventUpdate
 import plotly.graph_objects as go
 import plotly.express as px
 import json
+import storage
 from .airport_helpers import create_airport_map_figure, create_delay_plots, create_cancellation_plot
-
-# Initialize Google Cloud Storage FileSystem
-fs = gcsfs.GCSFileSystem(project='Flights-Weather-Project', token='flights-weather-project-f94d306bee1f.json')
+from ..metadata import get_metadata
 
 # Mapbox token setup
 mapbox_token = "pk.eyJ1Ijoic3RvY2hhc3RpYzEwMTciLCJhIjoiY20ydmJpMzhrMGIwdDJqb2NoZGt5emw0YiJ9.QJXmXS_gHKVxDV4mVkmIOw"
 px.set_mapbox_access_token(mapbox_token)
 
-# Load airport metadata
-airport_metdata = f"gs://airport-weather-data/airports-list-us.csv"
-df_airport = pd.read_csv(airport_metdata, storage_options={"token": "flights-weather-project-f94d306bee1f.json"})
-
-# Load airport metadata
-weather_metdata = f"gs://airport-weather-data/closest_airport_weather.csv"
-df_weather = pd.read_csv(weather_metdata, storage_options={"token": "flights-weather-project-f94d306bee1f.json"})
+# Load airport metadata from the local snapshot
+df_airport = get_metadata("airports")
+df_weather = get_metadata("closest_weather")
 
 # Default plot function for unselected states/cities
 def create_default_plot():
@@ -150,6 +144,8 @@ def update_map_and_station_info(mapbox_style, marker_size, marker_opacity, gradi
         # Zoom in to the clicked airport's location
         airport_id = click_data['points'][0]['hovertext']
         airport_info = df_airport[df_airport['AIRPORT_ID'] == airport_id].iloc[0]
+        # Start downloading the airport's merged data before "Update Plot" asks for it
+        storage.prefetch([storage.url(f"merged_data/{airport_id}_training_data.csv")])
         try:
             airport_lat, airport_lon = airport_info['LATITUDE'], airport_info['LONGITUDE']
             center = dict(lat=airport_lat, lon=airport_lon)
@@ -204,9 +200,13 @@ def update_map_and_station_info(mapbox_style, marker_size, marker_opacity, gradi
     [State("airport-enhanced-map", "clickData"),
      State("airport-year-selector", "value"),
      State("airport-month-selector", "value"),
-     State("airport-plot-selector", "value")]
+     State("airport-plot-selector", "value"),
+     State("airport-top-n-destinations", "value")],
+    # Runs as a background job; clicking again while it runs cancels the stale job
+    background=True,
+    running=[(Output("airport-update-plot-button", "children"), "Updating... (click to restart)", "Update Plot")]
 )
-def update_visualization(n_clicks, click_data, selected_year, selected_month, selected_plot_type):
+def update_visualization(n_clicks, click_data, selected_year, selected_month, selected_plot_type, top_n_destinations):
     # Validate input: button click, map selection, year, and plot type
     if not n_clicks or not click_data:
         fig = create_default_plot()
@@ -240,7 +240,9 @@ def update_visualization(n_clicks, click_data, selected_year, selected_month, se
         return fig
 
     if selected_plot_type == "Delay Viz":
-        return create_delay_plots(airport_id, selected_year, selected_month, title_info=title_info)
+        return create_delay_plots(airport_id, selected_year, selected_month, title_info=title_info,
+                                  top_n_destinations=top_n_destinations)
     
     if selected_plot_type == "Cancel Viz":
-        return  create_cancellation_plot(airport_id, selected_year, selected_month, title_info=title_info)
+        return  create_cancellation_plot(airport_id, selected_year, selected_month, title_info=title_info,
+                                         top_n_destinations=top_n_destinations)
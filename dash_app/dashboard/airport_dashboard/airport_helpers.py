@@ -1,14 +1,11 @@
 
-import time
-import gcsfs
 import plotly.graph_objects as go
 import pandas as pd
 import plotly.figure_factory as ff
 import plotly.express as px
 from plotly.subplots import make_subplots
-
-# Initialize Google Cloud Storage FileSystem
-fs = gcsfs.GCSFileSystem(project='Flights-Weather-Project', token='flights-weather-project-f94d306bee1f.json')
+import storage
+from ..metadata import get_metadata
 
 # Initial Plot Message
 def create_default_plot():
@@ -62,15 +59,59 @@ def create_airport_map_figure(mapbox_style, marker_size, marker_opacity, filtere
     )
     return fig
 
-def create_delay_plots(airport_id, year, month, title_info):
-    time.sleep(3)
+BOX_SUMMARY_COLUMNS = ["q1", "median", "q3", "lowerfence", "upperfence", "count"]
+
+def summarize_boxes(df, group_col, value_col, top_n=None):
+    """
+    Computes box plot statistics of value_col for every group_col value in one grouped pass, so the
+    figure carries five numbers per box instead of every raw observation.
+
+    Whiskers follow Plotly's default: the most extreme observations within 1.5 IQR of the box.
+    If top_n is set, only the top_n groups with the most observations are kept (busiest first).
+    With no observations left after dropping NaNs, an empty frame with the same columns is returned.
+    """
+    data = df[[group_col, value_col]].dropna()
+    if data.empty:
+        return pd.DataFrame(columns=BOX_SUMMARY_COLUMNS)
+    counts = data[group_col].value_counts()
+    if top_n:
+        counts = counts.head(top_n)
+        data = data[data[group_col].isin(counts.index)]
+
+    grouped = data.groupby(group_col)[value_col]
+    summary = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    summary.columns = ["q1", "median", "q3"]
+
+    iqr = summary["q3"] - summary["q1"]
+    limits = data.join(pd.DataFrame({"low": summary["q1"] - 1.5 * iqr, "high": summary["q3"] + 1.5 * iqr}), on=group_col)
+    within = limits[(limits[value_col] >= limits["low"]) & (limits[value_col] <= limits["high"])]
+    fences = within.groupby(group_col)[value_col].agg(["min", "max"])
+
+    summary["lowerfence"] = fences["min"]
+    summary["upperfence"] = fences["max"]
+    summary["count"] = counts
+    return summary.reindex(counts.index) if top_n else summary
+
+def summary_box(summary, color, label):
+    if summary.empty:
+        # No precomputed statistics to draw; keep an empty box in the subplot
+        return go.Box(marker=dict(color=color), name=label, showlegend=False)
+    return go.Box(
+        x=summary.index,
+        q1=summary["q1"],
+        median=summary["median"],
+        q3=summary["q3"],
+        lowerfence=summary["lowerfence"],
+        upperfence=summary["upperfence"],
+        marker=dict(color=color),
+        name=label,
+        showlegend=False,
+    )
+
+def create_delay_plots(airport_id, year, month, title_info, top_n_destinations=25):
     try:
-        file_path = f"gs://airport-weather-data/merged_data/{airport_id}_training_data.csv"
-        df = pd.read_csv(
-            file_path,
-            storage_options={"token": "flights-weather-project-f94d306bee1f.json"},
-            low_memory=False,
-        )
+        file_path = storage.url(f"merged_data/{airport_id}_training_data.csv")
+        df = storage.read_csv(file_path, low_memory=False)
         df["UTC_DATE"] = pd.to_datetime(df["UTC_DATE"], errors="coerce")
 
         # Filter data for the selected year and month
@@ -96,12 +137,8 @@ def create_delay_plots(airport_id, year, month, title_info):
             )
             return fig
 
-        # Load airport metadata for name lookup
-        airport_metadata = f"gs://airport-weather-data/airports-list-us.csv"
-        df_airport = pd.read_csv(
-            airport_metadata,
-            storage_options={"token": "flights-weather-project-f94d306bee1f.json"},
-        )
+        # Airport metadata for name lookup
+        df_airport = get_metadata("airports")
 
         # Merge to get destination airport names
         df = df.merge(
@@ -113,7 +150,6 @@ def create_delay_plots(airport_id, year, month, title_info):
 
         # Map day of the week to names
         day_map = {1: "Mon", 2: "Tue", 3: "Wed", 4: "Thu", 5: "Fri", 6: "Sat", 7: "Sun"}
-        df["DayOfWeek"] = df["DayOfWeek"].map(day_map)
 
         # Prepare data for each delay type
         delay_types = [
@@ -156,47 +192,17 @@ def create_delay_plots(airport_id, year, month, title_info):
                 col=col,
             )
 
-            # Row 2: Box plot by Day of Week (outliers hidden)
-            fig.add_trace(
-                go.Box(
-                    y=df[delay].dropna(),
-                    x=df["DayOfWeek"],
-                    marker=dict(color=color),
-                    name=label,
-                    boxpoints=False,  # Hide outliers
-                    showlegend=False,
-                ),
-                row=2,
-                col=col,
-            )
+            # Row 2: Box plot by Day of Week (precomputed quartiles, outliers hidden)
+            day_summary = summarize_boxes(df, "DayOfWeek", delay).sort_index().rename(index=day_map)
+            fig.add_trace(summary_box(day_summary, color, label), row=2, col=col)
 
-            # Row 3: Box plot by Marketing Airline (outliers hidden)
-            fig.add_trace(
-                go.Box(
-                    y=df[delay].dropna(),
-                    x=df["Marketing_Airline_Network"],
-                    marker=dict(color=color),
-                    name=label,
-                    boxpoints=False,  # Hide outliers
-                    showlegend=False,
-                ),
-                row=3,
-                col=col,
-            )
+            # Row 3: Box plot by Marketing Airline (precomputed quartiles, outliers hidden)
+            airline_summary = summarize_boxes(df, "Marketing_Airline_Network", delay)
+            fig.add_trace(summary_box(airline_summary, color, label), row=3, col=col)
 
-            # Row 4: Box plot by Destination Airport (outliers hidden)
-            fig.add_trace(
-                go.Box(
-                    y=df[delay].dropna(),
-                    x=df["DISPLAY_AIRPORT_NAME"],
-                    marker=dict(color=color),
-                    name=label,
-                    boxpoints=False,  # Hide outliers
-                    showlegend=False,
-                ),
-                row=4,
-                col=col,
-            )
+            # Row 4: Box plot by Destination Airport (busiest destinations only, precomputed quartiles)
+            destination_summary = summarize_boxes(df, "DISPLAY_AIRPORT_NAME", delay, top_n=top_n_destinations)
+            fig.add_trace(summary_box(destination_summary, color, label), row=4, col=col)
 
         fig.update_layout(
             title=dict(
@@ -235,17 +241,15 @@ def create_delay_plots(airport_id, year, month, title_info):
         )
         return fig
     
-def create_cancellation_plot(airport_id, year, month, title_info):
-    time.sleep(3)
+def create_cancellation_plot(airport_id, year, month, title_info, top_n_destinations=25):
     try:
         # Load the main dataset
-        file_path = f"gs://airport-weather-data/merged_data/{airport_id}_training_data.csv"
-        df = pd.read_csv(file_path, storage_options={"token": "flights-weather-project-f94d306bee1f.json"}, low_memory=False)
+        file_path = storage.url(f"merged_data/{airport_id}_training_data.csv")
+        df = storage.read_csv(file_path, low_memory=False)
         df["UTC_DATE"] = pd.to_datetime(df["UTC_DATE"], errors='coerce')
         
-        # Load airport metadata for name lookup
-        airport_metadata = f"gs://airport-weather-data/airports-list-us.csv"
-        df_airport = pd.read_csv(airport_metadata, storage_options={"token": "flights-weather-project-f94d306bee1f.json"})
+        # Airport metadata for name lookup
+        df_airport = get_metadata("airports")
         
         # Filter data for the selected year and month
         df = df[(df["UTC_DATE"].dt.year == year) & (df["UTC_DATE"].dt.month == month)]
@@ -320,6 +324,8 @@ def create_cancellation_plot(airport_id, year, month, title_info):
 
         # 4. Cancellations by destination airport
         destination_cancel = df[df['Cancelled'] == 1]['DISPLAY_AIRPORT_NAME'].value_counts()
+        if top_n_destinations:
+            destination_cancel = destination_cancel.head(top_n_destinations)
         fig.add_trace(
             go.Bar(
                 x=destination_cancel.index,
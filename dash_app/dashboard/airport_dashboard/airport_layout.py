@@ -1,21 +1,25 @@
 
-import gcsfs
 import numpy as np
 import pandas as pd
 from dash import dcc, html, Output, Input, callback
+from ..metadata import get_metadata
 
-# Initialize Google Cloud Storage FileSystem
-fs = gcsfs.GCSFileSystem(project='Flights-Weather-Project', token='flights-weather-project-f94d306bee1f.json')
-
-# Load airport metadata
-airport_metdata = f"gs://airport-weather-data/airports-list-us.csv"
-df_airport = pd.read_csv(airport_metdata, storage_options={"token": "flights-weather-project-f94d306bee1f.json"})
+# Load airport metadata from the local snapshot
+df_airport = get_metadata("airports")
 
 # Unique states and cities for dropdown filtering
 states = [{'label': state, 'value': state} for state in df_airport['State'].unique()]
 years = [2018, 2019, 2020, 2021, 2022, 2023, 2024]
 months = {"January": 1, "November": 11, "December": 12}
 
+# Number of busiest destination airports shown in the destination plots (0 shows all)
+top_n_destination_options = [
+    {'label': 'Top 10 Destinations', 'value': 10},
+    {'label': 'Top 25 Destinations', 'value': 25},
+    {'label': 'Top 50 Destinations', 'value': 50},
+    {'label': 'All Destinations', 'value': 0}
+]
+
 map_options = [
     {'label': 'Streets', 'value': 'streets-v11'},
     {'label': 'Satellite', 'value': 'satellite-v9'},
@@ -204,6 +208,14 @@ airport_dashboard_layout = html.Div([
                         className="dropdown",
                         clearable=False
                     ),
+                    dcc.Dropdown(
+                        id='airport-top-n-destinations',
+                        options=top_n_destination_options,
+                        value=25,
+                        placeholder="Destinations Shown",
+                        className="dropdown",
+                        clearable=False
+                    ),
                     html.Button("Update Plot", id="airport-update-plot-button", className="update-plot-button", style={'margin-top': '10px'})
                 ], className="time-series-settings-section", style={'margin-bottom': '20px'})
             ], className="station-info-and-settings-container", style={'width': '75%', 'float': 'right', 'padding': '10px'}),
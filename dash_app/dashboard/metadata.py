@@ -0,0 +1,113 @@
+import os
+import json
+import shutil
+import threading
+from datetime import datetime, timezone
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import storage
+
+"""
+Local snapshot of the metadata CSVs the dashboards need at startup.
+
+On the first start every file in METADATA_FILES is downloaded once, in parallel, into
+METADATA_SNAPSHOT_DIR together with a VERSION.json stamp recording the source object generation
+of each file. Later starts read the local copies without touching the bucket. Set METADATA_REFRESH=1
+(or call `sync_snapshot(refresh=True)`) to pull a fresh snapshot.
+"""
+
+METADATA_FILES = {
+    "airports": storage.url("airports-list-us.csv"),
+    "closest_weather": storage.url("closest_airport_weather.csv"),
+    "stations": storage.url("ncei-lcd-list-us.csv"),
+    "prediction_options": storage.url("options_for_prediction.csv"),
+}
+
+SNAPSHOT_DIR = os.environ.get(
+    "METADATA_SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "metadata_snapshot")
+)
+VERSION_FILE = "VERSION.json"
+
+_sync_lock = threading.Lock()
+_env_refresh_pending = os.environ.get("METADATA_REFRESH") == "1"
+
+def _snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, os.path.basename(METADATA_FILES[name]))
+
+def read_version():
+    """Returns the version stamp of the local snapshot, or None if there is no complete snapshot."""
+    version_path = os.path.join(SNAPSHOT_DIR, VERSION_FILE)
+    if not os.path.exists(version_path):
+        return None
+    with open(version_path) as f:
+        version = json.load(f)
+    if set(version.get("files", {})) != set(METADATA_FILES):
+        return None
+    if not all(os.path.exists(_snapshot_path(name)) for name in METADATA_FILES):
+        return None
+    return version
+
+def _download(fs, name, staging_dir):
+    source = METADATA_FILES[name]
+    info = fs.info(source)
+    fs.get(source, os.path.join(staging_dir, os.path.basename(source)))
+    return name, {
+        "source": source,
+        "generation": str(info.get("generation", "")),
+        "size": info.get("size"),
+        "updated": info.get("updated"),
+    }
+
+def sync_snapshot(refresh=False):
+    """
+    Makes sure a complete local snapshot exists, downloading every metadata file in parallel if not.
+
+    Returns:
+    dict: The version stamp of the snapshot in use.
+    """
+    global _env_refresh_pending
+    with _sync_lock:
+        # METADATA_REFRESH forces a single refresh per process, not one per frame
+        refresh = refresh or _env_refresh_pending
+        _env_refresh_pending = False
+        version = read_version()
+        if version is not None and not refresh:
+            return version
+
+        fs = storage.get_fs()
+        staging_dir = f"{SNAPSHOT_DIR}.staging-{os.getpid()}"
+        os.makedirs(staging_dir, exist_ok=True)
+        try:
+            with ThreadPoolExecutor(max_workers=len(METADATA_FILES)) as executor:
+                files = dict(executor.map(lambda name: _download(fs, name, staging_dir), METADATA_FILES))
+
+            version = {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "files": files,
+            }
+            with open(os.path.join(staging_dir, VERSION_FILE), "w") as f:
+                json.dump(version, f, indent=2)
+
+            # Swap the staged snapshot in; VERSION.json goes last so readers never see a partial one
+            os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+            for name in METADATA_FILES:
+                os.replace(os.path.join(staging_dir, os.path.basename(METADATA_FILES[name])), _snapshot_path(name))
+            os.replace(os.path.join(staging_dir, VERSION_FILE), os.path.join(SNAPSHOT_DIR, VERSION_FILE))
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+        get_metadata.cache_clear()
+        return version
+
+@lru_cache(maxsize=None)
+def get_metadata(name):
+    """Returns the metadata frame for `name` (a key of METADATA_FILES), loaded once per process."""
+    sync_snapshot()
+    return pd.read_csv(_snapshot_path(name))
+
+def load_all_metadata():
+    """Loads every metadata frame into memory."""
+    sync_snapshot()
+    return {name: get_metadata(name) for name in METADATA_FILES}
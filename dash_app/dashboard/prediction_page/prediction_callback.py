@@ -1,22 +1,18 @@
 
-import pickle
 import pandas as pd
 from dash import html, Output, Input, State, callback
-import gcsfs
 from .prediction_helpers import (haversine, get_weather_data_for_prediction, 
                                  get_weather_estimates, convert_to_utc, 
-                                 validate_time_format)
+                                 validate_time_format, load_models)
+from ..metadata import get_metadata
 
 # Suppress warnings
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
 
-# Initialize Google Cloud Storage
-fs = gcsfs.GCSFileSystem(project='Flights-Weather-Project', token='flights-weather-project-f94d306bee1f.json')
-
-# Load airport metadata and closest station data
-df_airport_metadata = pd.read_csv("gs://airport-weather-data/airports-list-us.csv", storage_options={"token": "flights-weather-project-f94d306bee1f.json"})
-closest_weather_airport = pd.read_csv("gs://airport-weather-data/closest_airport_weather.csv", storage_options={"token": "flights-weather-project-f94d306bee1f.json"})
+# Load airport metadata and closest station data from the local snapshot
+df_airport_metadata = get_metadata("airports")
+closest_weather_airport = get_metadata("closest_weather")
 
 weather_features = [
     'HourlyDryBulbTemperature', 'HourlyWindSpeed', 'HourlyWindDirection',
@@ -95,61 +91,22 @@ def predict_flight_delay(n_clicks, airline, origin_airport, destination_airport,
                                                 closest_weather_airport=closest_weather_airport,
                                                 max_distance=100, n_nearest=5)
 
-    # Prepare features for the model
-    features = {
-        "DayOfWeek": departure_time_utc.weekday(),
+    # Models and the fitted feature pipeline are loaded once per process and shared by every request
+    delay_models, cancel_model, feature_pipeline = load_models()
+
+    # Build a raw row like the training data and engineer it with the pipeline used in training
+    weather_forecasts = weather_forecasts or {}
+    raw_features = pd.DataFrame([{
+        "DayOfWeek": departure_time_utc.isoweekday(),  # BTS DayOfWeek: 1 = Monday
         "Marketing_Airline_Network": airline,
         "OriginAirportID": origin_airport,
         "DestAirportID": destination_airport,
-        "Distance": distance,
-        "CRSDepHour": departure_time_utc.hour,
-        "CRSArrHour": arrival_time_utc.hour,
-        "CRSDepMonth": departure_time_utc.month,
-        "CRSDepDayOfWeek": departure_time_utc.weekday(),
-        **{feature: weather_forecasts.get(feature, 0) for feature in weather_features}  # Default to 0 if missing
-    }
-
-    # Convert features to DataFrame
-    feature_df = pd.DataFrame([features])
-
-    # Encode categorical features to match training
-    feature_df['Marketing_Airline_Network'] = feature_df['Marketing_Airline_Network'].astype('category').cat.codes
-    feature_df['OriginAirportID'] = feature_df['OriginAirportID'].astype('category').cat.codes
-    feature_df['DestAirportID'] = feature_df['DestAirportID'].astype('category').cat.codes
-
-    # Ensure all columns have correct data types
-    feature_df = feature_df.astype({
-        "DayOfWeek": "int",
-        "Marketing_Airline_Network": "int",
-        "OriginAirportID": "int",
-        "DestAirportID": "int",
-        "Distance": "float",
-        "CRSDepHour": "int",
-        "CRSArrHour": "int",
-        "CRSDepMonth": "int",
-        "CRSDepDayOfWeek": "int",
-        # Add types for weather features
-        "HourlyDryBulbTemperature": "float",
-        "HourlyWindSpeed": "float",
-        "HourlyWindDirection": "float",
-        "HourlyDewPointTemperature": "float",
-        "HourlyRelativeHumidity": "float",
-        "HourlyVisibility": "float",
-        "HourlyStationPressure": "float",
-        "HourlyWetBulbTemperature": "float"
-    })
-
-    # Load models using Singleton pattern
-    with fs.open("gs://airport-weather-data/models/best_lgbm_regressor.pkl", "rb") as f:
-        delay_models = pickle.load(f)
-
-    # Load models using Singleton pattern
-    with fs.open("gs://airport-weather-data/models/best_lgbm_classifier.pkl", "rb") as f:
-        cancel_model = pickle.load(f)
-
-    # Drop 'HourlySkyConditions' if it exists in feature_df
-    if 'HourlySkyConditions' in feature_df.columns:
-        feature_df = feature_df.drop(columns=['HourlySkyConditions'])
+        "Distance": distance * 0.621371,  # BTS distances are in miles
+        "UTC_CRSDepTime": departure_time_utc,
+        "UTC_CRSArrTime": arrival_time_utc,
+        **{feature: weather_forecasts.get(feature) for feature in weather_features}  # Missing values are imputed
+    }])
+    feature_df = feature_pipeline.transform(raw_features)
 
     # Proceed with the prediction
     delay_prediction = delay_models.predict(feature_df)[0]
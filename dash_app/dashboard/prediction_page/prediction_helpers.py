@@ -1,5 +1,8 @@
 
 import re
+import pickle
+from functools import lru_cache
+import lightgbm as lgb
 import pandas as pd
 import requests
 from requests.auth import HTTPBasicAuth
@@ -7,6 +10,46 @@ from math import radians, sin, cos, sqrt, atan2
 from datetime import datetime
 import pytz
 from timezonefinder import TimezoneFinder
+import storage
+
+MODEL_DIR = storage.url("models")
+
+class BoosterRegressor:
+    """LightGBM text booster with the sklearn regressor predict() interface"""
+    def __init__(self, booster):
+        self.booster = booster
+
+    def predict(self, X):
+        # One thread: requests are single rows, and the workers already run one per core
+        return self.booster.predict(X, num_threads=1)
+
+class BoosterClassifier(BoosterRegressor):
+    """LightGBM text booster for a binary model with the sklearn classifier predict() interface"""
+    def __init__(self, booster, threshold=0.5):
+        super().__init__(booster)
+        self.threshold = threshold
+
+    def predict(self, X):
+        return (super().predict(X) >= self.threshold).astype(int)
+
+def _load_model(name, booster_class):
+    # Prefer the text booster written by lgbm.py / export_models.py, fall back to the pickle
+    booster_path = f"{MODEL_DIR}/{name}.txt"
+    if storage.exists(booster_path):
+        with storage.open(booster_path, "r") as f:
+            return booster_class(lgb.Booster(model_str=f.read()))
+    with storage.open(f"{MODEL_DIR}/{name}.pkl", "rb") as f:
+        return pickle.load(f)
+
+# Load the delay and cancellation models and the fitted feature pipeline (models/feature_pipeline.py)
+# once per process (before fork when preloaded under gunicorn)
+@lru_cache(maxsize=None)
+def load_models():
+    delay_model = _load_model("best_lgbm_regressor", BoosterRegressor)
+    cancel_model = _load_model("best_lgbm_classifier", BoosterClassifier)
+    with storage.open(f"{MODEL_DIR}/feature_pipeline.pkl", "rb") as f:
+        feature_pipeline = pickle.load(f)
+    return delay_model, cancel_model, feature_pipeline
 
 # Function to calculate Haversine distance
 def haversine(lat1, lon1, lat2, lon2):
@@ -26,13 +69,13 @@ def convert_visibility_to_miles(nmi):
 def get_weather_data_for_prediction(latitude, longitude, timestamp, username, password):
     # Define required continuous parameters with model-compatible names
     parameter_mapping = {
-        "t_2m:C": "DryBulbTemperature",                   # Dry bulb temperature
-        "wind_speed_10m:kmh": "WindSpeed",                # Wind speed
-        "wind_dir_10m:d": "WindDirection",                # Wind direction
-        "dew_point_2m:C": "DewPointTemperature",          # Dew point temperature
-        "relative_humidity_2m:p": "RelativeHumidity",     # Relative humidity
-        "visibility:nmi": "Visibility",                   # Visibility in miles
-        "msl_pressure:hPa": "StationPressure",            # Station pressure in inHg
+        "t_2m:C": "HourlyDryBulbTemperature",             # Dry bulb temperature
+        "wind_speed_10m:kmh": "HourlyWindSpeed",          # Wind speed
+        "wind_dir_10m:d": "HourlyWindDirection",          # Wind direction
+        "dew_point_2m:C": "HourlyDewPointTemperature",    # Dew point temperature
+        "relative_humidity_2m:p": "HourlyRelativeHumidity",   # Relative humidity
+        "visibility:nmi": "HourlyVisibility",             # Visibility in miles
+        "msl_pressure:hPa": "HourlyStationPressure",      # Station pressure in inHg
     }
     
     # Split timestamp into date and time, remove timezone
@@ -109,11 +152,11 @@ def get_weather_estimates(origin_airport_id, departure_time, closest_weather_air
     # Load and process each nearest weather station file
     for _, station in nearest_stations.iterrows():
         station_id = int(station['STATION_ID'])
-        file_path = f'gs://airport-weather-data/ncei-lcd/{station_id}.csv'
+        file_path = storage.url(f"ncei-lcd/{station_id}.csv")
         
         try:
             # Load weather data for the station
-            weather_df = pd.read_csv(file_path, storage_options={"token": "flights-weather-project-f94d306bee1f.json"})
+            weather_df = storage.read_csv(file_path)
             
             # Filter for the relevant date and find the closest time to the departure time
             weather_df['UTC_DATE'] = pd.to_datetime(weather_df['UTC_DATE'])
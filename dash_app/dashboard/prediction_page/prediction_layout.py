@@ -1,9 +1,10 @@
 
 import pandas as pd
 from dash import dcc, html
+from ..metadata import get_metadata
 
-# Load options for prediction from the CSV
-df_options = pd.read_csv("gs://airport-weather-data/options_for_prediction.csv", storage_options={"token": "flights-weather-project-f94d306bee1f.json"})
+# Load options for prediction from the local snapshot
+df_options = get_metadata("prediction_options")
 
 # Extract options for airlines and airports
 airline_options = [{"label": airline, "value": airline} for airline in df_options['airline'].dropna().unique()]
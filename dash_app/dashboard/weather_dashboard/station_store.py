@@ -0,0 +1,149 @@
+import os
+import json
+import uuid
+from functools import lru_cache
+import pandas as pd
+from fsspec.implementations.local import LocalFileSystem
+import storage
+
+"""
+Station time-series store for the NCEI LCD weather data.
+
+Each raw station file (ncei-lcd/{station}.csv in the data bucket, see storage) holds every year of
+observations for that station. The store splits it once into per-station, per-year Parquet
+partitions:
+
+    {STATION_STORE_ROOT}/{station}/{year}.parquet
+    {STATION_STORE_ROOT}/{station}/_years.json
+
+so a range query only reads the years it overlaps. Stations that have not been partitioned yet
+are built on first access (read-through), and `build_station_partitions` can be run ahead of time
+for every station. STATION_STORE_ROOT may be a local directory or any fsspec URL (e.g. a gs:// prefix).
+
+The weather callbacks run as background jobs in separate worker processes, so two jobs can build
+the same station at once: every file is written under a unique temporary name and moved into place,
+and readers only ever see complete partitions.
+"""
+
+RAW_STATION_PATH = storage.url("ncei-lcd/{station}.csv")
+STATION_STORE_ROOT = os.environ.get(
+    "STATION_STORE_ROOT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "station_store")
+)
+
+# Columns kept in each partition
+NUMERIC_COLUMNS = [
+    'HourlyDryBulbTemperature', 'HourlyWindSpeed', 'HourlyWindDirection',
+    'HourlyDewPointTemperature', 'HourlyRelativeHumidity', 'HourlyVisibility',
+    'HourlyStationPressure', 'HourlyWetBulbTemperature'
+]
+TEXT_COLUMNS = ['HourlySkyConditions']
+
+def _store_fs():
+    fs, _ = storage.filesystem(STATION_STORE_ROOT)
+    return fs
+
+def partition_path(station, year):
+    return f"{STATION_STORE_ROOT}/{station}/{year}.parquet"
+
+def _years_path(station):
+    return f"{STATION_STORE_ROOT}/{station}/_years.json"
+
+def _write_atomic(fs, path, write):
+    """Calls write(tmp_path) and moves the finished file to `path`, replacing any existing one."""
+    tmp_path = f"{path}.tmp-{os.getpid()}-{uuid.uuid4().hex}"
+    try:
+        write(tmp_path)
+        if isinstance(fs, LocalFileSystem):
+            os.replace(tmp_path, path)
+        else:
+            fs.mv(tmp_path, path)
+    except BaseException:
+        if fs.exists(tmp_path):
+            fs.rm(tmp_path)
+        raise
+
+def _write_years(fs, path, years):
+    with fs.open(path, "w") as f:
+        json.dump(years, f)
+
+def build_station_partitions(station):
+    """
+    Reads the raw station CSV once and writes one Parquet partition per UTC year.
+
+    Returns:
+    list: The years written for the station.
+    """
+    raw_path = RAW_STATION_PATH.format(station=station)
+    df = storage.read_csv(raw_path, low_memory=False,
+                          usecols=lambda col: col in ["UTC_DATE"] + NUMERIC_COLUMNS + TEXT_COLUMNS)
+    df["UTC_DATE"] = pd.to_datetime(df["UTC_DATE"], errors="coerce", utc=True).dt.tz_localize(None)
+    df = df.dropna(subset=["UTC_DATE"]).sort_values("UTC_DATE")
+
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("string")
+
+    fs = _store_fs()
+    fs.makedirs(f"{STATION_STORE_ROOT}/{station}", exist_ok=True)
+
+    years = sorted(int(year) for year in df["UTC_DATE"].dt.year.unique())
+    for year, year_df in df.groupby(df["UTC_DATE"].dt.year):
+        year_df = year_df.reset_index(drop=True)
+        _write_atomic(fs, partition_path(station, int(year)),
+                      lambda tmp_path: storage.to_parquet(year_df, tmp_path, index=False))
+
+    # The years file is written last so a partially built station is rebuilt on next access
+    _write_atomic(fs, _years_path(station), lambda tmp_path: _write_years(fs, tmp_path, years))
+
+    station_years.cache_clear()
+    return years
+
+@lru_cache(maxsize=4096)
+def station_years(station):
+    """Returns the partitioned years available for a station, building the partitions if needed."""
+    fs = _store_fs()
+    if not fs.exists(_years_path(station)):
+        return tuple(build_station_partitions(station))
+    with fs.open(_years_path(station), "r") as f:
+        return tuple(json.load(f))
+
+# Not memoized: queries mostly run in background worker processes, where a per-process cache
+# would rarely hit and could keep serving a partition another process has since rebuilt
+def load_partition(station, year, columns=None):
+    path = partition_path(station, year)
+    return storage.read_parquet(path, columns=list(columns) if columns else None)
+
+def query_station_range(station, start_date, end_date, columns=None):
+    """
+    Returns observations for a station between start_date and end_date (both inclusive, by day).
+
+    Only the yearly partitions overlapping the range are read.
+    """
+    start = pd.Timestamp(start_date).normalize()
+    end = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+    columns = tuple(["UTC_DATE"] + [c for c in columns if c != "UTC_DATE"]) if columns else None
+
+    years = [year for year in station_years(station) if start.year <= year <= pd.Timestamp(end_date).year]
+    if not years:
+        return pd.DataFrame(columns=list(columns) if columns else ["UTC_DATE"])
+
+    df = pd.concat([load_partition(station, year, columns) for year in years], ignore_index=True)
+    return df[(df["UTC_DATE"] >= start) & (df["UTC_DATE"] < end)].reset_index(drop=True)
+
+if __name__ == "__main__":
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Pre-build partitions for the given stations, or for every U.S. station in the metadata list
+    if len(sys.argv) > 1:
+        stations = sys.argv[1:]
+    else:
+        stations = storage.read_csv(storage.url("ncei-lcd-list-us.csv"))["station"].astype(str).unique()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for station, years in zip(stations, executor.map(build_station_partitions, stations)):
+            print(f"Partitioned station {station}: {years}")
@@ -4,14 +4,14 @@ import plotly.graph_objects as go
 from dash import callback, callback_context, Output, Input, State, html
 import plotly.express as px
 from .weather_helpers import (create_weather_map_figure, create_timeseries_plot)
+from ..metadata import get_metadata
 
 # Mapbox token (hidden)
 mapbox_token = "pk.eyJ1Ijoic3RvY2hhc3RpYzEwMTciLCJhIjoiY20ydmJpMzhrMGIwdDJqb2NoZGt5emw0YiJ9.QJXmXS_gHKVxDV4mVkmIOw"
 px.set_mapbox_access_token(mapbox_token)
 
-# Load airport metadata
-weather_metdata = f"gs://airport-weather-data/ncei-lcd-list-us.csv"
-df_station = pd.read_csv(weather_metdata, storage_options={"token": "flights-weather-project-f94d306bee1f.json"})
+# Load weather station metadata from the local snapshot
+df_station = get_metadata("stations")
 
 # Default plot function for unselected states/cities
 def create_default_plot():
@@ -111,10 +111,15 @@ def update_map_and_station_info(mapbox_style, marker_size, marker_opacity, weath
     Output("weather-timeseries-plot", "figure"),
     [Input("weather-update-plot-button", "n_clicks")],
     [State("weather-enhanced-map", "clickData"),
-     State("weather-year-selector", "value"),
-     State("weather-metric-selector", "value")]
+     State("weather-date-range", "start_date"),
+     State("weather-date-range", "end_date"),
+     State("weather-overlay-years", "value"),
+     State("weather-metric-selector", "value")],
+    # Runs as a background job; clicking again while it runs cancels the stale job
+    background=True,
+    running=[(Output("weather-update-plot-button", "children"), "Updating... (click to restart)", "Update Plot")]
 )
-def update_timeseries(n_clicks, click_data, selected_year, selected_metric):
+def update_timeseries(n_clicks, click_data, start_date, end_date, overlay, selected_metric):
     if (n_clicks is None) or (not click_data):
         fig = create_default_plot()
         fig.add_annotation(
@@ -130,4 +135,5 @@ def update_timeseries(n_clicks, click_data, selected_year, selected_metric):
     station_info = df_station[df_station['station'] == station].iloc[0]
     title_info = f"Station: {station_info['station_name']} ({station}) - {station_info['names']}, {station_info['state']}"
 
-    return create_timeseries_plot(station, selected_year, selected_metric, title_info)
+    return create_timeseries_plot(station, start_date, end_date, selected_metric, title_info,
+                                  overlay_years="overlay" in (overlay or []))
@@ -1,18 +1,17 @@
 
-import time
-import gcsfs
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 from scipy import stats
 from plotly.subplots import make_subplots
+from .station_store import query_station_range
 
 import warnings
 warnings.simplefilter("ignore", category=FutureWarning)
 
-# Initialize Google Cloud Storage FileSystem
-fs = gcsfs.GCSFileSystem(project='Flights-Weather-Project', token='flights-weather-project-f94d306bee1f.json')
+# One color per year shown in the time-series plot
+YEAR_COLORS = ['#00B4D8', '#4C9A2A', '#EE6C4D', '#F4A261', '#9B5DE5', '#F15BB5', '#FEE440']
 
 def create_weather_map_figure(mapbox_style, marker_size, marker_opacity, weather_color_scale, filtered_df, center=None, zoom=3.5):
     fig = px.scatter_mapbox(
@@ -36,121 +35,128 @@ def create_weather_map_figure(mapbox_style, marker_size, marker_opacity, weather
     )
     return fig
 
-def create_timeseries_plot(station, year, metric, title_info):
-    time.sleep(3)
+def create_timeseries_plot(station, start_date, end_date, metric, title_info, overlay_years=False):
     try:
-        file_path = f"gs://airport-weather-data/ncei-lcd/{station}.csv"
-        df = pd.read_csv(file_path, storage_options={"token": "flights-weather-project-f94d306bee1f.json"}, low_memory=False)
-        df["UTC_DATE"] = pd.to_datetime(df["UTC_DATE"], errors='coerce')
-        months_to_plot = [1, 11, 12]  # January, November, December
-        filtered_df = df[(df["UTC_DATE"].dt.month.isin(months_to_plot)) & 
-                         (df["UTC_DATE"].dt.year == year)].copy()
-        
-        if filtered_df.empty:
-            raise ValueError(f"Data not available for {metric}: {station}, {year}")        
-       
-        filtered_df[metric] = pd.to_numeric(filtered_df[metric], errors='coerce')
-        
+        df = query_station_range(station, start_date, end_date, columns=[metric])
+
+        if df.empty or df[metric].dropna().empty:
+            raise ValueError(f"Data not available for {metric}: {station}, {start_date} to {end_date}")
+
+        years_to_plot = sorted(df["UTC_DATE"].dt.year.unique())
+        n_rows = len(years_to_plot)
+
+        # With overlay, every year shares one time-series panel spanning all rows
+        first_col = {"type": "scatter", "rowspan": n_rows} if overlay_years else {"type": "scatter"}
+        specs = [[first_col if (i == 0 or not overlay_years) else None, {"type": "xy"}, {"type": "table"}]
+                 for i in range(n_rows)]
+        subplot_titles = []
+        for i, year in enumerate(years_to_plot):
+            if overlay_years:
+                subplot_titles += (["Year-over-Year Time Series"] if i == 0 else []) + [f"{year} Distribution", f"{year} Stats"]
+            else:
+                subplot_titles += [f"{year} Time Series", f"{year} Distribution", f"{year} Stats"]
+
         fig = make_subplots(
-            rows=3, cols=3,
+            rows=n_rows, cols=3,
             shared_xaxes=False,
             column_widths=[0.75, 0.15, 0.15],
-            vertical_spacing=0.1,
+            vertical_spacing=0.1 / max(n_rows / 3, 1),
             horizontal_spacing=0.02,
-            subplot_titles=[
-                "January Time Series", "January Distribution", "January Stats",
-                "November Time Series", "November Distribution", "November Stats",
-                "December Time Series", "December Distribution", "December Stats"
-            ],
-            specs=[[{"type": "scatter"}, {"type": "xy"}, {"type": "table"}],
-                    [{"type": "scatter"}, {"type": "xy"}, {"type": "table"}],
-                    [{"type": "scatter"}, {"type": "xy"}, {"type": "table"}]]
+            subplot_titles=subplot_titles,
+            specs=specs
         )
-        
-        colors = {1: '#00B4D8', 11: '#4C9A2A', 12: '#EE6C4D'}  # Blue, Green, Red
-        
-        for i, month in enumerate(months_to_plot, 1):
-            month_df = filtered_df[filtered_df["UTC_DATE"].dt.month == month].copy()
-            
-            if not month_df.empty:
-                kde_y = month_df[metric].dropna().astype(float)
+
+        for i, year in enumerate(years_to_plot, 1):
+            year_df = df[df["UTC_DATE"].dt.year == year]
+            kde_y = year_df[metric].dropna().astype(float)
+            color = YEAR_COLORS[(i - 1) % len(YEAR_COLORS)]
+
+            if len(kde_y) > 1:
                 mean_y = kde_y.mean()
                 std_y = kde_y.std()
-                
-                if len(kde_y) > 1:
-
-                    month_df["UTC_DATE"] = pd.to_datetime(month_df["UTC_DATE"], errors="coerce")
-                    plot_dates = np.array(month_df["UTC_DATE"].dt.to_pydatetime(), dtype='datetime64[ns]')
-                    
-                    kde = stats.gaussian_kde(kde_y)
-                    kde_x = np.linspace(kde_y.min() - std_y, kde_y.max() + std_y, 100)
-                    kde_points = kde(kde_x)
-                    
-                    # Time Series Plot
-                    fig.add_trace(
-                        go.Scatter(
-                            x=plot_dates,
-                            y=kde_y,
-                            mode="lines",
-                            line=dict(color=colors[month], width=2)
-                        ),
-                        row=i, col=1
-                    )
-                    
-                    # Histogram and KDE
-                    fig.add_trace(
-                        go.Histogram(
-                            y=kde_y,
-                            histnorm='probability density',
-                            showlegend=False,
-                            marker=dict(color=colors[month], opacity=0.3),
-                            nbinsy=30
-                        ),
-                        row=i, col=2
-                    )
-                    
-                    fig.add_trace(
-                        go.Scatter(
-                            x=kde_points,
-                            y=kde_x,
-                            mode="lines",
-                            showlegend=False,
-                            line=dict(color=colors[month], width=2)
-                        ),
-                        row=i, col=2
-                    )
-                    
-                    # Create summary table
-                    summary_table_data = [
-                        ['Mean', f"{mean_y:.2f}"],
-                        ['Median', f"{kde_y.median():.2f}"],
-                        ['Std Dev', f"{std_y:.2f}"],
-                        ['Min', f"{kde_y.min():.2f}"],
-                        ['Max', f"{kde_y.max():.2f}"],
-                        ['Missing Data (%)', f"{(kde_y.isna().sum() / len(kde_y)) * 100:.2f}%"],
-                        ['Skewness', f"{kde_y.skew():.2f}"],
-                        ['Kurtosis', f"{kde_y.kurtosis():.2f}"],
-                    ]
-                    fig.add_trace(
-                        go.Table(
-                            header=dict(
-                                values=["<b>Statistic<b>", "<b>Value<B>"],
-                                fill_color=colors[month],  # Header color matches line color
-                                align='center',
-                                font=dict(color='white', size=11),
-                                line_color=colors[month],
-                            ),
-                            cells=dict(
-                                values=[list(x) for x in zip(*summary_table_data)],
-                                fill_color=colors[month],
-                                align='center',
-                                font=dict(color="white", size=10),  # Cell font color matches line color
-                                line_color=colors[month],
-                            )
+
+                plot_dates = year_df.loc[kde_y.index, "UTC_DATE"]
+                if overlay_years:
+                    # Shift every year onto a common leap year so the series line up by calendar date
+                    plot_dates = pd.to_datetime(pd.DataFrame({
+                        "year": 2000, "month": plot_dates.dt.month, "day": plot_dates.dt.day,
+                        "hour": plot_dates.dt.hour, "minute": plot_dates.dt.minute
+                    }))
+
+                kde = stats.gaussian_kde(kde_y)
+                kde_x = np.linspace(kde_y.min() - std_y, kde_y.max() + std_y, 100)
+                kde_points = kde(kde_x)
+
+                # Time Series Plot
+                fig.add_trace(
+                    go.Scatter(
+                        x=plot_dates.to_numpy(),
+                        y=kde_y,
+                        mode="lines",
+                        name=str(year),
+                        showlegend=overlay_years,
+                        line=dict(color=color, width=2)
+                    ),
+                    row=1 if overlay_years else i, col=1
+                )
+
+                # Histogram and KDE
+                fig.add_trace(
+                    go.Histogram(
+                        y=kde_y,
+                        histnorm='probability density',
+                        showlegend=False,
+                        marker=dict(color=color, opacity=0.3),
+                        nbinsy=30
+                    ),
+                    row=i, col=2
+                )
+
+                fig.add_trace(
+                    go.Scatter(
+                        x=kde_points,
+                        y=kde_x,
+                        mode="lines",
+                        showlegend=False,
+                        line=dict(color=color, width=2)
+                    ),
+                    row=i, col=2
+                )
+
+                # Create summary table
+                summary_table_data = [
+                    ['Mean', f"{mean_y:.2f}"],
+                    ['Median', f"{kde_y.median():.2f}"],
+                    ['Std Dev', f"{std_y:.2f}"],
+                    ['Min', f"{kde_y.min():.2f}"],
+                    ['Max', f"{kde_y.max():.2f}"],
+                    ['Missing Data (%)', f"{(year_df[metric].isna().sum() / len(year_df)) * 100:.2f}%"],
+                    ['Skewness', f"{kde_y.skew():.2f}"],
+                    ['Kurtosis', f"{kde_y.kurtosis():.2f}"],
+                ]
+                fig.add_trace(
+                    go.Table(
+                        header=dict(
+                            values=["<b>Statistic<b>", "<b>Value<B>"],
+                            fill_color=color,  # Header color matches line color
+                            align='center',
+                            font=dict(color='white', size=11),
+                            line_color=color,
                         ),
-                        row=i, col=3
-                    )
-        
+                        cells=dict(
+                            values=[list(x) for x in zip(*summary_table_data)],
+                            fill_color=color,
+                            align='center',
+                            font=dict(color="white", size=10),  # Cell font color matches line color
+                            line_color=color,
+                        )
+                    ),
+                    row=i, col=3
+                )
+
+        if overlay_years:
+            fig.update_xaxes(tickformat="%b %d", row=1, col=1)
+
         fig.update_layout(
             title=dict(
                 text=f"{metric} Analysis<br><sup>{title_info}</sup>",
@@ -158,10 +164,10 @@ def create_timeseries_plot(station, year, metric, title_info):
                 y=0.98, 
                 x=0.5
             ),
-            height=1060,
+            height=max(1060, 350 * n_rows),
             width=1510,
             template="plotly_dark",
-            showlegend=False,
+            showlegend=overlay_years,
             hovermode='closest',
             margin=dict(t=100, b=50, l=50, r=50)
         )
@@ -179,7 +185,7 @@ def create_timeseries_plot(station, year, metric, title_info):
             font=dict(size=14, color="red")
         )
         fig.update_layout(
-            title=f"Error - {station} ({year})",
+            title=f"Error - {station} ({start_date} to {end_date})",
             template='plotly_dark',
             height=1060,
             width=1510,
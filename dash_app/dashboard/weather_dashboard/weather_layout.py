@@ -1,11 +1,12 @@
 
 import numpy as np
+from datetime import date
 import pandas as pd
 from dash import dcc, html
+from ..metadata import get_metadata
 
-# Load airport metadata
-weather_metdata = f"gs://airport-weather-data/ncei-lcd-list-us.csv"
-df_station = pd.read_csv(weather_metdata, storage_options={"token": "flights-weather-project-f94d306bee1f.json"})
+# Load weather station metadata from the local snapshot
+df_station = get_metadata("stations")
 
 years = [2018, 2019, 2020, 2021, 2022, 2023, 2024]
 
@@ -132,14 +133,20 @@ weather_dashboard_layout = html.Div([
                         html.Div(id="weather-station-info-table", className="station-info-table", style={'margin-bottom': '20px'}),
                         html.Div([
                             html.Label('Data Exploration Settings', className="label"),
-                            dcc.Dropdown(
-                                id='weather-year-selector',
-                                options=[{'label': str(year), 'value': year} for year in years],
-                                value=2018,
-                                placeholder="Select Year",
-                                className="dropdown time-series-settings-dropdown",
-                                searchable=True,
-                                clearable=False
+                            dcc.DatePickerRange(
+                                id='weather-date-range',
+                                min_date_allowed=date(years[0], 1, 1),
+                                max_date_allowed=date(years[-1], 12, 31),
+                                start_date=date(years[0], 1, 1),
+                                end_date=date(years[0], 12, 31),
+                                display_format='YYYY-MM-DD',
+                                className="time-series-settings-dropdown"
+                            ),
+                            dcc.Checklist(
+                                id='weather-overlay-years',
+                                options=[{'label': ' Overlay years', 'value': 'overlay'}],
+                                value=[],
+                                className="time-series-settings-dropdown"
                             ),
                             dcc.Dropdown(
                                 id='weather-metric-selector',
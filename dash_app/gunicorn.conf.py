@@ -0,0 +1,36 @@
+import os
+import multiprocessing
+
+"""
+Gunicorn settings for serving the Dash app (see wsgi.py).
+
+Sizing:
+- workers: one per CPU core. Plotly figure builds and model predictions are CPU-bound and hold
+  the GIL, so more processes than cores only adds memory.
+- threads: several per worker (gthread). Most request time in the drill-down and prediction
+  callbacks is spent blocked on GCS reads and the weather API, which release the GIL, so
+  threads let a worker keep serving map and dropdown callbacks while those wait.
+- timeout: long enough for a cold per-airport CSV read from GCS plus the figure build.
+
+Every value can be overridden from the environment, e.g. WEB_CONCURRENCY=4 GUNICORN_THREADS=16.
+"""
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '8050')}")
+
+# Load wsgi.py (metadata frames and models) in the master so workers share it copy-on-write
+preload_app = True
+
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically so fragmentation from large figure builds does not accumulate
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = 100
+
+accesslog = "-"
+errorlog = "-"
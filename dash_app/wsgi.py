@@ -0,0 +1,23 @@
+import gc
+
+"""
+Production entry point for the Dash app under gunicorn:
+
+    cd dash_app && gunicorn -c gunicorn.conf.py wsgi:server
+
+With `preload_app = True` this module is imported once in the gunicorn master before the workers
+are forked, so the metadata frames and models loaded here are shared by every worker
+copy-on-write instead of each worker holding its own copy.
+"""
+
+from app import app, server
+from dashboard.metadata import load_all_metadata
+from dashboard.prediction_page.prediction_helpers import load_models
+
+# Load everything the callbacks share before fork
+load_all_metadata()
+load_models()
+
+# Move the loaded objects out of the garbage collector's tracked generations so collections in
+# the workers do not touch (and copy) the shared pages
+gc.freeze()
@@ -1,4 +1,7 @@
 
+import os
+import json
+import hashlib
 import calendar
 from pathlib import Path
 import concurrent.futures
@@ -59,6 +62,119 @@ def get_location_types(datasetid, token, startdate="2018-01-01", enddate="2024-1
     else:
         print("Error:", response.status_code, response.text)
 
+def _page_hash(records):
+    return hashlib.sha256(json.dumps(records, sort_keys=True).encode()).hexdigest()
+
+def _load_checkpoint(output_path, checkpoint_path):
+    """
+    Returns the pagination state to resume from. Rows appended after the last checkpoint (a page
+    written just before a crash) are cut from the output so they are not written twice.
+    """
+    state = {"batch": 0, "offset": 0, "last_hash": None, "rows": 0, "bytes": 0, "columns": None}
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            state.update(json.load(f))
+        if os.path.exists(output_path):
+            with open(output_path, "r+b") as f:
+                f.truncate(state["bytes"])
+        print(f"Resuming {output_path} at batch {state['batch']}, offset {state['offset']} "
+              f"({state['rows']} records already saved)")
+    elif os.path.exists(output_path):
+        # A finished file from an earlier run; start over as before
+        os.remove(output_path)
+    return state
+
+def _save_checkpoint(checkpoint_path, state):
+    with open(f"{checkpoint_path}.tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(f"{checkpoint_path}.tmp", checkpoint_path)
+
+def _append_page(records, output_path, state):
+    df = pd.json_normalize(records)
+    # Every page is written with the columns of the first one so the CSV stays rectangular
+    if state["columns"] is None:
+        state["columns"] = list(df.columns)
+    df = df.reindex(columns=state["columns"])
+
+    with open(output_path, "a", newline="") as f:
+        df.to_csv(f, header=state["bytes"] == 0, index=False)
+        f.flush()
+        os.fsync(f.fileno())
+    state["bytes"] = os.path.getsize(output_path)
+    state["rows"] += len(df)
+
+def _fetch_page(url, headers, params, max_retries=5, timeout=30):
+    """Fetches one page, retrying 500/503 responses and timeouts with exponential backoff. Returns the JSON or None."""
+    for attempts in range(1, max_retries + 1):
+        try:
+            response = requests.get(url, headers=headers, params=params, timeout=timeout)
+        except requests.exceptions.Timeout:
+            error = "Read timeout error"
+        else:
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code not in (500, 503):
+                print(f"Error: {response.status_code} - {response.text}")
+                return None
+            error = f"{response.status_code} Error"
+        wait_time = 2 ** attempts
+        print(f"{error}: Retrying in {wait_time} seconds (attempt {attempts})...")
+        time.sleep(wait_time)
+    print(f"Max retries reached at offset {params['offset']}.")
+    return None
+
+def fetch_pages(urls, headers, params, output_path, max_retries=5):
+    """
+    Pages through each URL in turn and appends every page to a CSV as soon as it arrives.
+
+    After each page the position (URL index, offset, hash of the last page) is saved to
+    {output_path}.checkpoint.json. If a request fails for good or the process dies, the next call
+    with the same output path resumes from the last saved page, and memory use does not grow
+    with the number of records. A page identical to the previous one (by hash) ends that URL's pages.
+
+    Parameters:
+    urls (list): Request URLs (with any repeated query parameters already in the query string).
+    headers (dict): Request headers, including the API token.
+    params (dict): Query parameters; must include 'limit'. 'offset' is set per page.
+    output_path (str): CSV the records are appended to.
+    max_retries (int): Attempts per page.
+
+    Returns:
+    int: Records written, or None if harvesting stopped early (call again to resume).
+    """
+    checkpoint_path = f"{output_path}.checkpoint.json"
+    state = _load_checkpoint(output_path, checkpoint_path)
+
+    for batch in range(state["batch"], len(urls)):
+        while True:
+            data = _fetch_page(urls[batch], headers, {**params, "offset": state["offset"]}, max_retries)
+            if data is None:
+                print(f"Stopped at offset {state['offset']} of request {batch + 1}/{len(urls)}; "
+                      f"run again to resume from there.")
+                return None
+
+            records = data.get("results", [])
+            page_hash = _page_hash(records) if records else None
+            duplicate = page_hash is not None and page_hash == state["last_hash"]
+            if duplicate:
+                print("Duplicate page detected. Moving on.")
+            elif records:
+                _append_page(records, output_path, state)
+                print(f"Fetched {len(records)} records with offset {state['offset']}")
+            else:
+                print("No more data available.")
+
+            last_page = duplicate or len(records) < params["limit"]
+            state["last_hash"] = page_hash
+            state["batch"], state["offset"] = (batch + 1, 0) if last_page else (batch, state["offset"] + params["limit"])
+            _save_checkpoint(checkpoint_path, state)
+            if last_page:
+                break
+            time.sleep(1)
+
+    os.remove(checkpoint_path)
+    return state["rows"]
+
 def get_location_data(datasetid, token, location_type, max_retries=5):
     url = "https://www.ncei.noaa.gov/cdo-web/api/v2/locations"
 
@@ -72,64 +188,11 @@ def get_location_data(datasetid, token, location_type, max_retries=5):
         "token": token
     }
 
-    all_data = []
-    offset = 0
-    last_batch = None
-    duplicate_count = 0
-
-    while True:
-        params["offset"] = offset
-        attempts = 0
-
-        while attempts < max_retries:
-            response = requests.get(url, headers=headers, params=params)
-
-            if response.status_code == 200:
-                data = response.json()
-                if "results" in data:
-                    current_batch = data["results"]
-
-                    if current_batch == last_batch:
-                        duplicate_count += 1
-                    else:
-                        duplicate_count = 0
-
-                    all_data.extend(current_batch)
-                    last_batch = current_batch
-                    print(f"Fetched {len(current_batch)} records with offset {offset}")
-
-                    if len(current_batch) < params["limit"] or duplicate_count >= 1:
-                        break
-                else:
-                    print("No more data available.")
-                    break
-
-                offset += params["limit"]
-                time.sleep(1)
-                break 
-
-            elif response.status_code == 503:
-                attempts += 1
-                wait_time = 2 ** attempts 
-                print(f"503 Error: Service Unavailable. Retrying in {wait_time} seconds...")
-                time.sleep(wait_time)
-
-            else:
-                print(f"Error: {response.status_code} - {response.text}")
-                return
-
-        if attempts == max_retries or (duplicate_count >= 1 and len(current_batch) < params["limit"]):
-            print("Max retries reached or duplicate batch confirmed as last. Exiting.")
-            break
-
-    if all_data:
-        df = pd.json_normalize(all_data)
-        
-        df.drop_duplicates(inplace=True)
-        df.to_csv(f"{datasetid}_{location_type}.csv", index=False)
-        print(f"Saved all data to {datasetid}_{location_type}.csv with {len(df)} records.")
-    
-    else:
+    output_path = f"{datasetid}_{location_type}.csv"
+    rows = fetch_pages([url], headers, params, output_path, max_retries)
+    if rows:
+        print(f"Saved all data to {output_path} with {rows} records.")
+    elif rows == 0:
         print("No data retrieved.")
 
 def get_us_data_batch(datasetid, token, startdate, enddate, country_fips=None, state_fips=None, city_id=None, max_retries=5):
@@ -150,114 +213,23 @@ def get_us_data_batch(datasetid, token, startdate, enddate, country_fips=None, s
         "token": token
     }
     
-    all_data = []
     max_batch_size = 10
-    last_batch = None
-    duplicate_count = 0
-
-    # Create batches if both state_fips and city_id are provided
-    if state_fips is not None and city_id is not None:
-        batches = [
-            state_fips[i:i + max_batch_size] for i in range(0, len(state_fips), max_batch_size)
-        ] + [
-            city_id[i:i + max_batch_size] for i in range(0, len(city_id), max_batch_size)
-        ]
-    else:
-        # Only include available location parameters if one or the other is missing
-        batches = [state_fips[i:i + max_batch_size] for i in range(0, len(state_fips), max_batch_size)] if state_fips else []
-        batches += [city_id[i:i + max_batch_size] for i in range(0, len(city_id), max_batch_size)] if city_id else []
 
-    # Process each batch
-    for batch in batches:
-        offset = 0
-        while True:
-            country_query = build_query("locationid", country_fips)
-            location_query = build_query("locationid", batch)
-            full_query = f"{country_query}&{location_query}"
+    # Batches of up to 10 state and/or city location IDs
+    batches = [state_fips[i:i + max_batch_size] for i in range(0, len(state_fips), max_batch_size)] if state_fips else []
+    batches += [city_id[i:i + max_batch_size] for i in range(0, len(city_id), max_batch_size)] if city_id else []
 
-            params["offset"] = offset
-            full_url = url + "?" + full_query
-            
-            attempts = 0
-            while attempts < max_retries:
-                try:
-                    response = requests.get(full_url, headers=headers, params=params, timeout=10)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        if "results" in data:
-                            current_batch = data["results"]
-
-                            if current_batch == last_batch:
-                                duplicate_count += 1
-                                print("Duplicate batch detected. Stopping further requests.")
-                                break
-                            else:
-                                duplicate_count = 0
-
-                            all_data.extend(current_batch)
-                            last_batch = current_batch 
-                            print(f"Fetched {len(current_batch)} records with offset {offset}")
-
-                            if len(current_batch) < params["limit"]:
-                                break
-                        
-                        else:
-                            print("No more data found.")
-                            break
-                        
-                        offset += params["limit"]
-                        time.sleep(1)
-                        break
-
-                    elif response.status_code == 500:
-                        attempts += 1
-                        wait_time = 2 ** attempts
-                        print(f"500 Error: Retrying in {wait_time} seconds (attempt {attempts})...")
-                        time.sleep(wait_time)
-                        if attempts == max_retries:
-                            print("Max retries reached for 500 Error. Skipping this batch.")
-                            break
-
-                    elif response.status_code == 503:
-                        attempts += 1
-                        wait_time = 2 ** attempts 
-                        print(f"503 Error: Retrying in {wait_time} seconds (attempt {attempts})...")
-                        time.sleep(wait_time)
-                        if attempts == max_retries:
-                            print("Max retries reached for 503 Error. Skipping this batch.")
-                            break
-
-                    else:
-                        print(f"Error: {response.status_code} - {response.text}")
-                        return
-
-                except requests.exceptions.ReadTimeout:
-                    attempts += 1
-                    wait_time = 2 ** attempts 
-                    print(f"Read timeout error: Retrying in {wait_time} seconds (attempt {attempts})...")
-                    time.sleep(wait_time)
-                    if attempts == max_retries:
-                        print("Max retries reached for Read Timeout. Skipping this batch.")
-                        break
-
-            if attempts == max_retries or duplicate_count >= 1:
-                print("Max retries reached or duplicate batch confirmed as last. Exiting.")
-                break
-
-        if duplicate_count >= 1:
-            break
+    # One request URL per batch (the country filter alone if no batches were given)
+    country_query = build_query("locationid", country_fips)
+    urls = [url + "?" + f"{country_query}&{build_query('locationid', batch)}" for batch in batches or [[]]]
 
-    # Save the data if retrieved
-    if all_data:
-        df = pd.json_normalize(all_data)
-        df.drop_duplicates(inplace=True)
-        
-        print("Total unique records fetched:", len(df))
-        df.to_csv(f"{datasetid}_{startdate}_{enddate}_US_data.csv", index=False)
-        print(f"Saved data to {datasetid}_{startdate}_{enddate}_US_data.csv")
+    output_path = f"{datasetid}_{startdate}_{enddate}_US_data.csv"
+    rows = fetch_pages(urls, headers, params, output_path, max_retries)
+    if rows:
+        print("Total records fetched:", rows)
+        print(f"Saved data to {output_path}")
         print(f"Time Taken: {time.time() - start}")
-    else:
+    elif rows == 0:
         print("No data retrieved.")
 
 def scrape_interval(datasetid, token, interval_start, interval_end, country_fips, state_fips, city_id):
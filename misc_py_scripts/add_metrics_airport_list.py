@@ -1,16 +1,16 @@
 
+import os
+import sys
 import pandas as pd
-import gcsfs
 import dask.dataframe as dd
 
-# Initialize Google Cloud Storage FileSystem
-fs = gcsfs.GCSFileSystem(project='Flights-Weather-Project', token='flights-weather-project-f94d306bee1f.json')
+# The repo root provides the shared storage layer
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import storage
 
-# Load large dataset from Google Cloud Storage
-df = dd.read_csv(
-    "gs://airport-weather-data/airport-weather-data.csv", 
-    storage_options={"token": "flights-weather-project-f94d306bee1f.json"}
-)
+# Load large dataset from the data bucket
+data_path = storage.url("airport-weather-data.csv")
+df = dd.read_csv(data_path, storage_options=storage.storage_options(data_path))
 
 # Columns in the dataset
 print(df.columns)
@@ -34,11 +34,8 @@ metrics_df = metrics_df.rename(columns={
 }).reset_index()
 
 # Load airport metadata for name lookup
-airport_metadata = "gs://airport-weather-data/airports-list-us.csv"
-df_airport = pd.read_csv(
-    airport_metadata,
-    storage_options={"token": "flights-weather-project-f94d306bee1f.json"},
-)
+airport_metadata = storage.url("airports-list-us.csv")
+df_airport = storage.read_csv(airport_metadata)
 
 # Merge metrics with airport metadata
 df_airport = df_airport.merge(
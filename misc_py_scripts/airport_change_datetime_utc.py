@@ -29,16 +29,6 @@ CSV File Requirements:
   'CRSDepTime', 'DepTime', 'CRSArrTime', 'ArrTime', 'WheelsOn', and 'WheelsOff'.
 """
 
-# Check command-line arguments
-if len(sys.argv) != 4:
-    print("Usage: python3 airport_change_datetime_utc.py <metadata_path> <input_directory> <output_directory>")
-    sys.exit(1)
-
-# Assign command-line arguments to variables
-metadata_path = sys.argv[1]
-input_directory = sys.argv[2]
-output_directory = sys.argv[3]
-
 # Initialize TimezoneFinder
 tf = TimezoneFinder()
 
@@ -110,44 +100,58 @@ def convert_to_utc(df, time_col, date_col, lat, lon):
     df['UTC_' + time_col] = df.apply(local_to_utc, axis=1)
     return df
 
-# Load airport metadata
-print("Loading airport metadata...")
-airport_meta = pd.read_csv(metadata_path)
-print("Airport metadata loaded successfully")
-
-# Ensure the output directory exists
-os.makedirs(output_directory, exist_ok=True)
-
-# Process each CSV file in the input directory
-for filename in os.listdir(input_directory):
-    if filename.endswith('.csv'):
-        input_filepath = os.path.join(input_directory, filename)
-        output_filepath = os.path.join(output_directory, filename)
+def main():
+    # Check command-line arguments
+    if len(sys.argv) != 4:
+        print("Usage: python3 airport_change_datetime_utc.py <metadata_path> <input_directory> <output_directory>")
+        sys.exit(1)
+
+    # Assign command-line arguments to variables
+    metadata_path = sys.argv[1]
+    input_directory = sys.argv[2]
+    output_directory = sys.argv[3]
+
+    # Load airport metadata
+    print("Loading airport metadata...")
+    airport_meta = pd.read_csv(metadata_path)
+    print("Airport metadata loaded successfully")
+
+    # Ensure the output directory exists
+    os.makedirs(output_directory, exist_ok=True)
+
+    # Process each CSV file in the input directory
+    for filename in os.listdir(input_directory):
+        if filename.endswith('.csv'):
+            input_filepath = os.path.join(input_directory, filename)
+            output_filepath = os.path.join(output_directory, filename)
         
-        print(f"\nProcessing {input_filepath}")
-        df = pd.read_csv(input_filepath, low_memory=False)
+            print(f"\nProcessing {input_filepath}")
+            df = pd.read_csv(input_filepath, low_memory=False)
         
-        # Extract the airport ID from the filename
-        airport_id = int(filename.split('.')[0])
+            # Extract the airport ID from the filename
+            airport_id = int(filename.split('.')[0])
         
-        # Get latitude and longitude for the current airport ID
-        if airport_id in airport_meta['AIRPORT_ID'].values:
-            lat = airport_meta.loc[airport_meta['AIRPORT_ID'] == airport_id, 'LATITUDE'].values[0]
-            lon = airport_meta.loc[airport_meta['AIRPORT_ID'] == airport_id, 'LONGITUDE'].values[0]
-            print(f"Found coordinates for airport ID {airport_id}: LAT={lat}, LON={lon}")
+            # Get latitude and longitude for the current airport ID
+            if airport_id in airport_meta['AIRPORT_ID'].values:
+                lat = airport_meta.loc[airport_meta['AIRPORT_ID'] == airport_id, 'LATITUDE'].values[0]
+                lon = airport_meta.loc[airport_meta['AIRPORT_ID'] == airport_id, 'LONGITUDE'].values[0]
+                print(f"Found coordinates for airport ID {airport_id}: LAT={lat}, LON={lon}")
             
-            # Convert relevant time columns to UTC
-            time_columns = ['CRSDepTime', 'DepTime', 'CRSArrTime', 'ArrTime']
-            for col in time_columns:
-                df = convert_to_utc(df, col, 'FlightDate', lat, lon)
+                # Convert relevant time columns to UTC
+                time_columns = ['CRSDepTime', 'DepTime', 'CRSArrTime', 'ArrTime']
+                for col in time_columns:
+                    df = convert_to_utc(df, col, 'FlightDate', lat, lon)
             
-            # Drop the original time columns and keep only the UTC versions
-            df = df.drop(columns=time_columns + ['FlightDate'], errors='ignore')
+                # Drop the original time columns and keep only the UTC versions
+                df = df.drop(columns=time_columns + ['FlightDate'], errors='ignore')
             
-            # Save the modified DataFrame to the output directory
-            df.to_csv(output_filepath, index=False)
-            print(f"Processed and saved {output_filepath}")
-        else:
-            print(f"Coordinates not found for airport ID {airport_id}. Skipping file {filename}.")
+                # Save the modified DataFrame to the output directory
+                df.to_csv(output_filepath, index=False)
+                print(f"Processed and saved {output_filepath}")
+            else:
+                print(f"Coordinates not found for airport ID {airport_id}. Skipping file {filename}.")
+
+    print("\nUTC conversion complete. All processed CSV files saved.")
 
-print("\nUTC conversion complete. All processed CSV files saved.")
+if __name__ == "__main__":
+    main()
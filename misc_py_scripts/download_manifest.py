@@ -0,0 +1,139 @@
+import os
+import sqlite3
+import time
+
+"""
+Persistent record of what the scrapers have downloaded, so reruns only fetch the difference.
+
+The manifest is a SQLite file with one row per URL: local path, size, ETag, Last-Modified,
+sha256, status ("ok" or "failed"), the last error and when the row was written. Before a run,
+`plan` sorts the jobs:
+
+- new URLs, failed ones and ones whose local file is gone or has the wrong size are fetched;
+- URLs already downloaded are requested conditionally (If-None-Match / If-Modified-Since), so an
+  unchanged file costs a 304 and no body; with `revalidate=False` they are skipped without any
+  request.
+
+`downloader.download_all(..., manifest=...)` applies the plan and records every result as it
+arrives, so an interrupted run keeps everything it finished. Several processes may share one
+manifest; SQLite serializes their writes.
+
+Usage:
+    from download_manifest import DownloadManifest
+    with DownloadManifest("csv_downloads/manifest.sqlite") as manifest:
+        results = download_files(csv_links, "csv_downloads/2023", manifest=manifest)
+        print(manifest.summary())
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    url TEXT PRIMARY KEY,
+    path TEXT,
+    size INTEGER,
+    etag TEXT,
+    last_modified TEXT,
+    sha256 TEXT,
+    status TEXT,
+    error TEXT,
+    updated REAL
+)
+"""
+COLUMNS = ["url", "path", "size", "etag", "last_modified", "sha256", "status", "error", "updated"]
+
+class DownloadManifest:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(SCHEMA)
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def get(self, url):
+        """Returns the manifest row of a URL as a dict, or None."""
+        row = self.connection.execute(f"SELECT {', '.join(COLUMNS)} FROM downloads WHERE url = ?", (url,)).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def is_current(self, entry, path):
+        """Whether `path` still holds the file the manifest recorded as downloaded."""
+        return (entry is not None and entry["status"] == "ok" and os.path.exists(path)
+                and os.path.getsize(path) == entry["size"])
+
+    def plan(self, jobs, revalidate=True):
+        """
+        Splits download jobs into the ones to run and the ones already satisfied.
+
+        Parameters:
+        jobs (list): downloader job dicts ("url", "path", ...).
+        revalidate (bool): Request already downloaded files conditionally instead of skipping them.
+
+        Returns:
+        tuple: (jobs to run, results for the skipped jobs)
+        """
+        pending, skipped = [], []
+        for job in jobs:
+            entry = self.get(job["url"])
+            if not self.is_current(entry, job["path"]):
+                pending.append(job)
+            elif revalidate:
+                headers = dict(job.get("headers") or {})
+                if entry["etag"]:
+                    headers["If-None-Match"] = entry["etag"]
+                if entry["last_modified"]:
+                    headers["If-Modified-Since"] = entry["last_modified"]
+                pending.append({**job, "headers": headers})
+            else:
+                skipped.append(self.result(entry, job, "skipped"))
+        return pending, skipped
+
+    def result(self, entry, job, status):
+        """Builds a downloader result for a job served from the manifest."""
+        return {"url": job["url"], "path": job["path"], "status": status, "size": entry["size"],
+                "sha256": entry["sha256"], "etag": entry["etag"], "last_modified": entry["last_modified"],
+                "error": None}
+
+    def record(self, result):
+        """Stores a downloader result. Unchanged (304) files keep their recorded checksum."""
+        if result["status"] in ("unchanged", "skipped"):
+            self.connection.execute("UPDATE downloads SET updated = ? WHERE url = ?", (time.time(), result["url"]))
+        elif result["status"] == "failed":
+            # Keep what is known about an earlier good copy; only the status and error change
+            self.connection.execute(
+                "INSERT INTO downloads (url, path, status, error, updated) VALUES (?, ?, 'failed', ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET status = 'failed', error = excluded.error, updated = excluded.updated",
+                (result["url"], result["path"], result["error"], time.time())
+            )
+        else:
+            row = {**{column: result.get(column) for column in COLUMNS}, "status": "ok", "error": None,
+                   "updated": time.time()}
+            self.connection.execute(
+                f"INSERT OR REPLACE INTO downloads ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                [row[column] for column in COLUMNS]
+            )
+        self.connection.commit()
+
+    def failed(self):
+        """Returns the URLs whose last download failed."""
+        return [url for (url,) in self.connection.execute("SELECT url FROM downloads WHERE status = 'failed'")]
+
+    def missing(self, urls):
+        """Returns the URLs that have no complete, verified file on disk."""
+        missing = []
+        for url in urls:
+            entry = self.get(url)
+            if entry is None or not self.is_current(entry, entry["path"]):
+                missing.append(url)
+        return missing
+
+    def summary(self):
+        """Returns {status: number of URLs}."""
+        return dict(self.connection.execute("SELECT status, COUNT(*) FROM downloads GROUP BY status").fetchall())
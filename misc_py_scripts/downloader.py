@@ -0,0 +1,288 @@
+import os
+import sys
+import random
+import asyncio
+import hashlib
+import logging
+import argparse
+import aiohttp
+from tqdm import tqdm
+from download_manifest import DownloadManifest
+
+"""
+Concurrent HTTP downloader for the NCEI/BTS scrapers, replacing one `wget` process per file.
+
+All downloads share one aiohttp session:
+- The connection pool is bounded (`max_connections`) and each host gets at most `per_host`
+  concurrent connections, so a large file list neither floods the server nor spawns processes.
+- Bodies are streamed to `{path}.part` and renamed into place once complete. An interrupted
+  download resumes from the end of its .part file with an HTTP Range request. Bodies are requested
+  with `Accept-Encoding: identity`, so sizes, checksums and ranges all count the bytes on disk.
+- Each file is checked against the Content-Length the server announced and, when the job gives
+  them, the expected size and sha256.
+- Connection errors, timeouts, 408/429 and 5xx responses are retried with exponential backoff
+  and jitter (honouring Retry-After); other 4xx responses fail immediately.
+
+A job is a dict with "url" and "path", plus optional "size", "sha256" and request "headers".
+Every result carries "url", "path", "status", "size", "sha256", "etag", "last_modified" and
+"error". The status is "ok" or "failed", or "unchanged" when a conditional request got a 304. With
+a DownloadManifest (download_manifest.py) it can also be "skipped", for files already downloaded.
+
+Usage:
+    from downloader import download_files
+    results = download_files(csv_links, "csv_downloads/2023")
+
+    python downloader.py urls.txt csv_downloads/2023 --per-host 8 --manifest csv_downloads/manifest.sqlite
+"""
+
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+CHUNK_SIZE = 1 << 20
+
+class DownloadError(Exception):
+    def __init__(self, message, retry=True, retry_after=None):
+        super().__init__(message)
+        self.retry = retry
+        self.retry_after = retry_after
+
+def job_for(url, output_folder):
+    """Returns the job saving `url` under its file name in `output_folder`."""
+    return {"url": url, "path": os.path.join(output_folder, url.split('?')[0].rstrip('/').split('/')[-1])}
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After", "")
+    return float(value) if value.isdigit() else None
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest
+
+def _write(f, digest, data):
+    f.write(data)
+    digest.update(data)
+
+async def _fetch(session, job):
+    """One download attempt: streams (or resumes) job['url'] into job['path'] and verifies it."""
+    path = job["path"]
+    part_path = f"{path}.part"
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = dict(job.get("headers") or {})
+    # Without a Content-Encoding the size check, sha256 and Range offsets all count the bytes on disk
+    headers["Accept-Encoding"] = "identity"
+    if offset:
+        # Validators describe the complete file, not the partial one being resumed
+        headers.pop("If-None-Match", None)
+        headers.pop("If-Modified-Since", None)
+        headers["Range"] = f"bytes={offset}-"
+
+    async with session.get(job["url"], headers=headers) as response:
+        if response.status == 304:
+            return {"status": "unchanged"}
+        if response.status == 416 and offset:
+            # The .part file does not match the remote object any more
+            os.remove(part_path)
+            raise DownloadError(f"range {offset}- not satisfiable, restarting")
+        if response.status in RETRY_STATUSES:
+            raise DownloadError(f"HTTP {response.status}", retry_after=_retry_after(response))
+        if response.status >= 400:
+            raise DownloadError(f"HTTP {response.status}", retry=False)
+
+        # A server that ignores Accept-Encoding sends sizes and ranges of the encoded body, which
+        # aiohttp decodes; such a body is neither checked against them nor resumed
+        encoded = response.headers.get("Content-Encoding", "identity").lower() != "identity"
+        if response.status == 206 and encoded:
+            os.remove(part_path)
+            raise DownloadError("encoded partial response, restarting")
+        if response.status == 206:
+            # Hashing a large partial file in a thread keeps the other downloads streaming
+            digest = await asyncio.to_thread(_hash_file, part_path)
+            mode = "ab"
+            # Content-Range: bytes start-end/total
+            total = response.headers.get("Content-Range", "").rpartition("/")[2]
+            expected = int(total) if total.isdigit() else None
+        else:
+            # A 200 to a Range request means the server sent the whole body again
+            digest = hashlib.sha256()
+            mode = "wb"
+            offset = 0
+            expected = None if encoded else response.content_length
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        try:
+            with open(part_path, mode) as f:
+                # Blocks are gathered to CHUNK_SIZE and written and hashed off the event loop
+                buffer = bytearray()
+                try:
+                    async for block in response.content.iter_chunked(CHUNK_SIZE):
+                        buffer += block
+                        if len(buffer) >= CHUNK_SIZE:
+                            data = bytes(buffer)
+                            buffer.clear()
+                            await asyncio.to_thread(_write, f, digest, data)
+                    data = bytes(buffer)
+                    buffer.clear()
+                    await asyncio.to_thread(_write, f, digest, data)
+                finally:
+                    # Bytes received before a failure stay in the .part file for the resume
+                    f.write(buffer)
+        except BaseException:
+            if encoded:
+                os.remove(part_path)
+            raise
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+
+    size = os.path.getsize(part_path)
+    target = expected if expected is not None else job.get("size")
+    if target is not None and size < target:
+        # Keep the .part file so the retry resumes where this attempt stopped
+        raise DownloadError(f"connection closed after {size} of {target} bytes")
+
+    problems = []
+    if expected is not None and size != expected:
+        problems.append(f"got {size} bytes, server announced {expected}")
+    if job.get("size") is not None and size != job["size"]:
+        problems.append(f"got {size} bytes, expected {job['size']}")
+    if job.get("sha256") and digest.hexdigest() != job["sha256"]:
+        problems.append("sha256 mismatch")
+    if problems:
+        os.remove(part_path)
+        raise DownloadError(", ".join(problems))
+
+    os.replace(part_path, path)
+    return {"status": "ok", "size": size, "sha256": digest.hexdigest(), "etag": etag, "last_modified": last_modified}
+
+async def download(session, job, retries=5, backoff=1.0, max_backoff=60.0, logger=None):
+    """
+    Downloads one job with retries.
+
+    Parameters:
+    session (aiohttp.ClientSession): Shared session (see `download_all`).
+    job (dict): "url", "path" and optionally "size", "sha256" and "headers".
+    retries (int): Attempts before the job is reported as failed.
+    backoff (float): Delay before the first retry; doubled on each further retry.
+    max_backoff (float): Upper bound of the delay between retries.
+    logger (logging.Logger): Where progress and failures are logged.
+
+    Returns:
+    dict: The job's result.
+    """
+    logger = logger or logging.getLogger("downloader")
+    result = {"url": job["url"], "path": job["path"], "status": "failed", "size": None, "sha256": None,
+              "etag": None, "last_modified": None, "error": None}
+    for attempt in range(1, retries + 1):
+        try:
+            result.update(await _fetch(session, job), error=None)
+            if result["status"] == "unchanged":
+                logger.info(f"Unchanged: {job['url']}")
+            else:
+                logger.info(f"Downloaded {job['url']} -> {job['path']} ({result['size']} bytes)")
+            return result
+        except (DownloadError, aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            result["error"] = str(e) or type(e).__name__
+            if isinstance(e, DownloadError) and not e.retry or attempt == retries:
+                break
+            delay = getattr(e, "retry_after", None) or min(max_backoff, backoff * 2 ** (attempt - 1))
+            delay *= random.uniform(1, 1.5)
+            logger.warning(f"Attempt {attempt}/{retries} failed for {job['url']}: {result['error']}; "
+                           f"retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    logger.error(f"Failed to download {job['url']}: {result['error']}")
+    return result
+
+async def download_all(jobs, max_connections=32, per_host=8, timeout=300, retries=5, backoff=1.0,
+                       logger=None, progress=True, manifest=None, revalidate=True, session=None):
+    """
+    Downloads every job concurrently over one bounded connection pool.
+
+    Parameters:
+    jobs (list): Job dicts (see `job_for`).
+    max_connections (int): Connections open at once, across all hosts.
+    per_host (int): Connections open at once to any one host.
+    timeout (float): Seconds without receiving data before an attempt is abandoned.
+    retries (int): Attempts per job.
+    backoff (float): Initial retry delay in seconds.
+    logger (logging.Logger): Where progress and failures are logged.
+    progress (bool): Show a tqdm progress bar.
+    manifest (DownloadManifest): Skip or conditionally request files it records as downloaded,
+        and record every result in it.
+    revalidate (bool): With a manifest, request recorded files conditionally instead of skipping them.
+    session (aiohttp.ClientSession): Session to use instead of creating one.
+
+    Returns:
+    list: One result per job, in job order.
+    """
+    if session is None:
+        connector = aiohttp.TCPConnector(limit=max_connections, limit_per_host=per_host)
+        client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as session:
+            return await download_all(jobs, max_connections, per_host, timeout, retries, backoff,
+                                      logger, progress, manifest, revalidate, session)
+
+    results = {}
+    if manifest is not None:
+        pending, skipped = manifest.plan(jobs, revalidate=revalidate)
+        results.update((result["url"], result) for result in skipped)
+    else:
+        pending = jobs
+
+    # Only as many jobs in flight as there are connections, so queued ones do not time out waiting
+    slots = asyncio.Semaphore(max_connections)
+    bar = tqdm(total=len(pending), desc="Downloading", disable=not progress)
+
+    async def run(job):
+        async with slots:
+            result = await download(session, job, retries=retries, backoff=backoff, logger=logger)
+        if manifest is not None:
+            if result["status"] == "unchanged":
+                result = manifest.result(manifest.get(job["url"]), job, "unchanged")
+            manifest.record(result)
+        results[job["url"]] = result
+        bar.update()
+
+    try:
+        await asyncio.gather(*(run(job) for job in pending))
+    finally:
+        bar.close()
+    return [results[job["url"]] for job in jobs]
+
+def download_files(urls, output_folder, **kwargs):
+    """
+    Downloads URLs into `output_folder` (named after the last path segment); see `download_all`
+    for the keyword arguments.
+
+    Returns:
+    list: One result dict per URL.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    return asyncio.run(download_all([job_for(url, output_folder) for url in urls], **kwargs))
+
+def main():
+    parser = argparse.ArgumentParser(description="Download a list of URLs concurrently.")
+    parser.add_argument("url_file", help="Text file with one URL per line")
+    parser.add_argument("output_folder")
+    parser.add_argument("--max-connections", type=int, default=32)
+    parser.add_argument("--per-host", type=int, default=8)
+    parser.add_argument("--retries", type=int, default=5)
+    parser.add_argument("--manifest", help="SQLite manifest; files it records as downloaded are only refetched if changed")
+    parser.add_argument("--no-revalidate", action="store_true", help="With --manifest, skip recorded files without any request")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    with open(args.url_file) as f:
+        urls = [line.strip() for line in f if line.strip()]
+    manifest = DownloadManifest(args.manifest) if args.manifest else None
+    results = download_files(urls, args.output_folder, max_connections=args.max_connections,
+                             per_host=args.per_host, retries=args.retries, manifest=manifest,
+                             revalidate=not args.no_revalidate)
+    if manifest is not None:
+        print(f"Manifest: {manifest.summary()}")
+        manifest.close()
+    failed = [result["url"] for result in results if result["status"] == "failed"]
+    print(f"Downloaded {len(results) - len(failed)}/{len(results)} files into {args.output_folder}")
+    if failed:
+        sys.exit(f"{len(failed)} downloads failed: {failed[:10]}")
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,29 @@
-
 import sys
 import os
+import csv
 from glob import glob
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import reverse_geocoder as rg
 import ast
 
-# Check if year is provided as a command-line argument
-if len(sys.argv) < 2:
-    print("Usage: python fetch_metadata.py <year>")
-    sys.exit(1)
+"""
+Builds ncei-lcd-list-{year}.csv: one row per station CSV in {year}/, with its coordinates,
+elevation and reverse-geocoded place, US stations only.
+
+- Only the header and first row of each station file are read, since the metadata columns repeat
+  on every row. The csv module is used rather than `pd.read_csv(nrows=1, usecols=...)`, whose
+  parser setup costs more than reading the two lines. Files are read in a process pool.
+- Reverse geocoding results are cached by station in reverse_geocode_cache.csv, next to the year
+  folders. Later runs (other years) only geocode new stations or ones whose coordinates changed.
 
-# Get year from command-line argument
-year = sys.argv[1]
+Usage:
+    python fetch_metadata.py <year>
+"""
+
+METADATA_COLUMNS = ["STATION", "LATITUDE", "LONGITUDE", "NAME", "ELEVATION"]
+GEOCODE_CACHE = "reverse_geocode_cache.csv"
+GEOCODE_FIELDS = ["lat", "lon", "name", "admin1", "admin2", "cc"]
 
 # Function to safely parse coordinates
 def parse_coord(item):
@@ -23,105 +33,158 @@ def parse_coord(item):
     except (ValueError, SyntaxError):
         # Return None if the format is incorrect
         return None
-    
-# Define the main directory
-main_dir = os.getcwd()
-os.chdir(f"{main_dir}/{year}")
 
-# List CSV files
-files = glob("*.csv")
+def read_metadata(file):
+    """Returns {column: value} of the METADATA_COLUMNS in a station file's first row, as strings."""
+    with open(file, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        row = next(reader, None)
+    if row is None:
+        raise ValueError("no data rows")
+    values = dict(zip(header, row))
+    return {col: values[col] for col in METADATA_COLUMNS}
+
+def to_float(value):
+    return float(value) if value.strip() else float("nan")
 
 # Function to process each file and extract required data
 def process_file(file):
     try:
-        df = pd.read_csv(file, low_memory=False)
+        metadata = read_metadata(file)
         return {
-            "station": df["STATION"][0],
-            "coords": (df["LATITUDE"][0], df["LONGITUDE"][0]),
-            "station_name": df["NAME"][0],
-            "elevation": df["ELEVATION"][0]
+            "station": metadata["STATION"],
+            "coords": (to_float(metadata["LATITUDE"]), to_float(metadata["LONGITUDE"])),
+            "station_name": metadata["NAME"],
+            "elevation": to_float(metadata["ELEVATION"])
         }
     except Exception as e:
         print(f"Error processing {file}: {e}")
         return None
 
-# Initialize list to store results
-results = []
-
-# Parallel processing of files in chunks
-with ThreadPoolExecutor(max_workers=10) as executor:
-    future_to_file = {executor.submit(process_file, file): file for file in files}
-    for i, future in enumerate(as_completed(future_to_file), 1):
-        file = future_to_file[future]
-        print(f"Currently at file: {file}. At: {i} out of {len(files)}")
-        result = future.result()
-        if result:
-            results.append(result)
-
-# Change back to the main directory
-os.chdir(main_dir)
-
-# Create DataFrame from results
-result_df = pd.DataFrame(results)
-
-# Filter and parse coordinates
-coordinates = []
-valid_indices = []
-for idx, item in enumerate(result_df["coords"]):
-    coord = parse_coord(str(item))  # Ensure item is a string for parsing
-    if coord is not None:
-        coordinates.append(coord)
-        valid_indices.append(idx)
-
-# Filter result to keep only rows with valid coordinates
-df_valid = result_df.iloc[valid_indices].reset_index(drop=True)
-
-# Perform reverse geocoding on the valid coordinates
-reverse_geocode = rg.search(coordinates)
-
-# Extract geocode results
-latitude = [i["lat"] for i in reverse_geocode]
-longitude = [i["lon"] for i in reverse_geocode]
-names = [i["name"] for i in reverse_geocode]
-admin1 = [i["admin1"] for i in reverse_geocode]
-admin2 = [i["admin2"] for i in reverse_geocode]
-countries = [i["cc"] for i in reverse_geocode]
-
-# Create the final DataFrame with geocoded information
-result_df = pd.DataFrame({
-    "station": df_valid["station"].values,
-    "station_name": df_valid["station_name"].values,
-    "coords": df_valid["coords"].values,
-    "elevation": df_valid["elevation"].values,
-    "latitude": latitude,
-    "longitude": longitude,
-    "names": names,
-    "admin1": admin1,
-    "admin2": admin2,
-    "country": countries
-})
-
-# Filtering to only US data
-result_df = result_df[result_df["country"] == "US"]
-
-# Mapping of state names to two-letter codes
-state_code_map = {
-    'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA', 
-    'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'Florida': 'FL', 'Georgia': 'GA', 
-    'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA', 'Kansas': 'KS', 
-    'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD', 'Massachusetts': 'MA', 
-    'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS', 'Missouri': 'MO', 'Montana': 'MT', 
-    'Nebraska': 'NE', 'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ', 'New Mexico': 'NM', 
-    'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH', 'Oklahoma': 'OK', 
-    'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC', 'South Dakota': 'SD', 
-    'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT', 'Virginia': 'VA', 'Washington': 'WA', 
-    'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY', 'Washington, D.C.': 'DC'
-}
-
-# Map the state names to state codes and add as a new column
-result_df['state'] = result_df['admin1'].map(state_code_map)
-
-# Save result to CSV
-print("Saving result.")
-result_df.to_csv(f"ncei-lcd-list-{year}.csv", index=False)
-print("Completed metadata extraction.")
\ No newline at end of file
+def load_geocode_cache(path):
+    """Returns {station: {"coords": (lat, lon) searched, "lat": ..., "cc": ...}} from the cache file."""
+    if not os.path.exists(path):
+        return {}
+    cache = pd.read_csv(path, dtype=str, keep_default_na=False)
+    return {
+        row["station"]: {"coords": (float(row["query_lat"]), float(row["query_lon"])),
+                         **{field: row[field] for field in GEOCODE_FIELDS}}
+        for row in cache.to_dict("records")
+    }
+
+def save_geocode_cache(cache, path):
+    pd.DataFrame([
+        {"station": station, "query_lat": entry["coords"][0], "query_lon": entry["coords"][1],
+         **{field: entry[field] for field in GEOCODE_FIELDS}}
+        for station, entry in cache.items()
+    ]).to_csv(path, index=False)
+
+def reverse_geocode(stations, coordinates, cache):
+    """
+    Reverse geocodes station coordinates, searching only stations missing from `cache` (or whose
+    coordinates changed) and adding them to it.
+
+    Returns:
+    list: One reverse_geocoder result dict per station.
+    """
+    missing = {station: coords for station, coords in zip(stations, coordinates)
+               if station not in cache or cache[station]["coords"] != coords}
+    print(f"Reverse geocoding {len(missing)} stations ({len(stations) - len(missing)} cached).")
+    if missing:
+        for (station, coords), found in zip(missing.items(), rg.search(list(missing.values()))):
+            cache[station] = {"coords": coords, **{field: found[field] for field in GEOCODE_FIELDS}}
+    return [cache[station] for station in stations]
+
+def main():
+    # Check if year is provided as a command-line argument
+    if len(sys.argv) < 2:
+        print("Usage: python fetch_metadata.py <year>")
+        sys.exit(1)
+
+    # Get year from command-line argument
+    year = sys.argv[1]
+
+    # List CSV files
+    main_dir = os.getcwd()
+    files = glob(os.path.join(main_dir, year, "*.csv"))
+
+    # Header-only reads in parallel processes; chunks keep the per-file overhead low
+    results = []
+    with ProcessPoolExecutor() as executor:
+        for i, result in enumerate(executor.map(process_file, files, chunksize=64), 1):
+            if i % 1000 == 0 or i == len(files):
+                print(f"Processed {i} out of {len(files)} files")
+            if result:
+                results.append(result)
+
+    # Create DataFrame from results
+    result_df = pd.DataFrame(results, columns=["station", "coords", "station_name", "elevation"])
+
+    # Filter and parse coordinates
+    coordinates = []
+    valid_indices = []
+    for idx, item in enumerate(result_df["coords"]):
+        coord = parse_coord(str(item))  # Ensure item is a string for parsing
+        if coord is not None:
+            coordinates.append(coord)
+            valid_indices.append(idx)
+
+    # Filter result to keep only rows with valid coordinates
+    df_valid = result_df.iloc[valid_indices].reset_index(drop=True)
+
+    # Perform reverse geocoding on the valid coordinates, reusing earlier runs' results
+    cache_path = os.path.join(main_dir, GEOCODE_CACHE)
+    cache = load_geocode_cache(cache_path)
+    reverse_geocode_results = reverse_geocode(list(df_valid["station"]), coordinates, cache)
+    save_geocode_cache(cache, cache_path)
+
+    # Extract geocode results
+    latitude = [i["lat"] for i in reverse_geocode_results]
+    longitude = [i["lon"] for i in reverse_geocode_results]
+    names = [i["name"] for i in reverse_geocode_results]
+    admin1 = [i["admin1"] for i in reverse_geocode_results]
+    admin2 = [i["admin2"] for i in reverse_geocode_results]
+    countries = [i["cc"] for i in reverse_geocode_results]
+
+    # Create the final DataFrame with geocoded information
+    result_df = pd.DataFrame({
+        "station": df_valid["station"].values,
+        "station_name": df_valid["station_name"].values,
+        "coords": df_valid["coords"].values,
+        "elevation": df_valid["elevation"].values,
+        "latitude": latitude,
+        "longitude": longitude,
+        "names": names,
+        "admin1": admin1,
+        "admin2": admin2,
+        "country": countries
+    })
+
+    # Filtering to only US data
+    result_df = result_df[result_df["country"] == "US"]
+
+    # Mapping of state names to two-letter codes
+    state_code_map = {
+        'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
+        'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'Florida': 'FL', 'Georgia': 'GA',
+        'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA', 'Kansas': 'KS',
+        'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD', 'Massachusetts': 'MA',
+        'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS', 'Missouri': 'MO', 'Montana': 'MT',
+        'Nebraska': 'NE', 'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ', 'New Mexico': 'NM',
+        'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH', 'Oklahoma': 'OK',
+        'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC', 'South Dakota': 'SD',
+        'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT', 'Virginia': 'VA', 'Washington': 'WA',
+        'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY', 'Washington, D.C.': 'DC'
+    }
+
+    # Map the state names to state codes and add as a new column
+    result_df['state'] = result_df['admin1'].map(state_code_map)
+
+    # Save result to CSV
+    print("Saving result.")
+    result_df.to_csv(f"ncei-lcd-list-{year}.csv", index=False)
+    print("Completed metadata extraction.")
+
+if __name__ == "__main__":
+    main()
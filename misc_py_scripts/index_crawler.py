@@ -0,0 +1,163 @@
+import re
+import sys
+import random
+import asyncio
+import logging
+import argparse
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urldefrag
+import aiohttp
+
+"""
+Lists NCEI file URLs by reading the server's directory listings directly over HTTP.
+
+The pages the scrapers used to drive with Selenium (".../index.html#v2/access/2023/") are a
+JavaScript table rendered over a plain directory listing (".../v2/access/2023/"). Fetching that
+listing and collecting its <a href> targets returns the same links in one request per directory,
+with no browser, page clicks or sleeps. Directories are fetched concurrently over one aiohttp
+session, and with `depth` > 0 sub-directories (e.g. the year folders under v2/access/) are
+followed too.
+
+`parse_links` is a pure function of the HTML, so it can be checked against saved listing pages.
+
+Usage:
+    from index_crawler import crawl_links
+    links = crawl_links(["https://www.ncei.noaa.gov/oa/local-climatological-data/v2/access/2023/"], r"\\.csv$")
+
+    python index_crawler.py https://www.ncei.noaa.gov/oa/local-climatological-data/v2/access/ --depth 1 --pattern "\\.csv$"
+"""
+
+LCD_ROOT = "https://www.ncei.noaa.gov/oa/local-climatological-data/"
+ACCESS_ROOT = f"{LCD_ROOT}v2/access/"
+ARCHIVE_ROOT = f"{LCD_ROOT}v2/archive/"
+
+class LinkParser(HTMLParser):
+    """Collects the href of every <a> tag, resolved against the page URL."""
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        href = dict(attrs).get("href")
+        if href and not href.startswith(("#", "?", "mailto:", "javascript:")):
+            self.links.append(urldefrag(urljoin(self.base_url, href))[0])
+
+def listing_url(url):
+    """Maps an index.html#... viewer URL to the directory listing behind it (with a trailing slash)."""
+    url = url.replace("/index.html#", "/")
+    return url if url.endswith("/") else f"{url}/"
+
+def parse_links(html, base_url, pattern=None):
+    """
+    Returns the absolute link targets of a listing page, in page order and without duplicates.
+    Column-sort links ("?C=N;O=D") and links to the page's own directory or its parents are dropped.
+
+    Parameters:
+    html (str): The listing page.
+    base_url (str): URL the page was served from, for resolving relative links.
+    pattern (str): Regex the links must match (e.g. r"\\.csv$"); None keeps every link.
+    """
+    parser = LinkParser(base_url)
+    parser.feed(html)
+    regex = re.compile(pattern) if pattern else None
+    directory = listing_url(base_url)
+    links = dict.fromkeys(link for link in parser.links
+                          if not directory.startswith(link) and (regex is None or regex.search(link)))
+    return list(links)
+
+def subdirectories(links, base_url):
+    """Returns the links pointing to directories below `base_url` (not parents or other sites)."""
+    return [link for link in links if link.endswith("/") and link.startswith(base_url) and link != base_url]
+
+async def fetch_listing(session, url, retries=5, backoff=1.0, logger=None):
+    """Fetches one listing page, retrying connection errors and 5xx/429 responses with backoff."""
+    logger = logger or logging.getLogger("index_crawler")
+    for attempt in range(1, retries + 1):
+        try:
+            async with session.get(url) as response:
+                if response.status < 400:
+                    return await response.text()
+                if response.status not in (408, 429) and response.status < 500:
+                    response.raise_for_status()
+                error = f"HTTP {response.status}"
+        except aiohttp.ClientResponseError:
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = str(e) or type(e).__name__
+        if attempt == retries:
+            raise RuntimeError(f"Could not list {url}: {error}")
+        delay = backoff * 2 ** (attempt - 1) * random.uniform(1, 1.5)
+        logger.warning(f"Listing {url} failed ({error}); retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+async def crawl(urls, pattern=None, depth=0, max_connections=16, per_host=8, retries=5, logger=None):
+    """
+    Lists the files in each directory URL, concurrently.
+
+    Parameters:
+    urls (list): Directory (or index.html#...) URLs.
+    pattern (str): Regex the returned file links must match.
+    depth (int): Levels of sub-directories to follow below each URL.
+    max_connections (int): Connections open at once.
+    per_host (int): Connections open at once to one host.
+    retries (int): Attempts per listing page.
+    logger (logging.Logger): Where progress and failures are logged.
+
+    Returns:
+    dict: {directory URL: [file links]} for every directory listed; directories that could not be
+        listed map to None.
+    """
+    logger = logger or logging.getLogger("index_crawler")
+    regex = re.compile(pattern) if pattern else None
+    listings = {}
+    connector = aiohttp.TCPConnector(limit=max_connections, limit_per_host=per_host)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def visit(url, level):
+            if url in listings:
+                return
+            listings[url] = None
+            try:
+                links = parse_links(await fetch_listing(session, url, retries=retries, logger=logger), url)
+            except Exception as e:
+                logger.error(f"Failed to list {url}: {e}")
+                return
+            listings[url] = [link for link in links if not link.endswith("/") and (regex is None or regex.search(link))]
+            logger.info(f"Listed {url}: {len(listings[url])} files")
+            if level < depth:
+                await asyncio.gather(*(visit(sub, level + 1) for sub in subdirectories(links, url)))
+
+        await asyncio.gather(*(visit(listing_url(url), 0) for url in urls))
+    return listings
+
+def crawl_links(urls, pattern=None, depth=0, **kwargs):
+    """Synchronous `crawl`; see there for the arguments."""
+    return asyncio.run(crawl(urls, pattern, depth, **kwargs))
+
+def main():
+    parser = argparse.ArgumentParser(description="List file links from HTTP directory listings.")
+    parser.add_argument("urls", nargs="+", help="Directory or index.html#... URLs")
+    parser.add_argument("--pattern", help="Regex the file links must match")
+    parser.add_argument("--depth", type=int, default=0, help="Levels of sub-directories to follow")
+    parser.add_argument("--out", help="Write the links here (one per line) instead of stdout")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    listings = crawl_links(args.urls, args.pattern, args.depth)
+    links = [link for files in listings.values() if files for link in files]
+    failed = [url for url, files in listings.items() if files is None]
+
+    out = open(args.out, "w") if args.out else sys.stdout
+    out.writelines(f"{link}\n" for link in links)
+    if args.out:
+        out.close()
+    print(f"Found {len(links)} links in {len(listings) - len(failed)} directories", file=sys.stderr)
+    if failed:
+        sys.exit(f"Could not list {len(failed)} directories: {failed[:10]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import os
+import sys
+import zipfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+"""
+Splits BTS on-time performance months into per-airport Parquet shards, reading only the columns
+the pipeline keeps.
+
+process_airport_data_by_origin.py / split_large_airport.py extract every zip, parse all ~120
+columns of each month into pandas, then drop `columns_to_drop` and the trailing 48 diversion
+columns. This script parses the surviving columns only (`usecols` with compact dtypes), so the
+dropped ones are never materialized:
+
+- Each CSV member is read straight out of its zip. The zips also hold a readme.html, so the member
+  is opened explicitly rather than with compression="zip". Already extracted CSVs
+  (transtat_downloader.py's default) are read too.
+- Each month is parsed in chunks. Every chunk's rows are appended to `{out_dir}/{OriginAirportID}/
+  {month}.parquet`, one shard per airport and month, so memory stays at one chunk.
+- Months are processed in parallel worker processes. Each month writes only its own shards, which
+  are renamed into place once complete, so a rerun skips the months it already finished.
+
+`read_airport(out_dir, airport_id)` loads one airport's shards. `--csv DIR` also writes the
+`{AIRPORT_ID}.csv` files that airport_change_datetime_utc.py reads.
+
+Usage:
+    python ingest_bts_zips.py airport-data airport_shards --workers 4
+    python ingest_bts_zips.py airport-data airport_shards --csv airport_merged
+"""
+
+# Columns left after process_airport_data_by_origin.py's drops, in file order
+BTS_DTYPES = {
+    "DayOfWeek": "int8",
+    "FlightDate": "str",
+    "Marketing_Airline_Network": "str",
+    "Flight_Number_Operating_Airline": "int32",
+    "OriginAirportID": "int32",
+    "OriginCityName": "str",
+    "DestAirportID": "int32",
+    "DestCityName": "str",
+    "CRSDepTime": "int16",
+    "DepTime": "float32",
+    "TaxiOut": "float32",
+    "TaxiIn": "float32",
+    "CRSArrTime": "int16",
+    "ArrTime": "float32",
+    "Cancelled": "float32",
+    "CRSElapsedTime": "float32",
+    "ActualElapsedTime": "float32",
+    "Distance": "float32",
+    "CarrierDelay": "float32",
+    "WeatherDelay": "float32",
+    "NASDelay": "float32",
+    "SecurityDelay": "float32",
+    "LateAircraftDelay": "float32",
+}
+BTS_COLUMNS = list(BTS_DTYPES)
+CHUNK_ROWS = 500_000
+
+def source_files(input_dir):
+    """Returns the .zip and .csv files below `input_dir`, preferring a month's .csv over its .zip."""
+    sources = {}
+    for root, _, files in os.walk(input_dir):
+        for file in sorted(files):
+            stem, ext = os.path.splitext(file)
+            if ext in (".zip", ".csv") and (ext == ".csv" or stem not in sources):
+                sources[stem] = os.path.join(root, file)
+    return [sources[stem] for stem in sorted(sources)]
+
+def open_csv(path):
+    """Opens a month's CSV, from inside its zip if `path` is one."""
+    if not path.endswith(".zip"):
+        return open(path, "rb")
+    archive = zipfile.ZipFile(path)
+    members = [name for name in archive.namelist() if name.lower().endswith(".csv")]
+    if not members:
+        raise ValueError(f"No CSV in {path} ({archive.namelist()})")
+    # The member keeps the archive open until it is closed
+    return archive.open(members[0])
+
+def shard_path(out_dir, airport_id, month):
+    return os.path.join(out_dir, str(airport_id), f"{month}.parquet")
+
+def ingest_file(path, out_dir, chunksize=CHUNK_ROWS):
+    """
+    Appends one month's flights to its per-airport shards.
+
+    Parameters:
+    path (str): A BTS zip or extracted CSV.
+    out_dir (str): Root of the {OriginAirportID}/{month}.parquet shards.
+    chunksize (int): Rows parsed at a time.
+
+    Returns:
+    tuple: (number of rows, number of airports)
+    """
+    month = os.path.splitext(os.path.basename(path))[0]
+    writers = {}
+    rows = 0
+    try:
+        with open_csv(path) as f:
+            for chunk in pd.read_csv(f, usecols=BTS_COLUMNS, dtype=BTS_DTYPES, chunksize=chunksize):
+                rows += len(chunk)
+                for airport_id, group in chunk[BTS_COLUMNS].groupby("OriginAirportID", sort=False):
+                    table = pa.Table.from_pandas(group, preserve_index=False)
+                    if airport_id not in writers:
+                        target = shard_path(out_dir, airport_id, month)
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        writers[airport_id] = pq.ParquetWriter(f"{target}.tmp", table.schema)
+                    writers[airport_id].write_table(table)
+    except Exception:
+        for writer in writers.values():
+            writer.close()
+        for airport_id in writers:
+            os.remove(f"{shard_path(out_dir, airport_id, month)}.tmp")
+        raise
+
+    for airport_id, writer in writers.items():
+        writer.close()
+        target = shard_path(out_dir, airport_id, month)
+        os.replace(f"{target}.tmp", target)
+    # An empty marker records the month as done, also for airports it has no flights from
+    os.makedirs(os.path.join(out_dir, "_done"), exist_ok=True)
+    open(os.path.join(out_dir, "_done", month), "w").close()
+    return rows, len(writers)
+
+def ingest(paths, out_dir, workers=4, chunksize=CHUNK_ROWS):
+    """
+    Ingests months in parallel, skipping the ones a previous run finished.
+
+    Returns:
+    dict: {path: (rows, airports) or the exception that stopped it}
+    """
+    os.makedirs(os.path.join(out_dir, "_done"), exist_ok=True)
+    done = set(os.listdir(os.path.join(out_dir, "_done")))
+    pending = [path for path in paths if os.path.splitext(os.path.basename(path))[0] not in done]
+    print(f"Ingesting {len(pending)} of {len(paths)} months ({len(paths) - len(pending)} already done)")
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(ingest_file, path, out_dir, chunksize): path for path in pending}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                results[path] = future.result()
+                print(f"Processed {path}: {results[path][0]} rows, {results[path][1]} airports")
+            except Exception as e:
+                results[path] = e
+                print(f"Unable to process {path}: {e}")
+    return results
+
+def airport_ids(out_dir):
+    return sorted(int(name) for name in os.listdir(out_dir) if name.isdigit())
+
+def read_airport(out_dir, airport_id, columns=None):
+    """Returns all of an airport's flights as one DataFrame, in month order."""
+    directory = os.path.join(out_dir, str(airport_id))
+    shards = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".parquet"))
+    return pd.concat([pd.read_parquet(shard, columns=columns) for shard in shards], ignore_index=True)
+
+def write_csvs(out_dir, csv_dir):
+    """Writes each airport's shards as `{csv_dir}/{AIRPORT_ID}.csv`, the splitter scripts' output."""
+    os.makedirs(csv_dir, exist_ok=True)
+    for airport_id in airport_ids(out_dir):
+        filepath = os.path.join(csv_dir, f"{airport_id}.csv")
+        read_airport(out_dir, airport_id).to_csv(filepath, index=False)
+        print(f"Saved {filepath}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Split BTS month zips into per-airport Parquet shards.")
+    parser.add_argument("input_dir", help="Directory of BTS zips or CSVs (e.g. transtat_downloader.py's output)")
+    parser.add_argument("out_dir", help="Root of the {OriginAirportID}/{month}.parquet shards")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--csv", help="Also write one {AIRPORT_ID}.csv per airport into this directory")
+    args = parser.parse_args()
+
+    results = ingest(source_files(args.input_dir), args.out_dir, workers=args.workers, chunksize=args.chunksize)
+    failed = [path for path, result in results.items() if isinstance(result, Exception)]
+    if args.csv:
+        write_csvs(args.out_dir, args.csv)
+    if failed:
+        sys.exit(f"Failed months: {failed}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+import os
+import sys
+import json
+import time
+import queue
+import random
+import argparse
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+import requests
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+"""
+Parallel harvester for the NCEI CDO web API (cdo-web/api/v2/data) across a pool of API tokens.
+
+`get_us_data_batch` in NCEI_API.py pages one query at a time with a fixed sleep, and
+`parallel_scrape_year` pins one token to each month. Here all tokens serve one shared work queue:
+
+- Work is split into units of (dataset, location batch, date interval, offset). The first page of
+  an interval reports the total record count, so every remaining page is queued at once and pages
+  are fetched in parallel instead of one after another.
+- Each token has a token bucket enforcing the CDO quota (5 requests/second, 10,000/day). A request
+  takes whichever token can send soonest, so throughput follows the combined quota of all tokens.
+- The number of requests in flight adapts (AIMD): it grows by one after a window of successful
+  requests and halves on a 429 or 503, and the token that got the 429 is paused.
+- Records are appended to Parquet files under `{out_dir}/{datasetid}/`, so
+  `pd.read_parquet(f"{out_dir}/{datasetid}")` reads the whole harvest. Units that still fail after
+  retries are written to `{out_dir}/{datasetid}_failed_units.jsonl`.
+
+Usage:
+    NCEI_TOKENS=token1,token2,token3 python ncei_harvester.py PRECIP_15 2018-01-01 2018-12-31 \
+        --locations stats/state_per_data/PRECIP_15_ST.csv --country FIPS:US --out ncei_harvest
+"""
+
+API_URL = "https://www.ncei.noaa.gov/cdo-web/api/v2/data"
+PAGE_LIMIT = 1000
+REQUESTS_PER_SECOND = 5
+REQUESTS_PER_DAY = 10_000
+
+WorkUnit = namedtuple("WorkUnit", ["datasetid", "locations", "startdate", "enddate", "offset", "attempt"])
+
+RECORD_SCHEMA = pa.schema([
+    ("date", pa.string()),
+    ("datatype", pa.string()),
+    ("station", pa.string()),
+    ("attributes", pa.string()),
+    ("value", pa.float64()),
+])
+
+class TokenBucket:
+    """Rate limiter for one API token: `rate` requests per second (bursts up to `capacity`) and a daily cap."""
+    def __init__(self, rate=REQUESTS_PER_SECOND, capacity=None, daily_limit=REQUESTS_PER_DAY):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.daily_limit = daily_limit
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.used_today = 0
+        self.day = datetime.now(timezone.utc).date()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        today = datetime.now(timezone.utc).date()
+        if today != self.day:
+            self.day, self.used_today = today, 0
+
+    def wait_time(self, now):
+        """Seconds until a request may be sent (inf once the daily quota is used up)."""
+        self._refill(now)
+        if self.used_today >= self.daily_limit:
+            return float("inf")
+        return max(self.paused_until - now, (1 - self.tokens) / self.rate, 0.0)
+
+    def take(self):
+        self.tokens -= 1
+        self.used_today += 1
+
+class TokenPool:
+    """Hands out the API token that can send a request soonest."""
+    def __init__(self, tokens, rate=REQUESTS_PER_SECOND, daily_limit=REQUESTS_PER_DAY):
+        self.buckets = {token: TokenBucket(rate, daily_limit=daily_limit) for token in tokens}
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until some token is under its rate limit, and returns it (None once all daily quotas are spent)."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                wait, token = min((bucket.wait_time(now), token) for token, bucket in self.buckets.items())
+                if wait == float("inf"):
+                    return None
+                if wait == 0:
+                    self.buckets[token].take()
+                    return token
+            time.sleep(min(wait, 1.0))
+
+    def pause(self, token, seconds):
+        """Stops handing out a token that was rate limited by the server."""
+        with self.lock:
+            bucket = self.buckets[token]
+            bucket.paused_until = max(bucket.paused_until, time.monotonic() + seconds)
+            bucket.tokens = 0
+
+class AdaptiveLimit:
+    """
+    Concurrency limit with additive increase / multiplicative decrease: +1 after `limit`
+    consecutive successes, halved on a throttling response.
+    """
+    def __init__(self, initial, minimum=1, maximum=64):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.active = 0
+        self.successes = 0
+        self.condition = threading.Condition()
+
+    def __enter__(self):
+        with self.condition:
+            self.condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    def __exit__(self, *exc):
+        with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+    def success(self):
+        with self.condition:
+            self.successes += 1
+            if self.successes >= self.limit and self.limit < self.maximum:
+                self.limit += 1
+                self.successes = 0
+                self.condition.notify_all()
+
+    def throttled(self):
+        with self.condition:
+            self.limit = max(self.minimum, self.limit // 2)
+            self.successes = 0
+
+class ParquetSink:
+    """Buffers records and appends them to `{out_dir}/{datasetid}/` as Parquet files of `flush_rows` rows."""
+    def __init__(self, out_dir, datasetid, flush_rows=200_000):
+        self.directory = os.path.join(out_dir, datasetid)
+        os.makedirs(self.directory, exist_ok=True)
+        self.prefix = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.flush_rows = flush_rows
+        self.buffer = []
+        self.parts = 0
+        self.rows = 0
+        self.lock = threading.Lock()
+
+    def write(self, records):
+        with self.lock:
+            self.buffer.extend(records)
+            if len(self.buffer) >= self.flush_rows:
+                self._flush()
+
+    def _flush(self):
+        if not self.buffer:
+            return
+        frame = pd.DataFrame.from_records(self.buffer).reindex(columns=RECORD_SCHEMA.names)
+        frame["value"] = pd.to_numeric(frame["value"], errors="coerce")
+        table = pa.Table.from_pandas(frame, schema=RECORD_SCHEMA, preserve_index=False)
+        path = os.path.join(self.directory, f"part-{self.prefix}-{self.parts:05d}.parquet")
+        pq.write_table(table, f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        self.parts += 1
+        self.rows += len(frame)
+        self.buffer = []
+
+    def close(self):
+        with self.lock:
+            self._flush()
+
+def date_intervals(startdate, enddate, days=2):
+    """Splits [startdate, enddate] into consecutive intervals of `days` days (inclusive bounds)."""
+    start = datetime.strptime(startdate, "%Y-%m-%d")
+    end = datetime.strptime(enddate, "%Y-%m-%d")
+    intervals = []
+    while start <= end:
+        interval_end = min(start + timedelta(days=days - 1), end)
+        intervals.append((start.strftime("%Y-%m-%d"), interval_end.strftime("%Y-%m-%d")))
+        start = interval_end + timedelta(days=1)
+    return intervals
+
+def work_units(datasetid, startdate, enddate, locations=None, country_fips=None, batch_size=10, interval_days=2):
+    """
+    Returns the first-page work units of a harvest: one per (location batch, date interval).
+
+    Parameters:
+    datasetid (str): CDO dataset, e.g. 'GHCND' or 'PRECIP_15'.
+    startdate (str): First day, YYYY-MM-DD.
+    enddate (str): Last day, YYYY-MM-DD.
+    locations (list): CDO location IDs (e.g. 'FIPS:06', 'CITY:US060013'), queried `batch_size` at a time.
+    country_fips (list): Location IDs added to every query (e.g. ['FIPS:US']).
+    batch_size (int): Location IDs per request.
+    interval_days (int): Days per request interval.
+    """
+    batches = [tuple(locations[i:i + batch_size]) for i in range(0, len(locations), batch_size)] if locations else [()]
+    prefix = tuple(country_fips or ())
+    return [WorkUnit(datasetid, prefix + batch, start, end, 0, 0)
+            for batch in batches for start, end in date_intervals(startdate, enddate, interval_days)]
+
+def _request(unit, token, timeout):
+    params = [("datasetid", unit.datasetid), ("startdate", unit.startdate), ("enddate", unit.enddate),
+              ("limit", PAGE_LIMIT), ("offset", unit.offset)]
+    params += [("locationid", location) for location in unit.locations]
+    return requests.get(API_URL, headers={"token": token}, params=params, timeout=timeout)
+
+def harvest(units, tokens, out_dir, datasetid, max_workers=None, max_retries=5, timeout=60,
+            rate=REQUESTS_PER_SECOND, daily_limit=REQUESTS_PER_DAY):
+    """
+    Fetches every page of the given work units with all tokens, appending the records to Parquet.
+
+    Parameters:
+    units (list): WorkUnits from `work_units`.
+    tokens (list): CDO API tokens.
+    out_dir (str): Output directory.
+    datasetid (str): Dataset name, used for the output paths.
+    max_workers (int): Upper bound of requests in flight (default: 4 per token).
+    max_retries (int): Attempts per page before the unit is recorded as failed.
+    timeout (float): Request timeout in seconds.
+    rate (float): Requests per second allowed per token.
+    daily_limit (int): Requests per day allowed per token.
+
+    Returns:
+    dict: Counts of pages fetched, records written and failed units.
+    """
+    max_workers = max_workers or 4 * len(tokens)
+    pool = TokenPool(tokens, rate=rate, daily_limit=daily_limit)
+    limit = AdaptiveLimit(initial=max(1, len(tokens)), maximum=max_workers)
+    sink = ParquetSink(out_dir, datasetid)
+    work = queue.Queue()
+    failed = []
+    stats = {"pages": 0, "records": 0, "failed_units": 0}
+    stats_lock = threading.Lock()
+    for unit in units:
+        work.put(unit)
+
+    def give_up(unit, reason):
+        print(f"Giving up on {unit}: {reason}")
+        with stats_lock:
+            failed.append({**unit._asdict(), "error": reason})
+
+    def retry(unit, reason, delay):
+        if unit.attempt + 1 >= max_retries:
+            give_up(unit, reason)
+            return
+        time.sleep(min(60, delay * random.uniform(1, 1.5)))
+        work.put(unit._replace(attempt=unit.attempt + 1))
+
+    def worker():
+        while True:
+            unit = work.get()
+            if unit is None:
+                work.task_done()
+                return
+            try:
+                response, error = None, None
+                with limit:
+                    token = pool.acquire()
+                    if token is not None:
+                        try:
+                            response = _request(unit, token, timeout)
+                        except requests.exceptions.RequestException as e:
+                            error = str(e) or type(e).__name__
+                if token is None:
+                    give_up(unit, "daily quota of every token used up")
+                    continue
+                if error is not None:
+                    limit.throttled()
+                    retry(unit, error, 2 ** unit.attempt)
+                    continue
+
+                if response.status_code in (429, 503):
+                    limit.throttled()
+                    retry_after = response.headers.get("Retry-After", "")
+                    pause = float(retry_after) if retry_after.isdigit() else 2 ** unit.attempt
+                    if response.status_code == 429:
+                        pool.pause(token, pause)
+                    retry(unit, f"HTTP {response.status_code}", pause)
+                    continue
+                if response.status_code >= 500:
+                    retry(unit, f"HTTP {response.status_code}", 2 ** unit.attempt)
+                    continue
+                if response.status_code != 200:
+                    give_up(unit, f"HTTP {response.status_code}: {response.text[:200]}")
+                    continue
+
+                limit.success()
+                data = response.json()
+                records = data.get("results", [])
+                if records:
+                    sink.write(records)
+                if unit.offset == 0:
+                    # The first page knows the total count: queue every other page of this interval now
+                    count = data.get("metadata", {}).get("resultset", {}).get("count", 0)
+                    for offset in range(PAGE_LIMIT, count, PAGE_LIMIT):
+                        work.put(unit._replace(offset=offset, attempt=0))
+                with stats_lock:
+                    stats["pages"] += 1
+                    stats["records"] += len(records)
+                    if stats["pages"] % 100 == 0:
+                        print(f"Fetched {stats['pages']} pages, {stats['records']} records "
+                              f"({work.qsize()} queued, concurrency {limit.limit})")
+            except Exception as e:
+                retry(unit, f"{type(e).__name__}: {e}", 2 ** unit.attempt)
+            finally:
+                work.task_done()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max_workers)]
+    for thread in threads:
+        thread.start()
+    work.join()
+    for _ in threads:
+        work.put(None)
+    for thread in threads:
+        thread.join()
+    sink.close()
+
+    if failed:
+        failed_path = os.path.join(out_dir, f"{datasetid}_failed_units.jsonl")
+        with open(failed_path, "a") as f:
+            f.writelines(json.dumps(unit) + "\n" for unit in failed)
+        print(f"{len(failed)} units failed; see {failed_path}")
+    stats["failed_units"] = len(failed)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Harvest NCEI CDO data with a pool of API tokens.")
+    parser.add_argument("datasetid")
+    parser.add_argument("startdate", help="YYYY-MM-DD")
+    parser.add_argument("enddate", help="YYYY-MM-DD")
+    parser.add_argument("--tokens", default=os.environ.get("NCEI_TOKENS", ""),
+                        help="Comma-separated API tokens (default: $NCEI_TOKENS)")
+    parser.add_argument("--locations", help="CSV with an 'id' column of CDO location IDs (e.g. state_per_data/*_ST.csv)")
+    parser.add_argument("--country", action="append", help="Location ID added to every query, e.g. FIPS:US")
+    parser.add_argument("--interval-days", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=10, help="Location IDs per request")
+    parser.add_argument("--max-workers", type=int)
+    parser.add_argument("--out", default="ncei_harvest")
+    args = parser.parse_args()
+
+    tokens = [token.strip() for token in args.tokens.split(",") if token.strip()]
+    if not tokens:
+        sys.exit("No API tokens given (--tokens or NCEI_TOKENS)")
+    locations = list(pd.read_csv(args.locations)["id"]) if args.locations else None
+
+    units = work_units(args.datasetid, args.startdate, args.enddate, locations, args.country,
+                       batch_size=args.batch_size, interval_days=args.interval_days)
+    print(f"Harvesting {args.datasetid} with {len(tokens)} tokens: {len(units)} work units")
+    start = time.time()
+    stats = harvest(units, tokens, args.out, args.datasetid, max_workers=args.max_workers)
+    print(f"Fetched {stats['pages']} pages and {stats['records']} records in {time.time() - start:.0f}s "
+          f"({stats['failed_units']} failed units)")
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
 
-import gcsfs
+import os
+import sys
 import dask.dataframe as dd
 import pandas as pd
 
-# Initialize Google Cloud Storage FileSystem
-fs = gcsfs.GCSFileSystem(project='Flights-Weather-Project', token='flights-weather-project-f94d306bee1f.json')
+# The repo root provides the shared storage layer
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import storage
 
-# Load the dataset from Google Cloud Storage
-df = dd.read_csv("gs://airport-weather-data/airport-weather-data.csv", storage_options={"token": "flights-weather-project-f94d306bee1f.json"})
+# Load the dataset from the data bucket
+data_path = storage.url("airport-weather-data.csv")
+df = dd.read_csv(data_path, storage_options=storage.storage_options(data_path))
 
 # Select only the necessary columns
 df_subset = df[['OriginAirportID', 'DestAirportID', 'Distance']].drop_duplicates()
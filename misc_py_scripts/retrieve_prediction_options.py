@@ -1,14 +1,18 @@
 
-import gcsfs
+import os
+import sys
 import dask.dataframe as dd
 import pandas as pd
 
-# Initialize Google Cloud Storage FileSystem
-fs = gcsfs.GCSFileSystem(project='Flights-Weather-Project', token='flights-weather-project-f94d306bee1f.json')
+# The repo root provides the shared storage layer
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import storage
 
 # Load merged dataset and airport metadata
-df = dd.read_csv("gs://airport-weather-data/airport-weather-data.csv", storage_options={"token": "flights-weather-project-f94d306bee1f.json"})
-df_airport = dd.read_csv("gs://airport-weather-data/airports-list-us.csv", storage_options={"token": "flights-weather-project-f94d306bee1f.json"})
+data_path = storage.url("airport-weather-data.csv")
+airport_path = storage.url("airports-list-us.csv")
+df = dd.read_csv(data_path, storage_options=storage.storage_options(data_path))
+df_airport = dd.read_csv(airport_path, storage_options=storage.storage_options(airport_path))
 
 # Extract unique airline options
 airlines = df['Marketing_Airline_Network'].drop_duplicates().compute()
@@ -0,0 +1,224 @@
+import os
+import sys
+import time
+import random
+import shutil
+import zipfile
+import calendar
+import argparse
+import tempfile
+import threading
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+
+"""
+Downloads BTS TranStats on-time performance months without a browser.
+
+scrape_raw_airport_data.py / collect_transtat_data.py drive a Selenium session through the
+DL_SelectFields.aspx form one month at a time, sleeping 5 s per month, and leave zips in the
+browser's Downloads folder. The form is a plain ASP.NET WebForms page, so this script does what the
+browser did: GET the page once per worker to read its hidden state (__VIEWSTATE, __EVENTVALIDATION,
+...) and field checkboxes, then POST it back with the year, month, "download zip" and every field
+selected.
+
+- Several months are downloaded concurrently, one requests.Session per worker thread.
+- The response is streamed into a spooled temporary file (kept in memory up to 64 MB), and its CSV
+  member is extracted straight to `{out_dir}/{year}/{year}_{MM}.csv`, the layout
+  process_airport_data_by_origin.py / split_large_airport.py read. With --zip the zip itself is
+  kept as `{year}_{MM}.zip` instead, for ingest_bts_zips.py to read the needed columns from.
+- Months already on disk are skipped, so an interrupted backfill resumes.
+- Failed requests and non-zip responses are retried with exponential backoff.
+
+Usage:
+    python transtat_downloader.py 2018 2023 airport-data --workers 4
+    python transtat_downloader.py 2024 2024 airport-data --months 1 2 3
+    python transtat_downloader.py 2018 2023 airport-data --zip
+"""
+
+FORM_URL = "https://www.transtats.bts.gov/DL_SelectFields.aspx?gnoyr_VQ=FGK&QO_fu146_anzr=b0-gvzr"
+SPOOL_BYTES = 64 * 2**20
+
+class FormParser(HTMLParser):
+    """Collects the <input> elements and the <select> options of an HTML form page."""
+    def __init__(self):
+        super().__init__()
+        self.inputs = []
+        self.selects = {}
+        self._select = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "input" and attrs.get("name"):
+            self.inputs.append(attrs)
+        elif tag == "select" and attrs.get("name"):
+            self._select = attrs["name"]
+            self.selects[self._select] = []
+        elif tag == "option" and self._select is not None:
+            self.selects[self._select].append([attrs.get("value"), ""])
+
+    def handle_data(self, data):
+        if self._select is not None and self.selects[self._select] and not self.selects[self._select][-1][1]:
+            self.selects[self._select][-1][1] = data.strip()
+
+    def handle_endtag(self, tag):
+        if tag == "select":
+            self._select = None
+
+def parse_form(html):
+    """
+    Returns the POST fields of the download form: hidden state, every field checkbox plus the
+    "download zip" and "show nulls" options, and the download button.
+
+    Returns:
+    tuple: (fields dict, {select name: [(value, text), ...]})
+    """
+    parser = FormParser()
+    parser.feed(html)
+    fields = {}
+    for attrs in parser.inputs:
+        name, kind = attrs["name"], attrs.get("type", "text").lower()
+        if kind == "hidden":
+            fields[name] = attrs.get("value", "")
+        elif kind == "checkbox":
+            # Every data field, as the Selenium script ticked; of the option boxes only these two
+            if "chk" not in name or name in ("chkDownloadZip", "chkshowNull"):
+                fields[name] = attrs.get("value", "on")
+        elif kind == "submit" and name == "btnDownload":
+            fields[name] = attrs.get("value", "Download")
+    selects = {name: [(value, text) for value, text in options] for name, options in parser.selects.items()}
+    return fields, selects
+
+def option_value(options, wanted, labels=()):
+    """Returns the value of the option whose value or text is `wanted` (or one of `labels`)."""
+    for value, text in options:
+        if str(wanted) in (value, text) or text in labels:
+            return value
+    raise ValueError(f"No option {wanted!r} in {[text for _, text in options]}")
+
+def output_path(out_dir, year, month, ext="csv"):
+    return os.path.join(out_dir, str(year), f"{year}_{month:02d}.{ext}")
+
+_local = threading.local()
+
+def _session_form(url, timeout):
+    """Returns this thread's session and the form it last loaded, loading it on first use."""
+    if getattr(_local, "form", None) is None:
+        _local.session = requests.Session()
+        response = _local.session.get(url, timeout=timeout)
+        response.raise_for_status()
+        _local.form = parse_form(response.text)
+    return _local.session, _local.form
+
+def download_month(year, month, out_dir, url=FORM_URL, retries=5, timeout=600, extract=True):
+    """
+    Downloads one month and extracts its CSV into `output_path(out_dir, year, month)` (or, without
+    `extract`, saves the zip as `output_path(out_dir, year, month, "zip")`).
+
+    Returns:
+    str: The output path (months already on disk return it too).
+    """
+    path = output_path(out_dir, year, month, "csv" if extract else "zip")
+    if os.path.exists(path):
+        return path
+
+    for attempt in range(1, retries + 1):
+        try:
+            session, (fields, selects) = _session_form(url, timeout)
+            data = dict(fields)
+            data["cboYear"] = option_value(selects["cboYear"], year)
+            data["cboPeriod"] = option_value(selects["cboPeriod"], month, labels=(calendar.month_name[month],))
+
+            with session.post(url, data=data, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+                with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as spool:
+                    for block in response.iter_content(chunk_size=2**20):
+                        spool.write(block)
+                    spool.seek(0)
+                    if spool.read(2) != b"PK":
+                        raise ValueError("response is not a zip file (form state may have expired)")
+                    spool.seek(0)
+                    if extract:
+                        _extract_csv(spool, path)
+                    else:
+                        _save_zip(spool, path)
+            return path
+        except (requests.RequestException, ValueError, zipfile.BadZipFile) as e:
+            # Reload the form on the next attempt in case its state expired
+            _local.form = None
+            if attempt == retries:
+                raise RuntimeError(f"{year}-{month:02d}: {e}") from e
+            delay = min(60, 2 ** attempt) * random.uniform(1, 1.5)
+            print(f"{year}-{month:02d}: attempt {attempt} failed ({e}); retrying in {delay:.0f}s")
+            time.sleep(delay)
+
+def _extract_csv(zip_file, path):
+    with zipfile.ZipFile(zip_file) as archive:
+        members = [name for name in archive.namelist() if name.lower().endswith(".csv")]
+        if not members:
+            raise ValueError(f"no CSV in the zip ({archive.namelist()})")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with archive.open(members[0]) as source, open(f"{path}.tmp", "wb") as target:
+            shutil.copyfileobj(source, target, 2**20)
+    os.replace(f"{path}.tmp", path)
+
+def _save_zip(zip_file, path):
+    # Opening the central directory checks the zip is complete before it replaces anything
+    zipfile.ZipFile(zip_file).close()
+    zip_file.seek(0)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", "wb") as target:
+        shutil.copyfileobj(zip_file, target, 2**20)
+    os.replace(f"{path}.tmp", path)
+
+def download_months(months, out_dir, workers=4, url=FORM_URL, retries=5, extract=True):
+    """
+    Downloads (year, month) pairs concurrently.
+
+    Parameters:
+    months (list): (year, month) tuples.
+    out_dir (str): Root of the {year}/{year}_{MM}.csv layout.
+    workers (int): Months downloaded at once.
+    url (str): Form URL (point it at a local stub to test).
+    retries (int): Attempts per month.
+    extract (bool): Extract each month's CSV; False keeps the zips.
+
+    Returns:
+    dict: {(year, month): output path or the exception that stopped it}
+    """
+    results = {}
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(download_month, year, month, out_dir, url, retries, extract=extract): (year, month)
+                   for year, month in months}
+        for future in as_completed(futures):
+            year, month = futures[future]
+            try:
+                results[(year, month)] = future.result()
+                print(f"{year}-{month:02d} -> {results[(year, month)]} ({time.time() - start:.0f}s elapsed)")
+            except Exception as e:
+                results[(year, month)] = e
+                print(f"Unable to process {year}-{month:02d}: {e}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Download BTS on-time performance months without a browser.")
+    parser.add_argument("first_year", type=int)
+    parser.add_argument("last_year", type=int)
+    parser.add_argument("out_dir", help="Input directory of process_airport_data_by_origin.py")
+    parser.add_argument("--months", type=int, nargs="+", default=list(range(1, 13)))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--url", default=FORM_URL)
+    parser.add_argument("--zip", action="store_true", help="Keep the zips instead of extracting the CSVs")
+    args = parser.parse_args()
+
+    months = [(year, month) for year in range(args.first_year, args.last_year + 1) for month in args.months]
+    results = download_months(months, args.out_dir, workers=args.workers, url=args.url,
+                               extract=not args.zip)
+    failed = sorted(key for key, result in results.items() if isinstance(result, Exception))
+    print(f"Downloaded {len(months) - len(failed)}/{len(months)} months into {args.out_dir}")
+    if failed:
+        sys.exit(f"Failed months: {failed}")
+
+if __name__ == "__main__":
+    main()
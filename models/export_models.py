@@ -0,0 +1,92 @@
+import os
+import sys
+import pickle
+import argparse
+import lightgbm as lgb
+from sklearn.base import is_classifier
+
+"""
+Export pickled models to compact formats that load and predict faster.
+
+- LightGBM models (best_lgbm_regressor.pkl, best_lgbm_classifier.pkl) are written as LightGBM
+  text boosters (.txt). These load with `lgb.Booster(model_str=...)` without unpickling the
+  sklearn wrapper, and predict a single row without the wrapper's validation overhead. The
+  dashboard serves these when present.
+- With --onnx, sklearn models (random forests, multi-output and stacking models) are also
+  converted to ONNX with skl2onnx (optional dependency), for use with onnxruntime.
+
+Usage:
+    python export_models.py best_lgbm_regressor.pkl best_lgbm_classifier.pkl
+    python export_models.py multioutput_regressor_rf.pkl classifier_rf.pkl --onnx --out-dir exported
+"""
+
+def export_lgbm(model, out_path):
+    """Writes the booster of a fitted LGBMRegressor/LGBMClassifier as a LightGBM text model."""
+    model.booster_.save_model(out_path)
+    return out_path
+
+def export_onnx(model, out_path):
+    """Converts a fitted sklearn model to ONNX (float32 input named 'input')."""
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+
+    # Plain probability arrays instead of a list of dicts per row
+    options = {id(model): {"zipmap": False}} if is_classifier(model) else None
+    onnx_model = convert_sklearn(model, initial_types=[("input", FloatTensorType([None, model.n_features_in_]))],
+                                 options=options)
+    with open(out_path, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+    return out_path
+
+def export_model(model, name, out_dir, onnx=False):
+    """
+    Exports one model, or each model of a dict of models (e.g. per-delay-type forests).
+
+    Returns:
+    list: Paths written.
+    """
+    if isinstance(model, dict):
+        return [path for key, sub_model in model.items()
+                for path in export_model(sub_model, f"{name}_{key}", out_dir, onnx)]
+
+    if not hasattr(model, "predict"):
+        return []
+    if isinstance(model, lgb.LGBMModel):
+        return [export_lgbm(model, os.path.join(out_dir, f"{name}.txt"))]
+    if onnx:
+        try:
+            return [export_onnx(model, os.path.join(out_dir, f"{name}.onnx"))]
+        except ImportError:
+            print("skl2onnx is not installed; skipping ONNX export (pip install skl2onnx)")
+        except Exception as e:
+            print(f"Could not convert {name} ({type(model).__name__}) to ONNX: {e}")
+    else:
+        print(f"Skipping {name} ({type(model).__name__}): not a LightGBM model, pass --onnx to convert it")
+    return []
+
+def main():
+    parser = argparse.ArgumentParser(description="Export pickled models to LightGBM text boosters or ONNX.")
+    parser.add_argument("models", nargs="+", help="Pickled model files")
+    parser.add_argument("--out-dir", default=".", help="Directory for the exported files")
+    parser.add_argument("--onnx", action="store_true", help="Also convert non-LightGBM sklearn models to ONNX")
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    written = []
+    for path in args.models:
+        with open(path, "rb") as f:
+            model = pickle.load(f)
+        # stacking_models.pkl keeps its per-delay-type models under 'models' next to feature lists
+        if isinstance(model, dict) and "models" in model:
+            model = model["models"]
+        name = os.path.splitext(os.path.basename(path))[0]
+        for out_path in export_model(model, name, args.out_dir, args.onnx):
+            print(f"Exported {path} -> {out_path} ({os.path.getsize(path) / 1e6:.1f} MB -> "
+                  f"{os.path.getsize(out_path) / 1e6:.1f} MB)")
+            written.append(out_path)
+
+    if not written:
+        sys.exit("Nothing was exported")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import os
+import json
+import pickle
+import hashlib
+import pandas as pd
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler
+from load_data import read_training_data, WEATHER_FEATURES, DELAY_TARGETS
+import storage
+from storage.cache import generation
+
+"""
+Feature engineering shared by the model scripts and the prediction page.
+
+`FeaturePipeline` turns raw rows (as in airport-weather-data.csv) into the model matrix: each
+timestamp is parsed once for the hour/month/day-of-week features, categorical columns are encoded
+with the category lists learned at fit time, and weather features are imputed and scaled. The
+fitted pipeline is pickled next to the models so serving encodes a single row exactly like
+training did.
+
+`load_features` caches the engineered matrix (plus targets and the fitted pipeline) as Parquet
+in FEATURE_CACHE_DIR, keyed by a fingerprint of the input file and the feature settings, so
+repeated experiments on the same data skip loading and feature engineering entirely.
+"""
+
+FEATURE_CACHE_DIR = os.environ.get(
+    "FEATURE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "feature_cache")
+)
+
+CATEGORICAL_FEATURES = ['Marketing_Airline_Network', 'OriginAirportID', 'DestAirportID']
+SKY_FEATURE = 'HourlySkyConditions'
+TIME_FEATURES = ['CRSDepHour', 'CRSArrHour', 'CRSDepMonth', 'CRSDepDayOfWeek']
+BASE_FEATURES = ['DayOfWeek', 'Marketing_Airline_Network', 'OriginAirportID', 'DestAirportID', 'Distance'] + TIME_FEATURES
+TARGETS = DELAY_TARGETS + ['Cancelled']
+
+def time_features(data):
+    """Returns the scheduled departure/arrival time features, parsing each timestamp column once."""
+    dep = pd.to_datetime(data['UTC_CRSDepTime'])
+    arr = pd.to_datetime(data['UTC_CRSArrTime'])
+    return pd.DataFrame({
+        'CRSDepHour': dep.dt.hour,
+        'CRSArrHour': arr.dt.hour,
+        'CRSDepMonth': dep.dt.month,
+        'CRSDepDayOfWeek': dep.dt.dayofweek,
+    }, index=data.index)
+
+class FeaturePipeline:
+    """
+    Fitted feature engineering for the flight delay/cancellation models.
+
+    Parameters:
+    include_sky_conditions (bool): Add the encoded HourlySkyConditions to the weather features.
+    scale_weather (bool): Impute (mean) and standardize the weather features.
+    """
+
+    def __init__(self, include_sky_conditions=False, scale_weather=True):
+        self.include_sky_conditions = include_sky_conditions
+        self.scale_weather = scale_weather
+        self.categories_ = {}
+        self.imputer_ = SimpleImputer(strategy='mean')
+        self.scaler_ = StandardScaler()
+
+    @property
+    def categorical_features(self):
+        return CATEGORICAL_FEATURES + ([SKY_FEATURE] if self.include_sky_conditions else [])
+
+    @property
+    def weather_features(self):
+        return WEATHER_FEATURES + ([SKY_FEATURE] if self.include_sky_conditions else [])
+
+    @property
+    def feature_columns(self):
+        return BASE_FEATURES + self.weather_features
+
+    def encode_categoricals(self, data):
+        """Returns the category codes of each categorical column (-1 for values unseen at fit time)."""
+        codes = {}
+        for col in self.categorical_features:
+            categories = self.categories_[col]
+            values = data[col]
+            if pd.api.types.is_numeric_dtype(categories) and not pd.api.types.is_numeric_dtype(values):
+                values = pd.to_numeric(values, errors='coerce')
+            codes[col] = pd.Categorical(values, categories=categories).codes
+        return pd.DataFrame(codes, index=data.index)
+
+    def _assemble(self, data):
+        frame = pd.concat([
+            data[['DayOfWeek', 'Distance']],
+            self.encode_categoricals(data),
+            time_features(data),
+            data[WEATHER_FEATURES],
+        ], axis=1)
+        return frame[self.feature_columns].astype('float32')
+
+    def fit(self, data):
+        for col in self.categorical_features:
+            values = data[col]
+            uniques = values.cat.categories if isinstance(values.dtype, pd.CategoricalDtype) else values.dropna().unique()
+            # Sorted, so codes match `astype('category').cat.codes` on the full data
+            self.categories_[col] = pd.Index(sorted(uniques))
+        if self.scale_weather:
+            weather = self._assemble(data)[self.weather_features].to_numpy()
+            self.scaler_.fit(self.imputer_.fit_transform(weather))
+        return self
+
+    def transform(self, data):
+        """Returns the float32 feature matrix for `data`, with columns in `feature_columns` order."""
+        frame = self._assemble(data)
+        if self.scale_weather:
+            weather = frame[self.weather_features].to_numpy()
+            frame[self.weather_features] = self.scaler_.transform(self.imputer_.transform(weather)).astype('float32')
+        return frame
+
+    def fit_transform(self, data):
+        return self.fit(data).transform(data)
+
+def input_fingerprint(path):
+    """
+    Returns a hash of the input object's version from the storage backend's metadata: its resolved
+    path, size and generation/ETag (mtime on backends without one), so any rewrite changes it.
+    """
+    fs, resolved = storage.filesystem(path)
+    info = fs.info(resolved)
+    return hashlib.sha256(f"{resolved}:{info.get('size')}:{generation(info)}".encode()).hexdigest()
+
+def feature_cache_key(path, include_sky_conditions=False, scale_weather=True, sample_frac=None, stratify=None,
+                      random_state=42):
+    """Returns the cache key of the features `load_features` builds for this input and these settings."""
+    config = {
+        "input": input_fingerprint(path),
+        "include_sky_conditions": include_sky_conditions,
+        "scale_weather": scale_weather,
+        "sample_frac": sample_frac,
+        "stratify": stratify,
+        "random_state": random_state,
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+def load_features(path="airport-weather-data.csv", include_sky_conditions=False, scale_weather=True,
+                  sample_frac=None, stratify=None, random_state=42, cache_dir=FEATURE_CACHE_DIR, refresh=False):
+    """
+    Returns the engineered feature matrix, the raw targets and the fitted pipeline for `path`.
+
+    The result is read from the on-disk cache when the input file and settings are unchanged;
+    otherwise the data is loaded, engineered and cached. Pass refresh=True to rebuild.
+
+    Returns:
+    tuple: (X, targets, pipeline) where targets holds DELAY_TARGETS and 'Cancelled'.
+    """
+    key = feature_cache_key(path, include_sky_conditions, scale_weather, sample_frac, stratify, random_state)
+    matrix_path = os.path.join(cache_dir, f"features-{key}.parquet")
+    pipeline_path = os.path.join(cache_dir, f"pipeline-{key}.pkl")
+
+    if not refresh and os.path.exists(matrix_path) and os.path.exists(pipeline_path):
+        print(f"Loading cached features from {matrix_path}")
+        matrix = pd.read_parquet(matrix_path)
+        with open(pipeline_path, "rb") as f:
+            pipeline = pickle.load(f)
+    else:
+        data = read_training_data(path, sample_frac=sample_frac, stratify=stratify, random_state=random_state)
+        print("Engineering features...")
+        pipeline = FeaturePipeline(include_sky_conditions=include_sky_conditions, scale_weather=scale_weather)
+        matrix = pd.concat([pipeline.fit_transform(data), data[TARGETS]], axis=1)
+        del data
+
+        # Write under temporary names and swap in, pipeline last, so a partial cache is never read
+        os.makedirs(cache_dir, exist_ok=True)
+        matrix.to_parquet(f"{matrix_path}.tmp", index=False)
+        with open(f"{pipeline_path}.tmp", "wb") as f:
+            pickle.dump(pipeline, f)
+        os.replace(f"{matrix_path}.tmp", matrix_path)
+        os.replace(f"{pipeline_path}.tmp", pipeline_path)
+        print(f"Cached features at {matrix_path}")
+
+    return matrix[pipeline.feature_columns], matrix[TARGETS], pipeline
@@ -0,0 +1,75 @@
+from itertools import combinations
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.feature_selection import SelectFromModel
+
+"""
+Selected pairwise weather interaction terms.
+
+`PolynomialFeatures(interaction_only=True)` over the 9 weather columns materializes all 36
+pairwise products (plus copies of the inputs) in float64 for every row. Instead,
+`select_interactions` scores every product on a row sample and keeps only those that
+SelectFromModel retains. `interaction_terms` then builds just those products, in float32, chunk
+by chunk. Names follow PolynomialFeatures ("A B"), so the feature columns keep their old names.
+"""
+
+def all_pairs(features):
+    """Returns every pair of distinct features, in PolynomialFeatures order."""
+    return list(combinations(features, 2))
+
+def interaction_name(pair):
+    return " ".join(pair)
+
+def interaction_terms(X, pairs, chunksize=1_000_000):
+    """
+    Returns the products of the given feature pairs as a float32 DataFrame aligned with X.
+
+    Parameters:
+    X (pd.DataFrame): Frame holding every feature named in `pairs`.
+    pairs (list): (feature, feature) tuples, e.g. from `select_interactions`.
+    chunksize (int): Rows multiplied per step, bounding the temporary input copy.
+    """
+    inputs = sorted({feature for pair in pairs for feature in pair})
+    position = {feature: i for i, feature in enumerate(inputs)}
+    left = [position[a] for a, _ in pairs]
+    right = [position[b] for _, b in pairs]
+
+    out = np.empty((len(X), len(pairs)), dtype=np.float32)
+    for start in range(0, len(X), chunksize):
+        block = X[inputs].iloc[start:start + chunksize].to_numpy(dtype=np.float32)
+        np.multiply(block[:, left], block[:, right], out=out[start:start + chunksize])
+    return pd.DataFrame(out, columns=[interaction_name(pair) for pair in pairs], index=X.index)
+
+def select_interactions(X, y, features, sample_size=100_000, threshold="median", random_state=42):
+    """
+    Picks the pairwise interactions of `features` worth adding to X.
+
+    A small random forest is fitted on a row sample of X plus every candidate product, and
+    SelectFromModel keeps the products whose importance reaches `threshold` (relative to all
+    columns, not just the products).
+
+    Parameters:
+    X (pd.DataFrame): Feature matrix (already imputed/scaled as it will be used for training).
+    y (pd.Series): Target used to score the interactions.
+    features (list): Columns whose pairwise products are candidates.
+    sample_size (int): Rows used for scoring.
+    threshold (str or float): SelectFromModel threshold.
+    random_state (int): Seed for sampling and the forest.
+
+    Returns:
+    list: Selected (feature, feature) pairs, in PolynomialFeatures order.
+    """
+    pairs = all_pairs(features)
+    sample = X.sample(n=min(sample_size, len(X)), random_state=random_state)
+    candidates = interaction_terms(sample, pairs)
+
+    forest = RandomForestRegressor(n_estimators=50, max_depth=12, min_samples_leaf=20,
+                                   n_jobs=-1, random_state=random_state)
+    forest.fit(pd.concat([sample, candidates], axis=1), y.loc[sample.index])
+    support = SelectFromModel(forest, threshold=threshold, prefit=True).get_support()[sample.shape[1]:]
+
+    selected = [pair for pair, keep in zip(pairs, support) if keep]
+    print(f"Selected {len(selected)} of {len(pairs)} weather interactions: "
+          f"{[interaction_name(pair) for pair in selected]}")
+    return selected
@@ -1,49 +1,36 @@
+import os
+import argparse
 import pandas as pd
 import pickle
 from sklearn.model_selection import train_test_split, RandomizedSearchCV
 from sklearn.metrics import mean_squared_error, accuracy_score
-from sklearn.preprocessing import StandardScaler
-from sklearn.impute import SimpleImputer
 import lightgbm as lgb
-
-# Load your data
-print("Reading input file...")
-data = pd.read_csv("airport-weather-data.csv")
-data = data.sample(frac=0.3, random_state=42)
-
-# Conduct feature engineering
-print("Conducting feature engineering...")
-data['CRSDepHour'] = pd.to_datetime(data['UTC_CRSDepTime']).dt.hour
-data['CRSArrHour'] = pd.to_datetime(data['UTC_CRSArrTime']).dt.hour
-data['CRSDepMonth'] = pd.to_datetime(data['UTC_CRSDepTime']).dt.month
-data['CRSDepDayOfWeek'] = pd.to_datetime(data['UTC_CRSDepTime']).dt.dayofweek
-
-# Encode categorical features
-print("Encoding categorical features...")
-data['Marketing_Airline_Network'] = data['Marketing_Airline_Network'].astype('category').cat.codes
-data['OriginAirportID'] = data['OriginAirportID'].astype('category').cat.codes
-data['DestAirportID'] = data['DestAirportID'].astype('category').cat.codes
-
-# Handle missing values for weather features
-weather_features = [
-    'HourlyDryBulbTemperature', 'HourlyWindSpeed', 'HourlyWindDirection', 
-    'HourlyDewPointTemperature', 'HourlyRelativeHumidity', 'HourlyVisibility', 
-    'HourlyStationPressure', 'HourlyWetBulbTemperature'
-]
-
-# Impute missing values and scale weather features
-print("Imputing and standardizing features...")
-imputer = SimpleImputer(strategy='mean')
-scaler = StandardScaler()
-data[weather_features] = imputer.fit_transform(data[weather_features])
-data[weather_features] = scaler.fit_transform(data[weather_features])
-
-# Prepare the feature set (18 features)
-X = data[['DayOfWeek', 'Marketing_Airline_Network', 'OriginAirportID', 'DestAirportID', 'Distance', 
-          'CRSDepHour', 'CRSArrHour', 'CRSDepMonth', 'CRSDepDayOfWeek'] + weather_features]
+from feature_pipeline import load_features, feature_cache_key, CATEGORICAL_FEATURES, FEATURE_CACHE_DIR
+from lgbm_tuning import build_dataset, cv_search, halving_search
+
+parser = argparse.ArgumentParser(description="Tune and train the LGBM delay regressor and cancellation classifier.")
+parser.add_argument("--mode", choices=["native", "halving", "sklearn"], default="native",
+                    help="native: lgb.cv on a binned, cached lgb.Dataset with categorical IDs; "
+                         "halving: successive-halving search with early stopping on a validation set; "
+                         "sklearn: RandomizedSearchCV on pandas frames")
+args = parser.parse_args()
+
+DATA_PATH = "airport-weather-data.csv"
+# Sample while streaming, keeping the cancellation rate of the full file
+FEATURE_SETTINGS = {"sample_frac": 0.3, "stratify": "Cancelled", "random_state": 42}
+
+# Load the engineered features (cached on disk after the first run)
+print("Loading features...")
+X, targets, feature_pipeline = load_features(DATA_PATH, **FEATURE_SETTINGS)
+cache_key = feature_cache_key(DATA_PATH, **FEATURE_SETTINGS)
+
+# Save the fitted feature pipeline so serving encodes inputs exactly like training
+with open("feature_pipeline.pkl", "wb") as file:
+    pickle.dump(feature_pipeline, file)
+print("Feature pipeline saved as feature_pipeline.pkl")
 
 # Regression Task with LGBM for 'TotalFlightDelay'
-y_delay = data['TotalFlightDelay'].fillna(0)  # Select one delay type for simplicity
+y_delay = targets['TotalFlightDelay'].fillna(0)  # Select one delay type for simplicity
 
 # Split dataset for delay predictions
 X_train_delay, X_test_delay, y_train_delay, y_test_delay = train_test_split(X, y_delay, test_size=0.2, random_state=42)
@@ -60,26 +47,43 @@ lgbm_param_grid = {
     'reg_lambda': [0.1, 0.3, 0.5]  # L2 regularization
 }
 
-# Initialize LGBMRegressor
-lgbm_regressor = lgb.LGBMRegressor(random_state=42)
-
-# Set up RandomizedSearchCV for hyperparameter tuning
-print("Starting hyperparameter tuning for delay prediction...")
-grid_search_lgbm = RandomizedSearchCV(
-    estimator=lgbm_regressor, 
-    param_distributions=lgbm_param_grid,
-    n_iter=15,  # Adjust iterations for more exhaustive search if needed
-    cv=5,  # More folds for better model robustness
-    verbose=1, 
-    random_state=42,
-    n_jobs=2
-)
-
-# Fit model with hyperparameter tuning for regression
-grid_search_lgbm.fit(X_train_delay, y_train_delay)
-
-# Best model from grid search for regression
-best_lgbm_regressor = grid_search_lgbm.best_estimator_
+if args.mode == "native":
+    # Bin the training split once (cached as a LightGBM binary) and reuse it for every fold and trial
+    print("Starting hyperparameter tuning for delay prediction...")
+    delay_train_set = build_dataset(X_train_delay, y_train_delay, CATEGORICAL_FEATURES,
+                                    binary_path=os.path.join(FEATURE_CACHE_DIR, f"lgbm-{cache_key}-delay-train.bin"))
+    best_delay_params, _ = cv_search(delay_train_set, lgbm_param_grid, objective="regression", n_iter=15, nfold=5)
+
+    # Refit the best parameters with the sklearn wrapper so the pickled model serves as before
+    best_lgbm_regressor = lgb.LGBMRegressor(random_state=42, verbose=-1, **best_delay_params)
+    best_lgbm_regressor.fit(X_train_delay, y_train_delay, categorical_feature=CATEGORICAL_FEATURES)
+elif args.mode == "halving":
+    print("Starting successive-halving search for delay prediction...")
+    search_delay = halving_search(lgb.LGBMRegressor(random_state=42, verbose=-1), lgbm_param_grid,
+                                  X_train_delay, y_train_delay, scoring="neg_root_mean_squared_error",
+                                  categorical_features=CATEGORICAL_FEATURES)
+    best_lgbm_regressor = search_delay.best_estimator_
+else:
+    # Initialize LGBMRegressor
+    lgbm_regressor = lgb.LGBMRegressor(random_state=42)
+
+    # Set up RandomizedSearchCV for hyperparameter tuning
+    print("Starting hyperparameter tuning for delay prediction...")
+    grid_search_lgbm = RandomizedSearchCV(
+        estimator=lgbm_regressor, 
+        param_distributions=lgbm_param_grid,
+        n_iter=15,  # Adjust iterations for more exhaustive search if needed
+        cv=5,  # More folds for better model robustness
+        verbose=1, 
+        random_state=42,
+        n_jobs=2
+    )
+
+    # Fit model with hyperparameter tuning for regression
+    grid_search_lgbm.fit(X_train_delay, y_train_delay)
+
+    # Best model from grid search for regression
+    best_lgbm_regressor = grid_search_lgbm.best_estimator_
 
 # Display the most important 18 features for delay prediction
 print("Displaying the top 18 most important features for delay prediction:")
@@ -98,10 +102,11 @@ print(f"Root Mean Squared Error (RMSE) for TotalFlightDelay: {rmse}")
 # Save the regression model
 with open("best_lgbm_regressor.pkl", "wb") as file:
     pickle.dump(best_lgbm_regressor, file)
-print("LGBM regression model saved as best_lgbm_regressor.pkl")
+best_lgbm_regressor.booster_.save_model("best_lgbm_regressor.txt")
+print("LGBM regression model saved as best_lgbm_regressor.pkl and best_lgbm_regressor.txt")
 
 # Classification Task with LGBM for 'Cancelled' feature
-y_cancel = data['Cancelled']  # Target for classification
+y_cancel = targets['Cancelled'].fillna(0).astype(int)  # Target for classification
 
 # Split dataset for cancellation predictions
 X_train_cancel, X_test_cancel, y_train_cancel, y_test_cancel = train_test_split(X, y_cancel, test_size=0.2, random_state=42)
@@ -118,26 +123,41 @@ lgbm_class_param_grid = {
     'reg_lambda': [0.1, 0.3, 0.5]  # L2 regularization
 }
 
-# Initialize LGBMClassifier
-lgbm_classifier = lgb.LGBMClassifier(random_state=42)
-
-# Set up RandomizedSearchCV for hyperparameter tuning for classification
-print("Starting hyperparameter tuning for cancellation prediction...")
-grid_search_lgbm_class = RandomizedSearchCV(
-    estimator=lgbm_classifier, 
-    param_distributions=lgbm_class_param_grid,
-    n_iter=15,  # Adjust iterations for more exhaustive search if needed
-    cv=5,  # More folds for better model robustness
-    verbose=1, 
-    random_state=42,
-    n_jobs=2
-)
-
-# Fit model with hyperparameter tuning for classification
-grid_search_lgbm_class.fit(X_train_cancel, y_train_cancel)
-
-# Best model from grid search for classification
-best_lgbm_classifier = grid_search_lgbm_class.best_estimator_
+if args.mode == "native":
+    print("Starting hyperparameter tuning for cancellation prediction...")
+    cancel_train_set = build_dataset(X_train_cancel, y_train_cancel, CATEGORICAL_FEATURES,
+                                     binary_path=os.path.join(FEATURE_CACHE_DIR, f"lgbm-{cache_key}-cancel-train.bin"))
+    best_cancel_params, _ = cv_search(cancel_train_set, lgbm_class_param_grid, objective="binary", n_iter=15, nfold=5)
+
+    best_lgbm_classifier = lgb.LGBMClassifier(random_state=42, verbose=-1, **best_cancel_params)
+    best_lgbm_classifier.fit(X_train_cancel, y_train_cancel, categorical_feature=CATEGORICAL_FEATURES)
+elif args.mode == "halving":
+    print("Starting successive-halving search for cancellation prediction...")
+    search_cancel = halving_search(lgb.LGBMClassifier(random_state=42, verbose=-1), lgbm_class_param_grid,
+                                   X_train_cancel, y_train_cancel, scoring="neg_log_loss",
+                                   categorical_features=CATEGORICAL_FEATURES)
+    best_lgbm_classifier = search_cancel.best_estimator_
+else:
+    # Initialize LGBMClassifier
+    lgbm_classifier = lgb.LGBMClassifier(random_state=42)
+
+    # Set up RandomizedSearchCV for hyperparameter tuning for classification
+    print("Starting hyperparameter tuning for cancellation prediction...")
+    grid_search_lgbm_class = RandomizedSearchCV(
+        estimator=lgbm_classifier, 
+        param_distributions=lgbm_class_param_grid,
+        n_iter=15,  # Adjust iterations for more exhaustive search if needed
+        cv=5,  # More folds for better model robustness
+        verbose=1, 
+        random_state=42,
+        n_jobs=2
+    )
+
+    # Fit model with hyperparameter tuning for classification
+    grid_search_lgbm_class.fit(X_train_cancel, y_train_cancel)
+
+    # Best model from grid search for classification
+    best_lgbm_classifier = grid_search_lgbm_class.best_estimator_
 
 # Display the most important 18 features for cancellation prediction
 print("Displaying the top 18 most important features for cancellation prediction:")
@@ -162,4 +182,5 @@ print(f"Accuracy for cancellation prediction: {accuracy:.2f}")
 # Save the classification model
 with open("best_lgbm_classifier.pkl", "wb") as file:
     pickle.dump(best_lgbm_classifier, file)
-print("LGBM classification model saved as best_lgbm_classifier.pkl")
+best_lgbm_classifier.booster_.save_model("best_lgbm_classifier.txt")
+print("LGBM classification model saved as best_lgbm_classifier.pkl and best_lgbm_classifier.txt")
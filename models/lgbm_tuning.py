@@ -0,0 +1,151 @@
+import os
+import numpy as np
+import lightgbm as lgb
+from sklearn.model_selection import ParameterSampler
+
+"""
+LightGBM-native hyperparameter search for lgbm.py.
+
+`RandomizedSearchCV` hands pandas frames to the sklearn wrapper, so every fold of every trial
+re-bins the training data. Here the training split is binned once into an `lgb.Dataset` (with
+airline/airport IDs as native categorical features) and saved as a LightGBM binary, so later runs
+skip binning too. Each trial then runs `lgb.cv` on that one constructed Dataset; the folds are
+subsets of the already-binned data.
+"""
+
+def build_dataset(X, y, categorical_features, binary_path=None, max_bin=255):
+    """
+    Returns a constructed (binned) lgb.Dataset for X/y.
+
+    Parameters:
+    X (pd.DataFrame): Training features.
+    y (pd.Series): Training labels.
+    categorical_features (list): Columns LightGBM should treat as categorical.
+    binary_path (str): LightGBM binary to load the Dataset from if it exists, or to save it to.
+        The caller keys the path by the data it was built from.
+    max_bin (int): Maximum number of histogram bins per feature.
+    """
+    # feature_pre_filter off so trials may change min_child_samples on the same binned Dataset
+    params = {"max_bin": max_bin, "feature_pre_filter": False, "verbose": -1}
+    if binary_path and os.path.exists(binary_path):
+        print(f"Loading LightGBM dataset from {binary_path}")
+        return lgb.Dataset(binary_path, params=params).construct()
+
+    dataset = lgb.Dataset(X, label=y, categorical_feature=categorical_features, params=params).construct()
+    if binary_path:
+        os.makedirs(os.path.dirname(os.path.abspath(binary_path)), exist_ok=True)
+        dataset.save_binary(f"{binary_path}.tmp")
+        os.replace(f"{binary_path}.tmp", binary_path)
+        print(f"Saved LightGBM dataset to {binary_path}")
+    return dataset
+
+def cv_search(train_set, param_distributions, objective, n_iter=15, nfold=5, random_state=42):
+    """
+    Random search over `param_distributions` with `lgb.cv` on a pre-built Dataset.
+
+    Parameters use the sklearn wrapper's names (n_estimators, subsample, colsample_bytree, ...) so
+    the best set can be passed straight to LGBMRegressor/LGBMClassifier.
+
+    Parameters:
+    train_set (lgb.Dataset): Dataset from `build_dataset`.
+    param_distributions (dict): Parameter lists or distributions, as for RandomizedSearchCV.
+    objective (str): 'regression' (scored by RMSE) or 'binary' (scored by log loss, stratified folds).
+    n_iter (int): Number of sampled parameter sets.
+    nfold (int): Number of CV folds.
+    random_state (int): Seed for parameter sampling, fold assignment and training.
+
+    Returns:
+    tuple: (best_params, best_score)
+    """
+    metric = "binary_logloss" if objective == "binary" else "rmse"
+    best_params, best_score = None, np.inf
+
+    for trial, params in enumerate(ParameterSampler(param_distributions, n_iter=n_iter, random_state=random_state)):
+        native_params = dict(params)
+        num_boost_round = native_params.pop("n_estimators", 100)
+        results = lgb.cv(
+            {"objective": objective, "metric": metric, "seed": random_state, "verbose": -1, **native_params},
+            train_set,
+            num_boost_round=num_boost_round,
+            nfold=nfold,
+            stratified=objective == "binary",
+            seed=random_state,
+        )
+        # Key is 'valid rmse-mean' on LightGBM 4, 'rmse-mean' on older versions
+        score = results[next(key for key in results if key.endswith(f"{metric}-mean"))][-1]
+        print(f"Trial {trial + 1}/{n_iter}: {metric}={score:.4f} {params}")
+        if score < best_score:
+            best_params, best_score = dict(params), score
+
+    print(f"Best {metric}: {best_score:.4f} with {best_params}")
+    return best_params, best_score
+
+def validation_fit_params(X_val, y_val):
+    """Returns the fit() keywords for a validation set: eval_X/eval_y from LightGBM 4.7, eval_set before."""
+    if tuple(int(part) for part in lgb.__version__.split(".")[:2]) >= (4, 7):
+        return {"eval_X": X_val, "eval_y": y_val}
+    return {"eval_set": [(X_val, y_val)]}
+
+def halving_search(estimator, param_distributions, X_train, y_train, scoring, categorical_features=None,
+                   n_candidates=30, factor=3, cv=5, validation_size=0.1, early_stopping_rounds=20,
+                   random_state=42, n_jobs=None):
+    """
+    Successive-halving random search with early stopping on a held-out validation set.
+
+    All candidates start on a small sample of the training rows; each round keeps the best
+    1/`factor` of them and gives the survivors `factor` times more rows, so only a few candidates
+    ever train on the full data. Every fit also stops adding trees once the validation score has
+    not improved for `early_stopping_rounds` rounds, so n_estimators acts as an upper bound.
+
+    Parameters:
+    estimator: An unfitted LGBMRegressor or LGBMClassifier.
+    param_distributions (dict): Parameter lists or distributions, as for RandomizedSearchCV.
+    X_train (pd.DataFrame): Training features (the validation set is split off from these).
+    y_train (pd.Series): Training labels.
+    scoring (str): sklearn scorer used to rank candidates (e.g. 'neg_root_mean_squared_error').
+    categorical_features (list): Columns LightGBM should treat as categorical.
+    n_candidates (int): Number of parameter sets sampled for the first round.
+    factor (int): Elimination factor between rounds.
+    cv (int): Number of CV folds per round.
+    validation_size (float): Fraction of the training rows held out for early stopping.
+    early_stopping_rounds (int): Rounds without validation improvement before a fit stops.
+    random_state (int): Seed for sampling, splitting and training.
+    n_jobs (int): Candidates evaluated in parallel (default: one per core, one thread each).
+
+    Returns:
+    HalvingRandomSearchCV: The fitted search; best_estimator_ is refit on the training rows.
+    """
+    from sklearn.base import is_classifier
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingRandomSearchCV, train_test_split
+
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=validation_size, random_state=random_state,
+        stratify=y_train if is_classifier(estimator) else None
+    )
+
+    # One single-threaded fit per core beats a few fits each competing for every core
+    estimator.set_params(n_jobs=1)
+    search = HalvingRandomSearchCV(
+        estimator=estimator,
+        param_distributions=param_distributions,
+        n_candidates=n_candidates,
+        min_resources="exhaust",  # size the first round so the last one uses every training row
+        factor=factor,
+        cv=cv,
+        scoring=scoring,
+        random_state=random_state,
+        n_jobs=n_jobs or os.cpu_count(),
+        verbose=1
+    )
+    fit_params = {
+        **validation_fit_params(X_val, y_val),
+        "callbacks": [lgb.early_stopping(early_stopping_rounds, verbose=False)],
+    }
+    if categorical_features:
+        fit_params["categorical_feature"] = categorical_features
+    search.fit(X_fit, y_fit, **fit_params)
+
+    print(f"Best {scoring}: {search.best_score_:.4f} with {search.best_params_} "
+          f"({search.best_estimator_.best_iteration_} trees after early stopping)")
+    return search
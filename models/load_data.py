@@ -0,0 +1,108 @@
+import os
+import sys
+import pandas as pd
+
+# The repo root provides the shared storage layer
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import storage
+
+"""
+Streaming loader for the merged training file (airport-weather-data.csv).
+
+The file is read in chunks, keeping only the columns the models use and parsing them straight
+into compact dtypes, so peak memory is a fraction of a plain `pd.read_csv`. Optional (stratified)
+sampling is applied chunk by chunk, so rows that are sampled out are never accumulated.
+
+Usage:
+    from load_data import read_training_data
+    data = read_training_data("airport-weather-data.csv", sample_frac=0.3, stratify="Cancelled")
+"""
+
+WEATHER_FEATURES = [
+    'HourlyDryBulbTemperature', 'HourlyWindSpeed', 'HourlyWindDirection',
+    'HourlyDewPointTemperature', 'HourlyRelativeHumidity', 'HourlyVisibility',
+    'HourlyStationPressure', 'HourlyWetBulbTemperature'
+]
+DELAY_TARGETS = ['ArrivalDelay', 'DepartureDelay', 'TotalFlightDelay', 'TaxiDelay']
+
+# Compact dtypes for every column the model scripts read
+TRAINING_DTYPES = {
+    'DayOfWeek': 'int8',
+    'Marketing_Airline_Network': 'category',
+    'OriginAirportID': 'int16',  # BTS airport IDs are 5-digit values below 32767
+    'DestAirportID': 'int16',
+    'Distance': 'float32',
+    'UTC_CRSDepTime': 'object',
+    'UTC_CRSArrTime': 'object',
+    'HourlySkyConditions': 'category',
+    'Cancelled': 'float32',  # float so rows with a missing flag still parse
+    **{feature: 'float32' for feature in WEATHER_FEATURES},
+    **{target: 'float32' for target in DELAY_TARGETS},
+}
+
+# Columns loaded by default: model inputs and all targets
+DEFAULT_COLUMNS = list(TRAINING_DTYPES)
+
+def sample_chunk(chunk, frac, stratify=None, random_state=None):
+    """
+    Samples a fraction of a chunk, per stratum of the `stratify` column if given.
+
+    Parameters:
+    chunk (pd.DataFrame): The chunk to sample from.
+    frac (float): Fraction of rows to keep.
+    stratify (str): Column whose class proportions are preserved (e.g. 'Cancelled').
+    random_state (int): Seed for this chunk.
+
+    Returns:
+    pd.DataFrame: The sampled rows, in their original order.
+    """
+    if stratify is None:
+        return chunk.sample(frac=frac, random_state=random_state).sort_index()
+    return (chunk.groupby(stratify, group_keys=False, dropna=False, observed=True)
+                 .sample(frac=frac, random_state=random_state)
+                 .sort_index())
+
+def _concat_chunks(chunks):
+    # Chunks see different category sets; align them so the result stays categorical
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            categories = pd.api.types.union_categoricals([chunk[col] for chunk in chunks]).categories
+            for chunk in chunks:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+def read_training_data(path="airport-weather-data.csv", columns=None, sample_frac=None, stratify=None,
+                       chunksize=1_000_000, random_state=42, storage_options=None):
+    """
+    Streams the merged training file with compact dtypes, optionally sampling while reading.
+
+    Parameters:
+    path (str): Local path or URL of the merged CSV; gs:// bucket URLs follow STORAGE_BACKEND.
+    columns (list): Columns to load (default: DEFAULT_COLUMNS).
+    sample_frac (float): Fraction of rows to keep; None keeps every row.
+    stratify (str): Column whose class proportions the sample preserves.
+    chunksize (int): Rows parsed per chunk.
+    random_state (int): Base seed; chunk i is sampled with random_state + i.
+    storage_options (dict): Passed through to pandas for remote paths (default: the storage layer's).
+
+    Returns:
+    pd.DataFrame: The loaded (and sampled) rows.
+    """
+    usecols = list(columns or DEFAULT_COLUMNS)
+    dtypes = {col: TRAINING_DTYPES[col] for col in usecols if col in TRAINING_DTYPES}
+
+    path = storage.resolve(path)
+    if storage_options is None:
+        storage_options = storage.storage_options(path)
+    reader = pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunksize,
+                         storage_options=storage_options)
+    chunks = []
+    for i, chunk in enumerate(reader):
+        if sample_frac is not None and sample_frac < 1:
+            chunk = sample_chunk(chunk, sample_frac, stratify, random_state=None if random_state is None else random_state + i)
+        chunks.append(chunk)
+        print(f"Read chunk {i + 1}: {len(chunk)} rows kept")
+
+    if not chunks:
+        return pd.DataFrame({col: pd.Series(dtype=dtypes.get(col, 'object')) for col in usecols})
+    return _concat_chunks(chunks)
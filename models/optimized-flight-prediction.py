@@ -6,11 +6,20 @@ import pickle
 from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, accuracy_score
-from sklearn.preprocessing import StandardScaler, PolynomialFeatures
+from sklearn.preprocessing import StandardScaler
 from sklearn.impute import SimpleImputer
 from joblib import Parallel, delayed
+import os
+import atexit
+import shutil
+import tempfile
+import argparse
 import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm  # For progress bar
+from load_data import read_training_data
+from feature_pipeline import FeaturePipeline, time_features
+from interactions import select_interactions, interaction_terms, interaction_name
 
 # Set number of cores for parallel processing
 N_CORES = multiprocessing.cpu_count()
@@ -27,12 +36,7 @@ def timer_decorator(func):
 @timer_decorator
 def process_datetime_chunk(chunk):
     """Process a chunk of datetime data"""
-    return pd.DataFrame({
-        'CRSDepHour': pd.to_datetime(chunk['UTC_CRSDepTime']).dt.hour,
-        'CRSArrHour': pd.to_datetime(chunk['UTC_CRSArrTime']).dt.hour,
-        'CRSDepMonth': pd.to_datetime(chunk['UTC_CRSDepTime']).dt.month,
-        'CRSDepDayOfWeek': pd.to_datetime(chunk['UTC_CRSDepTime']).dt.dayofweek
-    })
+    return time_features(chunk)
 
 @timer_decorator
 def parallel_feature_engineering(data):
@@ -93,83 +97,187 @@ def parallel_weather_processing(data, weather_features):
     return data
 
 @timer_decorator
-def process_interaction_chunk(chunk, poly):
-    """Process a chunk for interaction terms"""
-    interaction_terms = poly.transform(chunk)
-    return pd.DataFrame(interaction_terms, columns=poly.get_feature_names_out())
+def process_interaction_chunk(chunk, pairs):
+    """Process a chunk for the selected interaction terms"""
+    return interaction_terms(chunk, pairs)
 
 @timer_decorator
-def parallel_interaction_terms(data, weather_features):
-    # Initialize PolynomialFeatures
-    poly = PolynomialFeatures(interaction_only=True, include_bias=False)
-    print("Fitting polynomial interaction terms...")
-    poly.fit(data[weather_features])
-    
+def parallel_interaction_terms(data, weather_features, pairs):
     # Split data into chunks
     chunk_size = len(data) // N_CORES
     chunks = [data[weather_features].iloc[i:i + chunk_size] 
              for i in range(0, len(data), chunk_size)]
     
-    print("Creating interaction terms in parallel...")
+    print(f"Creating {len(pairs)} selected interaction terms in parallel...")
     results = Parallel(n_jobs=N_CORES)(
-        delayed(process_interaction_chunk)(chunk, poly)
+        delayed(process_interaction_chunk)(chunk, pairs)
         for chunk in tqdm(chunks, desc="Interaction Term Processing")
     )
     
-    # Combine results
+    # Combine results (float32, selected pairs only)
     interaction_df = pd.concat(results).reset_index(drop=True)
     return pd.concat([data.reset_index(drop=True), interaction_df], axis=1)
 
+BASE_COLUMNS = ['DayOfWeek', 'Marketing_Airline_Network', 'OriginAirportID', 'DestAirportID', 'Distance']
+TIME_COLUMNS = ['CRSDepHour', 'CRSArrHour', 'CRSDepMonth', 'CRSDepDayOfWeek']
+
+def split_rows(n_rows, n_chunks=N_CORES):
+    """Split n_rows into at most n_chunks contiguous row slices"""
+    bounds = np.linspace(0, n_rows, min(n_chunks, n_rows) + 1, dtype=int)
+    return [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+@timer_decorator
+def fill_datetime_chunk(matrix, rows, columns, dep_times, arr_times):
+    """Write the datetime features of a row slice into the shared matrix"""
+    features = time_features(pd.DataFrame({'UTC_CRSDepTime': dep_times, 'UTC_CRSArrTime': arr_times}))
+    matrix[rows, columns] = features.to_numpy(dtype=np.float32)
+
+@timer_decorator
+def scale_weather_chunk(matrix, rows, columns, imputer, scaler):
+    """Impute and scale the weather columns of a row slice in place"""
+    matrix[rows, columns] = scaler.transform(imputer.transform(matrix[rows, columns]))
+
+@timer_decorator
+def fill_interaction_chunk(matrix, rows, left_columns, right_columns, interactions):
+    """Write the selected interaction terms of a row slice into the shared interaction matrix"""
+    np.multiply(matrix[rows, left_columns], matrix[rows, right_columns], out=interactions[rows])
+
+@timer_decorator
+def shared_feature_engineering(data, weather_features, folder, y_select):
+    """
+    Feature engineering on float32 matrices memory-mapped from `folder`.
+
+    One matrix holds the feature columns, a second one the selected interaction terms (chosen
+    with `y_select` once the weather columns are scaled). joblib hands the memmaps to the workers
+    by file name, and each worker writes its row slice in place, so nothing is copied back or
+    concatenated. Only the raw timestamp strings of each slice are sent to the datetime workers.
+
+    Returns:
+    tuple: (matrix, columns, interactions, interaction_columns)
+    """
+    columns = BASE_COLUMNS + TIME_COLUMNS + weather_features
+    index = {col: i for i, col in enumerate(columns)}
+    time_idx = [index[col] for col in TIME_COLUMNS]
+    weather_idx = [index[col] for col in weather_features]
+
+    matrix = np.lib.format.open_memmap(os.path.join(folder, "features.npy"), mode="w+",
+                                       dtype=np.float32, shape=(len(data), len(columns)))
+    matrix[:, :len(BASE_COLUMNS)] = data[BASE_COLUMNS].to_numpy(dtype=np.float32)
+    matrix[:, weather_idx] = data[weather_features].to_numpy(dtype=np.float32)
+    matrix.flush()
+    row_slices = split_rows(len(data))
+
+    print("Processing datetime features in parallel (shared memory)...")
+    Parallel(n_jobs=N_CORES)(
+        delayed(fill_datetime_chunk)(matrix, rows, time_idx,
+                                     data['UTC_CRSDepTime'].iloc[rows], data['UTC_CRSArrTime'].iloc[rows])
+        for rows in tqdm(row_slices, desc="Datetime Feature Processing")
+    )
+
+    print("Fitting imputer and scaler on weather data...")
+    imputer = SimpleImputer(strategy='mean')
+    scaler = StandardScaler()
+    weather = matrix[:, weather_idx]
+    imputer.fit(weather)
+    scaler.fit(weather)
+    del weather
+
+    print("Processing weather data in parallel (shared memory)...")
+    Parallel(n_jobs=N_CORES)(
+        delayed(scale_weather_chunk)(matrix, rows, weather_idx, imputer, scaler)
+        for rows in tqdm(row_slices, desc="Weather Feature Processing")
+    )
+
+    # Only the interactions kept by feature selection get a column
+    pairs = select_interactions(pd.DataFrame(matrix, columns=columns, copy=False), y_select, weather_features)
+    interaction_columns = [interaction_name(pair) for pair in pairs]
+    interactions = np.lib.format.open_memmap(os.path.join(folder, "interactions.npy"), mode="w+",
+                                             dtype=np.float32, shape=(len(data), len(pairs)))
+
+    print(f"Creating {len(pairs)} selected interaction terms in parallel (shared memory)...")
+    Parallel(n_jobs=N_CORES)(
+        delayed(fill_interaction_chunk)(matrix, rows, [index[a] for a, _ in pairs], [index[b] for _, b in pairs],
+                                        interactions)
+        for rows in tqdm(row_slices, desc="Interaction Term Processing")
+    )
+
+    return matrix, columns, interactions, interaction_columns
+
+DELAY_TYPES = ['ArrivalDelay', 'DepartureDelay', 'TotalFlightDelay', 'TaxiDelay']
+
+def allocate_cores(n_models, n_cores=N_CORES):
+    """Splits n_cores between n_models fits running at the same time; returns each fit's n_jobs"""
+    base, extra = divmod(n_cores, n_models)
+    return [max(1, base + (i < extra)) for i in range(n_models)]
+
 @timer_decorator
-def train_rf_regressor(X_train, y_train, n_trees):
+def train_rf_regressor(X_train, y_train, n_trees, n_jobs=1):
     """Train a single random forest regressor"""
-    print(f"Training Random Forest Regressor with {n_trees} trees...")
+    print(f"Training Random Forest Regressor with {n_trees} trees on {n_jobs} cores...")
     rf = RandomForestRegressor(
         n_estimators=n_trees,
         random_state=42,
         max_depth=15,
-        min_samples_split=10
+        min_samples_split=10,
+        n_jobs=n_jobs
     )
     rf.fit(X_train, y_train)
     return rf
 
 @timer_decorator
-def parallel_train_delay_model(X_train, y_train):
-    """Train delay models in parallel"""
-    # Split trees among cores
-    trees_per_core = 100 // N_CORES
-    
-    # Train separate forests for each target in parallel
-    delay_types = ['ArrivalDelay', 'DepartureDelay', 'TotalFlightDelay', 'TaxiDelay']
-    
-    print("Training delay models in parallel...")
-    models = Parallel(n_jobs=N_CORES)(
-        delayed(train_rf_regressor)(
-            X_train, y_train[delay_type], trees_per_core
-        )
-        for delay_type in tqdm(delay_types, desc="Delay Model Training")
-    )
-    
-    return dict(zip(delay_types, models))
+def parallel_train_delay_model(X_train, y_train, n_trees=100, multi_output=False):
+    """
+    Train the delay models with every core busy and no data copies.
+
+    multi_output=True fits one forest on all four targets with every core. Otherwise the four
+    per-target forests are fitted concurrently in threads, each with its share of the cores and
+    the full n_trees; forest fitting releases the GIL, so the threads share X_train in place.
+    """
+    if multi_output:
+        print(f"Training one multi-output delay model on {N_CORES} cores...")
+        return train_rf_regressor(X_train, y_train[DELAY_TYPES], n_trees, n_jobs=N_CORES)
+
+    cores = allocate_cores(len(DELAY_TYPES))
+    print(f"Training delay models in parallel with {cores} cores each...")
+    # With fewer cores than targets, run only as many single-core fits at once as there are cores
+    with ThreadPoolExecutor(max_workers=min(len(DELAY_TYPES), N_CORES)) as executor:
+        futures = [
+            executor.submit(train_rf_regressor, X_train, y_train[delay_type], n_trees, n_jobs)
+            for delay_type, n_jobs in zip(DELAY_TYPES, cores)
+        ]
+        models = [future.result() for future in tqdm(futures, desc="Delay Model Training")]
+
+    return dict(zip(DELAY_TYPES, models))
+
+def predict_delays(delay_models, X):
+    """Predict every delay type with either a per-target model dict or one multi-output model"""
+    if isinstance(delay_models, dict):
+        return pd.DataFrame({delay_type: model.predict(X) for delay_type, model in delay_models.items()})
+    return pd.DataFrame(delay_models.predict(X), columns=DELAY_TYPES)
 
 def main():
+    parser = argparse.ArgumentParser(description="Train random forest delay and cancellation models.")
+    parser.add_argument("--n-trees", type=int, default=100, help="Trees per forest")
+    parser.add_argument("--multi-output", action="store_true",
+                        help="Fit one multi-output forest for all delay types instead of one per type")
+    parser.add_argument("--shared-memory", action="store_true",
+                        help="Build features in a float32 memmap that the parallel workers fill in place")
+    parser.add_argument("--shared-memory-dir", default="/dev/shm" if os.path.isdir("/dev/shm") else None,
+                        help="Directory backing the shared feature matrix (default: /dev/shm if available)")
+    args = parser.parse_args()
+
     start_time = time.time()
     
     # Load data
     print("Loading data...")
-    data = pd.read_csv("airport-weather-data.csv")
+    data = read_training_data("airport-weather-data.csv")
     print("Data loaded successfully.")
     
     # Convert categorical columns
-    cat_columns = ['Marketing_Airline_Network', 'OriginAirportID', 
-                   'DestAirportID', 'HourlySkyConditions']
     print("Converting categorical columns to numerical codes...")
-    for col in cat_columns:
-        data[col] = data[col].astype('category').cat.codes
-    
-    # Feature engineering
-    print("Engineering features...")
-    data = parallel_feature_engineering(data)
+    feature_pipeline = FeaturePipeline(include_sky_conditions=True, scale_weather=False).fit(data)
+    codes = feature_pipeline.encode_categoricals(data)
+    data[codes.columns] = codes
     
     # Define weather features
     weather_features = [
@@ -177,44 +285,62 @@ def main():
         'HourlyDewPointTemperature', 'HourlyRelativeHumidity', 'HourlyVisibility',
         'HourlyStationPressure', 'HourlyWetBulbTemperature', 'HourlySkyConditions'
     ]
-    
-    # Process weather features
-    print("Processing weather features...")
-    data = parallel_weather_processing(data, weather_features)
-    
-    # Create interaction terms
-    print("Creating interaction terms...")
-    data = parallel_interaction_terms(data, weather_features)
-    
-    # Prepare features and targets
-    feature_columns = ['DayOfWeek', 'Marketing_Airline_Network', 'OriginAirportID',
-                       'DestAirportID', 'Distance', 'CRSDepHour', 'CRSArrHour',
-                       'CRSDepMonth', 'CRSDepDayOfWeek'] + weather_features
-    
-    X = data[feature_columns]
+    feature_columns = BASE_COLUMNS + TIME_COLUMNS + weather_features
+
+    # Interaction terms are selected against total delay
+    y_select = data['TotalFlightDelay'].fillna(0).reset_index(drop=True)
+
+    if args.shared_memory:
+        # Feature engineering in shared float32 matrices, removed when the run ends
+        print("Engineering features in shared memory...")
+        folder = tempfile.mkdtemp(prefix="flight-features-", dir=args.shared_memory_dir)
+        atexit.register(shutil.rmtree, folder, True)
+        matrix, columns, interactions, interaction_columns = shared_feature_engineering(
+            data, weather_features, folder, y_select
+        )
+        X = pd.concat([pd.DataFrame(matrix, columns=columns, copy=False),
+                       pd.DataFrame(interactions, columns=interaction_columns, copy=False)], axis=1)
+    else:
+        # Feature engineering
+        print("Engineering features...")
+        data = parallel_feature_engineering(data)
+
+        # Process weather features
+        print("Processing weather features...")
+        data = parallel_weather_processing(data, weather_features)
+
+        # Create the interaction terms kept by feature selection
+        print("Creating interaction terms...")
+        pairs = select_interactions(data[feature_columns], y_select, weather_features)
+        data = parallel_interaction_terms(data, weather_features, pairs)
+
+        X = data[feature_columns + [interaction_name(pair) for pair in pairs]]
+
+    # Prepare targets
     y_delay = data[['ArrivalDelay', 'DepartureDelay', 'TotalFlightDelay', 'TaxiDelay']].fillna(0)
     y_cancel = data['Cancelled'].fillna(0).astype(int)
     
     # Split data
     print("Splitting data into training and testing sets...")
-    X_train_delay, X_test_delay, y_train_delay, y_test_delay = train_test_split(
-        X, y_delay, test_size=0.2, random_state=42
+    X_train_delay, X_test_delay, y_train_delay, y_test_delay, y_train_cancel, y_test_cancel = train_test_split(
+        X, y_delay, y_cancel, test_size=0.2, random_state=42
     )
     
     # Train delay models in parallel
     print("Training delay models...")
-    delay_models = parallel_train_delay_model(X_train_delay, y_train_delay)
+    delay_models = parallel_train_delay_model(X_train_delay, y_train_delay, n_trees=args.n_trees,
+                                              multi_output=args.multi_output)
     
     # Train cancellation model
     print("Training cancellation model...")
     cancel_model = RandomForestClassifier(
-        n_estimators=100,
+        n_estimators=args.n_trees,
         random_state=42,
         n_jobs=N_CORES,
         max_depth=15,
         min_samples_split=10
     )
-    cancel_model.fit(X_train_delay, y_cancel)
+    cancel_model.fit(X_train_delay, y_train_cancel)
     print("Cancellation model trained.")
     
     # Save models
@@ -227,13 +353,13 @@ def main():
     
     # Make predictions and calculate metrics
     print("\nCalculating metrics...")
-    for delay_type, model in delay_models.items():
-        y_pred = model.predict(X_test_delay)
-        rmse = np.sqrt(mean_squared_error(y_test_delay[delay_type], y_pred))
+    y_pred_delay = predict_delays(delay_models, X_test_delay)
+    for delay_type in DELAY_TYPES:
+        rmse = np.sqrt(mean_squared_error(y_test_delay[delay_type], y_pred_delay[delay_type]))
         print(f"RMSE for {delay_type}: {rmse:.2f}")
     
     y_pred_cancel = cancel_model.predict(X_test_delay)
-    accuracy_cancel = accuracy_score(y_cancel, y_pred_cancel)
+    accuracy_cancel = accuracy_score(y_test_cancel, y_pred_cancel)
     print(f"Cancellation Prediction Accuracy: {accuracy_cancel:.4f}")
     
     print(f"\nTotal runtime: {time.time() - start_time:.2f} seconds")
@@ -6,47 +6,14 @@ import pickle
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 from sklearn.model_selection import train_test_split, RandomizedSearchCV
 from sklearn.metrics import mean_squared_error, accuracy_score
-from sklearn.preprocessing import StandardScaler
-from sklearn.impute import SimpleImputer
-
-# Load your data
-print("Reading input file...")
-data = pd.read_csv("airport-weather-data.csv")
-
-# Feature Engineering
-print("Conducting feature engineering...")
-data['CRSDepHour'] = pd.to_datetime(data['UTC_CRSDepTime']).dt.hour
-data['CRSArrHour'] = pd.to_datetime(data['UTC_CRSArrTime']).dt.hour
-data['CRSDepMonth'] = pd.to_datetime(data['UTC_CRSDepTime']).dt.month
-data['CRSDepDayOfWeek'] = pd.to_datetime(data['UTC_CRSDepTime']).dt.dayofweek
-
-# Encode categorical features
-print("Encoding categorical features...")
-data['Marketing_Airline_Network'] = data['Marketing_Airline_Network'].astype('category').cat.codes
-data['OriginAirportID'] = data['OriginAirportID'].astype('category').cat.codes
-data['DestAirportID'] = data['DestAirportID'].astype('category').cat.codes
-data['HourlySkyConditions'] = data['HourlySkyConditions'].astype('category').cat.codes
-
-# Handle missing values for weather features
-weather_features = [
-    'HourlyDryBulbTemperature', 'HourlyWindSpeed', 'HourlyWindDirection', 
-    'HourlyDewPointTemperature', 'HourlyRelativeHumidity', 'HourlyVisibility', 
-    'HourlyStationPressure', 'HourlyWetBulbTemperature', 'HourlySkyConditions'
-]
-
-# Impute missing values and scale weather features
-print("Imputing and standardizing features...")
-imputer = SimpleImputer(strategy='mean')
-scaler = StandardScaler()
-data[weather_features] = imputer.fit_transform(data[weather_features])
-data[weather_features] = scaler.fit_transform(data[weather_features])
-
-# Prepare the feature set for model training
-X = data[['DayOfWeek', 'Marketing_Airline_Network', 'OriginAirportID', 'DestAirportID', 'Distance', 
-          'CRSDepHour', 'CRSArrHour', 'CRSDepMonth', 'CRSDepDayOfWeek'] + weather_features]
+from feature_pipeline import load_features
+
+# Load the engineered features (cached on disk after the first run)
+print("Loading features...")
+X, targets, feature_pipeline = load_features("airport-weather-data.csv", include_sky_conditions=True)
 
 # Regression Task with Random Forest
-y_delay = data[['ArrivalDelay', 'DepartureDelay', 'TotalFlightDelay', 'TaxiDelay']].fillna(0)
+y_delay = targets[['ArrivalDelay', 'DepartureDelay', 'TotalFlightDelay', 'TaxiDelay']].fillna(0)
 
 # Split dataset for delay predictions
 X_train_delay, X_test_delay, y_train_delay, y_test_delay = train_test_split(X, y_delay, test_size=0.2, random_state=42)
@@ -114,7 +81,7 @@ with open("best_rf_regressor.pkl", "wb") as file:
 print("Regression model saved as best_rf_regressor.pkl")
 
 # Classification Task with Random Forest
-y_cancel = data['Cancelled'].fillna(0).astype(int)
+y_cancel = targets['Cancelled'].fillna(0).astype(int)
 X_train_cancel, X_test_cancel, y_train_cancel, y_test_cancel = train_test_split(X, y_cancel, test_size=0.2, random_state=42)
 
 # Initialize RandomForestClassifier and fit model for cancellation prediction
@@ -7,66 +7,30 @@ from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
 from sklearn.multioutput import MultiOutputRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, accuracy_score
-from sklearn.preprocessing import StandardScaler, PolynomialFeatures
-from sklearn.impute import SimpleImputer
+from feature_pipeline import load_features
+from interactions import select_interactions, interaction_terms
 
 # Record start time
 start_time = time.time()
 
-# Load your data (ensure correct file path)
-print("Starting data loading...")
-data = pd.read_csv("airport-weather-data.csv")
-print(f"Data loaded successfully: time={time.time() - start_time}")
-
-# Feature Engineering
-print("Starting Feature Engineering...")
-data['CRSDepHour'] = pd.to_datetime(data['UTC_CRSDepTime']).dt.hour
-data['CRSArrHour'] = pd.to_datetime(data['UTC_CRSArrTime']).dt.hour
-data['CRSDepMonth'] = pd.to_datetime(data['UTC_CRSDepTime']).dt.month
-data['CRSDepDayOfWeek'] = pd.to_datetime(data['UTC_CRSDepTime']).dt.dayofweek
-print(f"Converted CRS times accordingly: time={time.time() - start_time}")
-
-# Encode categorical features
-categorical_features = ['Marketing_Airline_Network', 'OriginAirportID', 'DestAirportID']
-for feature in categorical_features:
-    data[feature] = data[feature].astype('category').cat.codes
-print(f"Encoded categorical airplane features: time={time.time() - start_time}")
-
-# Encode and add `HourlySkyConditions` to weather features
-data['HourlySkyConditions'] = data['HourlySkyConditions'].astype('category').cat.codes
-weather_features = [
-    'HourlyDryBulbTemperature', 
-    'HourlyWindSpeed', 
-    'HourlyWindDirection', 
-    'HourlyDewPointTemperature', 
-    'HourlyRelativeHumidity', 
-    'HourlyVisibility', 
-    'HourlyStationPressure', 
-    'HourlyWetBulbTemperature', 
-    'HourlySkyConditions'
-]
-print(f"Encoded categorical weather feature (Hourly Sky Condition): time={time.time() - start_time}")
-
-# Impute missing values and scale weather features
-imputer = SimpleImputer(strategy='mean')
-scaler = StandardScaler()
-data[weather_features] = imputer.fit_transform(data[weather_features])
-data[weather_features] = scaler.fit_transform(data[weather_features])
-print(f"Imputed and Standardized values: time={time.time() - start_time}")
-
-# Interaction terms between weather features, including `HourlySkyConditions`
-poly = PolynomialFeatures(interaction_only=True, include_bias=False)
-weather_interaction_terms = poly.fit_transform(data[weather_features])
-interaction_df = pd.DataFrame(weather_interaction_terms, columns=poly.get_feature_names_out(weather_features))
-data = pd.concat([data, interaction_df], axis=1)
+# Load the engineered features (cached on disk after the first run), with `HourlySkyConditions`
+# encoded and added to the weather features
+print("Starting data loading and feature engineering...")
+X, targets, feature_pipeline = load_features("airport-weather-data.csv", include_sky_conditions=True)
+weather_features = feature_pipeline.weather_features
+print(f"Features loaded: time={time.time() - start_time}")
+
+# Interaction terms between weather features, including `HourlySkyConditions`; only the pairs kept
+# by feature selection on a sample are built, in float32
+interaction_pairs = select_interactions(X, targets['TotalFlightDelay'].fillna(0), weather_features)
+interaction_df = interaction_terms(X, interaction_pairs)
 print(f"Weather interaction terms added: time={time.time() - start_time}")
 
 # Prepare the feature set
-X = data[['DayOfWeek', 'Marketing_Airline_Network', 'OriginAirportID', 'DestAirportID', 'Distance', 
-          'CRSDepHour', 'CRSArrHour', 'CRSDepMonth', 'CRSDepDayOfWeek'] + weather_features + list(interaction_df.columns)]
+X = pd.concat([X, interaction_df], axis=1)
 
 # Split dataset for multi-output delay predictions
-y_delay = data[['ArrivalDelay', 'DepartureDelay', 'TotalFlightDelay', 'TaxiDelay']].fillna(0)
+y_delay = targets[['ArrivalDelay', 'DepartureDelay', 'TotalFlightDelay', 'TaxiDelay']].fillna(0)
 X_train_delay, X_test_delay, y_train_delay, y_test_delay = train_test_split(X, y_delay, test_size=0.2, random_state=42)
 
 # Multi-output regression model for delay prediction using Random Forest
@@ -97,7 +61,7 @@ for i, delay in enumerate(delay_types):
 
 # Split dataset for cancellation predictions
 print("Preparing data for cancellation classification...")
-y_cancel = data['Cancelled'].fillna(0).astype(int)
+y_cancel = targets['Cancelled'].fillna(0).astype(int)
 X_train_cancel, X_test_cancel, y_train_cancel, y_test_cancel = train_test_split(X, y_cancel, test_size=0.2, random_state=42)
 
 # Random Forest model for cancellation prediction
@@ -1,21 +1,13 @@
-
-import re
-import time
-from selenium.webdriver.support.ui import Select
 import logging
 from logging.handlers import RotatingFileHandler
 import os
-import subprocess
 import sys
-from multiprocessing import Pool
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from datetime import datetime
-from webdriver_manager.chrome import ChromeDriverManager
+# The shared downloader lives in misc_py_scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "misc_py_scripts"))
+from downloader import download_files
+from download_manifest import DownloadManifest
+from index_crawler import crawl_links, listing_url
 
 def setup_logging(year):
     """
@@ -73,139 +65,33 @@ def setup_logging(year):
 
     return info_logger, error_logger
 
-def setup_webdriver():
+def collect_csv_links(url, info_logger, error_logger):
     """
-    Sets up and returns a headless Chrome WebDriver instance.
+    Collects all downloadable CSV file links of a year from its directory listing (see index_crawler.py).
     """
-    try:
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-        return driver
-    except Exception as e:
-        raise Exception(f"Failed to setup WebDriver: {str(e)}")
+    info_logger.info(f"Listing {listing_url(url)}")
+    csv_links = crawl_links([url], pattern=r"\.csv$", logger=info_logger)[listing_url(url)]
+    if csv_links is None:
+        error_logger.error(f"Could not list {url}")
+        return []
 
-def set_entries_to_n(driver, n):
-    """
-    Sets the entries dropdown to 100 to show more items on the page.
-    """
-    try:
-        # Locate the dropdown element by its name attribute
-        select_element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.NAME, "tb-s3objects_length"))
-        )
-        
-        # Use Select to set the dropdown value to 100
-        select = Select(select_element)
-        select.select_by_value(f"{n}")
-        
-        # Optional wait to ensure the page refreshes after changing the dropdown
-        time.sleep(2)
-        logging.info(f"Set entries per page to {n}.")
-    except Exception as e:
-        logging.error(f"Failed to set entries per page to 100: {str(e)}")
+    info_logger.info(f"Total CSV links collected: {len(csv_links)}")
+    return csv_links
 
-def get_number_of_pages_and_entries(driver, info_logger, error_logger):
-    """Returns the number of pages and total entries for a particular year."""
-    try:
-        time.sleep(1)
-        pagination_info = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.dataTables_info"))
-        ).text
-        
-        # Replace commas with an empty string to ignore them during integer parsing
-        total_entries = int(pagination_info.split('of')[-1].split('entries')[0].strip().replace(',', ''))
-        entries_per_page = int(pagination_info.split('to')[1].split('of')[0].strip().replace(',', ''))
-        
-        total_pages = (total_entries // entries_per_page) + (total_entries % entries_per_page > 0)
-        
-        info_logger.info(f"Total entries: {total_entries}, Entries per page: {entries_per_page}, Total pages: {total_pages}")
-        return total_pages, total_entries
-    except Exception as e:
-        error_logger.error(f"Error calculating pages and entries: {str(e)}")
-        return 1, 0
-
-def collect_csv_links(driver, url, info_logger, error_logger):
-    """
-    Collects all downloadable CSV file links from all pages.
-    """
-    info_logger.info(f"Navigating to {url}")
-    driver.get(url)
-
-    time.sleep(15)
-    
-    # Set entries to 100 to show more links per page
-    set_entries_to_n(driver, n=100)
-    
-    total_pages, _ = get_number_of_pages_and_entries(driver, info_logger, error_logger)
-    regex = r".*\.csv$"
-    all_csv_links = []
-
-    for page in range(1, total_pages + 1):
-        info_logger.info(f"Processing page {page} of {total_pages}")
-        if page > 1:
-            WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.LINK_TEXT, str(page)))
-            ).click()
-            time.sleep(1)
-
-        WebDriverWait(driver, 10).until(EC.presence_of_all_elements_located((By.TAG_NAME, "a")))
-        hyperlinks = driver.find_elements(By.TAG_NAME, "a")
-
-        page_links = [link.get_attribute('href') for link in hyperlinks if link.get_attribute('href') and re.search(regex, link.get_attribute('href'))]
-        info_logger.info(f"Found {len(page_links)} CSV links on page {page}")
-
-        all_csv_links.extend(page_links)
-
-    info_logger.info(f"Total CSV links collected: {len(all_csv_links)}")
-    return all_csv_links
-
-def download_csv_file(csv_link, output_folder, info_logger):
-    """
-    Downloads a CSV file using wget with retries.
+def parallel_download(csv_links, output_folder, info_logger, manifest=None):
     """
-    file_name = csv_link.split('/')[-1]
-    output_path = os.path.join(output_folder, file_name)
-    retry_count = 10
-
-    for attempt in range(retry_count):
-        try:
-            subprocess.run(['wget', '-O', output_path, csv_link], check=True, capture_output=True, text=True)
-            info_logger.info(f"Downloaded {file_name} successfully.")
-            break
-        except subprocess.CalledProcessError as e:
-            info_logger.error(f"Attempt {attempt + 1} failed to download {file_name}: {str(e)}")
-            if attempt == retry_count - 1:
-                info_logger.error(f"Failed to download {file_name} after {retry_count} attempts.")
-
-def parallel_download(csv_links, output_folder, info_logger):
+    Downloads all CSV files concurrently (see downloader.py), retrying each up to 10 times.
+    With a manifest, files downloaded by an earlier run are only fetched again if they changed.
     """
-    Downloads all CSV files in parallel.
-    """
-    os.makedirs(output_folder, exist_ok=True)
-    with Pool(processes=5) as pool:
-        for csv_link in csv_links:
-            pool.apply_async(download_csv_file, args=(csv_link, output_folder, info_logger))
-
-        pool.close()
-        pool.join()
+    return download_files(csv_links, output_folder, retries=10, logger=info_logger, manifest=manifest)
 
-def verify_downloads(csv_links, output_folder, year, info_logger, error_logger):
+def verify_downloads(csv_links, output_folder, year, manifest, info_logger, error_logger):
     """
-    Verifies if all CSV files were downloaded. If not, logs missing files to a separate file.
+    Verifies that every CSV file was downloaded completely, according to the manifest (a file is
+    missing if it failed, was never recorded, or is no longer on disk at its recorded size). Logs
+    missing files to a separate file.
     """
-    downloaded_files = set(os.listdir(output_folder))
-    missing_files = []
-
-    for csv_link in csv_links:
-        file_name = csv_link.split('/')[-1]
-        if file_name not in downloaded_files:
-            missing_files.append(csv_link)
+    missing_files = manifest.missing(csv_links)
 
     if missing_files:
         missing_file_path = os.path.join(output_folder, f'missing_downloads_{year}.txt')
@@ -230,19 +116,18 @@ if __name__ == '__main__':
     info_logger.info(f"Starting script for year: {year}")
 
     try:
-        driver = setup_webdriver()
-        csv_links = collect_csv_links(driver, base_url, info_logger, error_logger)
+        csv_links = collect_csv_links(base_url, info_logger, error_logger)
         info_logger.info("Starting download of CSV files.")
-        parallel_download(csv_links, output_folder, info_logger)
-        
-        # Verify downloads
-        verify_downloads(csv_links, output_folder, year, info_logger, error_logger)
+        # Reruns (e.g. a yearly refresh) only fetch new, changed or previously failed files
+        with DownloadManifest(os.path.join(output_folder, 'manifest.sqlite')) as manifest:
+            parallel_download(csv_links, output_folder, info_logger, manifest)
+            info_logger.info(f"Manifest: {manifest.summary()}")
+
+            # Verify downloads
+            verify_downloads(csv_links, output_folder, year, manifest, info_logger, error_logger)
         
         info_logger.info("Download and verification completed.")
     except Exception as e:
         error_logger.error(f"An error occurred: {str(e)}")
-    finally:
-        if 'driver' in locals():
-            driver.quit()
 
     print(f"Script completed for year {year}. Check the logs and download folder for details.")
@@ -0,0 +1,163 @@
+import io
+import os
+from functools import lru_cache
+import fsspec
+from fsspec.implementations.local import LocalFileSystem
+
+"""
+Storage layer shared by the dashboard, the pipeline scripts and the models.
+
+Objects in the data bucket are addressed by their key ("ncei-lcd/72503014732.csv") and resolved
+against the backend selected with STORAGE_BACKEND:
+
+- gcs (default): gs://{STORAGE_BUCKET}/{key}, authenticated with GCS_TOKEN.
+- local: {STORAGE_ROOT}/{key}, e.g. a `gsutil -m rsync` mirror or `python -m benchmarks.synthetic` output.
+- memory: fsspec's in-process memory filesystem, for runs that should not touch disk or network.
+
+Paths written as gs://{STORAGE_BUCKET}/... are remapped the same way, so any bucket URL can be
+handed to `open`/`read_csv`; other paths and URLs are opened as they are.
+
+`get_fs()` builds one filesystem per process and every module shares it, so all GCS traffic goes
+through one pooled HTTP session. It is rebuilt in forked children (gunicorn workers, process
+pools), which must not reuse the parent's connections. Files are opened with a block cache
+(STORAGE_CACHE_TYPE, STORAGE_BLOCK_SIZE) so repeated and random-access reads (Parquet footers,
+chunked CSV parsing) do not refetch the same ranges. With the gcs backend, whole objects are also
+kept in a local read-through disk cache (storage/cache.py).
+"""
+
+BACKEND = os.environ.get("STORAGE_BACKEND", "gcs")
+BUCKET = os.environ.get("STORAGE_BUCKET", "airport-weather-data")
+ROOT = os.environ.get("STORAGE_ROOT", os.path.join(os.getcwd(), BUCKET))
+GCS_PROJECT = os.environ.get("GCS_PROJECT", "Flights-Weather-Project")
+GCS_TOKEN = os.environ.get("GCS_TOKEN", "flights-weather-project-f94d306bee1f.json")
+BLOCK_SIZE = int(os.environ.get("STORAGE_BLOCK_SIZE", 8 * 2**20))
+CACHE_TYPE = os.environ.get("STORAGE_CACHE_TYPE", "blockcache")
+
+BACKENDS = ("gcs", "local", "memory")
+
+def configure(backend=None, root=None, bucket=None):
+    """Switches the backend (and root or bucket) for this process, e.g. in benchmarks."""
+    global BACKEND, ROOT, BUCKET
+    if backend is not None:
+        BACKEND = backend
+    if root is not None:
+        ROOT = root
+    if bucket is not None:
+        BUCKET = bucket
+    get_fs.cache_clear()
+
+@lru_cache(maxsize=None)
+def get_fs():
+    """Returns the process-wide filesystem of the configured backend."""
+    if BACKEND == "gcs":
+        # Same arguments as gcs_options(), so pandas/dask reads given those options reuse this instance
+        return fsspec.filesystem("gcs", **gcs_options())
+    if BACKEND == "local":
+        return fsspec.filesystem("file", auto_mkdir=True)
+    if BACKEND == "memory":
+        return fsspec.filesystem("memory")
+    raise ValueError(f"Unknown STORAGE_BACKEND {BACKEND!r}; expected one of {BACKENDS}")
+
+# gcsfs sessions and their event loop do not survive fork
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=get_fs.cache_clear)
+
+def gcs_options():
+    return {"project": GCS_PROJECT, "token": GCS_TOKEN, "block_size": BLOCK_SIZE}
+
+def url(key=""):
+    """Returns the backend path of a bucket key."""
+    key = key.lstrip("/")
+    if BACKEND == "gcs":
+        return f"gs://{BUCKET}/{key}"
+    if BACKEND == "local":
+        return os.path.join(ROOT, key)
+    return f"memory://{BUCKET}/{key}"
+
+def resolve(path):
+    """Maps gs://{BUCKET}/... URLs onto the configured backend; other paths are returned unchanged."""
+    path = str(path)
+    prefix = f"gs://{BUCKET}/"
+    return url(path[len(prefix):]) if path.startswith(prefix) else path
+
+def _in_backend(path):
+    return path.startswith(url())
+
+def filesystem(path):
+    """Returns (fs, path) for a path or URL, using the shared filesystem for bucket paths."""
+    path = resolve(path)
+    if _in_backend(path):
+        return get_fs(), path
+    return fsspec.core.url_to_fs(path, **(storage_options(path) or {}))
+
+def storage_options(path):
+    """Returns the `storage_options` pandas/dask need for a (resolved) path, or None."""
+    return gcs_options() if resolve(path).startswith("gs://") else None
+
+def _cached(path):
+    """Returns the local disk cache copy of a bucket object, or None if the object is not cached."""
+    from storage import cache
+
+    path = resolve(path)
+    if not (cache.ENABLED and BACKEND == "gcs" and _in_backend(path)):
+        return None
+    return cache.cached_path(path)
+
+def prefetch(paths, wait=False):
+    """Starts fetching bucket objects into the disk cache in the background (no-op without it)."""
+    from storage import cache
+
+    paths = [resolve(path) for path in paths]
+    if not (cache.ENABLED and BACKEND == "gcs"):
+        return []
+    return cache.prefetch([path for path in paths if _in_backend(path)], wait=wait)
+
+def open(path, mode="rb", **kwargs):
+    """
+    Opens a path or URL. Bucket objects are read from the disk cache when it is enabled, otherwise
+    through the shared filesystem with the block cache.
+    """
+    if mode in ("r", "rb"):
+        local_path = _cached(path)
+        if local_path is not None:
+            return io.open(local_path, mode, **kwargs)
+    fs, path = filesystem(path)
+    if "r" in mode and not isinstance(fs, LocalFileSystem):
+        kwargs.setdefault("cache_type", CACHE_TYPE)
+        kwargs.setdefault("block_size", BLOCK_SIZE)
+    return fs.open(path, mode, **kwargs)
+
+def exists(path):
+    fs, path = filesystem(path)
+    return fs.exists(path)
+
+def glob(pattern):
+    """Returns the keys of the bucket objects matching a key pattern, e.g. 'ncei-lcd/*.csv'."""
+    fs = get_fs()
+    root = fs._strip_protocol(url("x"))[:-1]
+    return sorted(path[len(root):] for path in fs.glob(url(pattern)))
+
+def read_csv(path, **kwargs):
+    """pd.read_csv on a path or URL; bucket paths are read through the shared filesystem."""
+    import pandas as pd
+
+    if kwargs.get("chunksize") or kwargs.get("iterator"):
+        # The reader is consumed after this returns, so let pandas own the file handle
+        path = _cached(path) or resolve(path)
+        return pd.read_csv(path, storage_options=storage_options(path), **kwargs)
+    with open(path) as f:
+        return pd.read_csv(f, **kwargs)
+
+def read_parquet(path, **kwargs):
+    import pandas as pd
+
+    with open(path) as f:
+        return pd.read_parquet(f, **kwargs)
+
+def to_csv(frame, path, **kwargs):
+    with open(path, "w", newline="") as f:
+        frame.to_csv(f, **kwargs)
+
+def to_parquet(frame, path, **kwargs):
+    with open(path, "wb") as f:
+        frame.to_parquet(f, **kwargs)
@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+import storage
+
+"""
+Read-through local disk cache for bucket objects.
+
+The dashboard callbacks, the prediction fallback and the merge pipeline read the same CSVs over
+and over. With the gcs backend, `storage.open`/`storage.read_csv` serve bucket objects from a
+copy under STORAGE_CACHE_DIR (put it on local SSD), downloading each object once.
+
+- Validation: every copy records the object generation it was fetched at (the ETag or mtime and
+  size on backends without generations). Before a copy is served the current generation is
+  looked up and a changed object is fetched again. Lookups are skipped for STORAGE_CACHE_TTL
+  seconds after the last one, so hot objects cost no request at all.
+- Eviction: copies are kept in least-recently-used order (by file mtime, bumped on every hit)
+  and the oldest are deleted once the cache holds more than STORAGE_CACHE_SIZE bytes. Objects
+  larger than a quarter of the cache are never copied; they are read through the block cache.
+- Prefetch: `prefetch(paths)` downloads objects in background threads, so a later read finds
+  them on disk. A read of an object that is still being prefetched waits for that download
+  instead of starting a second one.
+
+Copies are written to a temporary file and renamed into place, so processes sharing the cache
+directory (gunicorn workers, process pools) never see a partial file. Set STORAGE_CACHE=0 to
+read straight from the bucket.
+"""
+
+ENABLED = os.environ.get("STORAGE_CACHE", "1") != "0"
+CACHE_DIR = os.environ.get("STORAGE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "airport-weather-data"))
+MAX_BYTES = int(os.environ.get("STORAGE_CACHE_SIZE", 10 * 2**30))
+TTL = float(os.environ.get("STORAGE_CACHE_TTL", 60))
+PREFETCH_WORKERS = int(os.environ.get("STORAGE_PREFETCH_WORKERS", 8))
+
+_validated = {}  # path -> time.time() of the last generation check in this process
+_locks = {}
+_locks_guard = threading.Lock()
+_executor = None
+
+def _reset():
+    global _executor, _locks_guard
+    _validated.clear()
+    _locks.clear()
+    _locks_guard = threading.Lock()
+    _executor = None
+
+# Locks held and prefetch threads running in the parent do not exist in a forked child
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset)
+
+def _lock(path):
+    with _locks_guard:
+        return _locks.setdefault(path, threading.Lock())
+
+def _entry(path):
+    """Returns the (data, metadata) file paths of a cached object."""
+    digest = hashlib.sha256(path.encode()).hexdigest()
+    data = os.path.join(CACHE_DIR, digest[:2], digest)
+    return data, f"{data}.json"
+
+def generation(info):
+    """Returns a string identifying the version of an object from its fs.info() entry."""
+    for key in ("generation", "etag", "ETag"):
+        if info.get(key):
+            return str(info[key])
+    modified = info.get("mtime") or info.get("updated") or info.get("created")
+    return f"{modified}-{info.get('size')}"
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_atomic(path, write):
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def _fetch(fs, path, data, meta, version, size):
+    os.makedirs(os.path.dirname(data), exist_ok=True)
+    _write_atomic(data, lambda tmp: fs.get_file(path, tmp))
+
+    def write_meta(tmp):
+        with open(tmp, "w") as f:
+            json.dump({"path": path, "generation": version, "size": size, "fetched": time.time()}, f)
+    _write_atomic(meta, write_meta)
+
+def cached_path(path):
+    """
+    Returns the local copy of a bucket object, fetching it if it is missing or out of date.
+
+    Parameters:
+    path (str): Bucket key URL, e.g. storage.url("ncei-lcd/72503014732.csv").
+
+    Returns:
+    str: Path of the local copy, or None if the object is too large to cache.
+    """
+    fs, path = storage.filesystem(path)
+    data, meta = _entry(path)
+
+    with _lock(path):
+        checked = _validated.get(path)
+        if checked is not None and time.time() - checked < TTL and os.path.exists(data):
+            os.utime(data)
+            return data
+
+        info = fs.info(path)
+        size = info.get("size") or 0
+        if size > MAX_BYTES // 4:
+            return None
+
+        version = generation(info)
+        if _read_meta(meta).get("generation") == version and os.path.exists(data):
+            os.utime(data)
+        else:
+            _fetch(fs, path, data, meta, version, size)
+            evict()
+        _validated[path] = time.time()
+    return data
+
+def evict(max_bytes=None):
+    """
+    Deletes the least recently used copies until the cache holds at most `max_bytes`.
+
+    Returns:
+    int: Number of bytes freed.
+    """
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            if name.endswith((".json", ".tmp")):
+                continue
+            data = os.path.join(root, name)
+            try:
+                stat = os.stat(data)
+            except FileNotFoundError:  # evicted by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, data))
+
+    total = sum(size for _, size, _ in entries)
+    freed = 0
+    for _, size, data in sorted(entries):
+        if total - freed <= max_bytes:
+            break
+        for path in (f"{data}.json", data):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        freed += size
+    return freed
+
+def clear():
+    """Empties the cache directory."""
+    _validated.clear()
+    return evict(0)
+
+def prefetch(paths, wait=False):
+    """
+    Fetches bucket objects into the cache in background threads.
+
+    Parameters:
+    paths (list): Bucket key URLs.
+    wait (bool): Block until every object is cached.
+
+    Returns:
+    list: One future per path, resolving to the local copy (see `cached_path`).
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="storage-prefetch")
+    futures = [_executor.submit(cached_path, path) for path in paths]
+    if wait:
+        wait_futures(futures)
+    return futures
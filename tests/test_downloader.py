@@ -0,0 +1,94 @@
+import os
+import sys
+import asyncio
+import hashlib
+from aiohttp import web
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "misc_py_scripts"))
+from downloader import download_all
+
+"""
+Runs the downloader against a local aiohttp server: Range resume, retries on 503, no retry on 404
+and sha256 verification.
+"""
+
+BODY = b"STATION,DATE,HourlyDryBulbTemperature\n" + b"72219013874,2023-01-01T00:00:00,12\n" * 60000
+
+def serve_and_download(handler, jobs_for):
+    """Serves `handler` on a free local port and downloads the jobs `jobs_for(base_url)` returns."""
+    async def run():
+        app = web.Application()
+        app.router.add_get("/{name}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        try:
+            return await download_all(jobs_for(base_url), retries=3, backoff=0.01, progress=False)
+        finally:
+            await runner.cleanup()
+    return asyncio.run(run())
+
+def test_resumes_with_range_after_a_dropped_connection(tmp_path):
+    ranges = []
+
+    async def handler(request):
+        if "Range" in request.headers:
+            ranges.append(request.headers["Range"])
+            start = int(request.headers["Range"].split("=")[1].rstrip("-"))
+            return web.Response(status=206, body=BODY[start:],
+                                headers={"Content-Range": f"bytes {start}-{len(BODY) - 1}/{len(BODY)}"})
+        # Announce the whole body, send the first part and drop the connection
+        response = web.StreamResponse(headers={"Content-Length": str(len(BODY))})
+        await response.prepare(request)
+        await response.write(BODY[:100000])
+        request.transport.close()
+        return response
+
+    path = tmp_path / "station.csv"
+    [result] = serve_and_download(handler, lambda base: [{"url": f"{base}/station.csv", "path": str(path)}])
+    assert result["status"] == "ok"
+    assert ranges and ranges[0] == "bytes=100000-"
+    assert path.read_bytes() == BODY
+    assert result["sha256"] == hashlib.sha256(BODY).hexdigest()
+    assert not os.path.exists(f"{path}.part")
+
+def test_retries_on_503(tmp_path):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        if len(calls) < 3:
+            return web.Response(status=503)
+        return web.Response(body=BODY)
+
+    [result] = serve_and_download(handler, lambda base: [{"url": f"{base}/a.csv", "path": str(tmp_path / "a.csv")}])
+    assert result["status"] == "ok"
+    assert len(calls) == 3
+    assert (tmp_path / "a.csv").read_bytes() == BODY
+
+def test_does_not_retry_404(tmp_path):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        return web.Response(status=404)
+
+    [result] = serve_and_download(handler, lambda base: [{"url": f"{base}/gone.csv", "path": str(tmp_path / "gone.csv")}])
+    assert result["status"] == "failed"
+    assert result["error"] == "HTTP 404"
+    assert len(calls) == 1
+    assert not os.path.exists(tmp_path / "gone.csv")
+
+def test_sha256_mismatch_fails(tmp_path):
+    async def handler(request):
+        return web.Response(body=BODY)
+
+    path = tmp_path / "b.csv"
+    [result] = serve_and_download(handler, lambda base: [
+        {"url": f"{base}/b.csv", "path": str(path), "sha256": hashlib.sha256(b"something else").hexdigest()}
+    ])
+    assert result["status"] == "failed"
+    assert "sha256 mismatch" in result["error"]
+    assert not os.path.exists(path) and not os.path.exists(f"{path}.part")
@@ -0,0 +1,76 @@
+import os
+import sys
+import asyncio
+from aiohttp import web
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "misc_py_scripts"))
+from index_crawler import ACCESS_ROOT, LCD_ROOT, listing_url, parse_links, subdirectories, crawl
+
+"""
+Checks the NCEI listing parser against saved Apache directory listings of v2/access/ and two of
+its year directories (tests/fixtures/ncei_listing/).
+"""
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "ncei_listing")
+ACCESS_PATH = "/oa/local-climatological-data/v2/access/"
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+def test_listing_url_maps_viewer_urls_to_directories():
+    assert listing_url(f"{LCD_ROOT}index.html#v2/access/2023/") == f"{ACCESS_ROOT}2023/"
+    assert listing_url(f"{LCD_ROOT}index.html#v2/access/2023") == f"{ACCESS_ROOT}2023/"
+    assert listing_url(f"{ACCESS_ROOT}2023") == f"{ACCESS_ROOT}2023/"
+    assert listing_url(f"{ACCESS_ROOT}2023/") == f"{ACCESS_ROOT}2023/"
+
+def test_parse_links_drops_sort_and_parent_links():
+    links = parse_links(fixture("access_2023.html"), f"{ACCESS_ROOT}2023/")
+    assert not any("?" in link for link in links)
+    assert ACCESS_ROOT not in links
+    assert links == [
+        f"{ACCESS_ROOT}2023/LCD_USW00003017_2023.csv",
+        f"{ACCESS_ROOT}2023/LCD_USW00013874_2023.csv",
+        f"{ACCESS_ROOT}2023/LCD_USW00094846_2023.csv",
+        f"{ACCESS_ROOT}2023/readme.txt",
+    ]
+
+def test_parse_links_filters_by_pattern():
+    links = parse_links(fixture("access_2024.html"), f"{ACCESS_ROOT}2024/", pattern=r"\.csv$")
+    assert [link.rsplit("/", 1)[1] for link in links] == [
+        "LCD_USW00003017_2024.csv", "LCD_USW00013874_2024.csv", "LCD_USW00094846_2024.csv"
+    ]
+
+def test_parse_links_resolves_relative_links():
+    links = parse_links(fixture("access.html"), ACCESS_ROOT)
+    assert links == [f"{ACCESS_ROOT}2023/", f"{ACCESS_ROOT}2024/"]
+    assert subdirectories(links, ACCESS_ROOT) == links
+
+def test_crawl_follows_year_directories():
+    pages = {ACCESS_PATH: "access.html", f"{ACCESS_PATH}2023/": "access_2023.html",
+             f"{ACCESS_PATH}2024/": "access_2024.html"}
+
+    async def listing(request):
+        if request.path not in pages:
+            raise web.HTTPNotFound()
+        return web.Response(text=fixture(pages[request.path]), content_type="text/html")
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", listing)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            return port, await crawl([f"http://127.0.0.1:{port}{ACCESS_PATH}"], r"\.csv$", depth=1, retries=1)
+        finally:
+            await runner.cleanup()
+
+    port, listings = asyncio.run(run())
+    root = f"http://127.0.0.1:{port}{ACCESS_PATH}"
+    assert listings[root] == []
+    assert sorted(listings) == [root, f"{root}2023/", f"{root}2024/"]
+    assert listings[f"{root}2023/"][0] == f"{root}2023/LCD_USW00003017_2023.csv"
+    assert all(len(listings[f"{root}{year}/"]) == 3 for year in (2023, 2024))